@@ -21,7 +21,6 @@ gi.require_version("TotemPlParser", "1.0")
 from gi.repository import Gtk, Gio, GLib, Gdk, TotemPlParser
 
 from threading import current_thread
-from pickle import dump
 from gettext import gettext as _
 from signal import signal, SIGINT, SIGTERM
 
@@ -38,7 +37,7 @@ except Exception as e:
 
 from lollypop.utils import set_proxy_from_gnome
 from lollypop.utils import is_audio, is_pls
-from lollypop.define import Type, LOLLYPOP_DATA_PATH
+from lollypop.define import Type, TaskLane
 from lollypop.window import Window
 from lollypop.database import Database
 from lollypop.player import Player
@@ -51,10 +50,15 @@ from lollypop.database_albums import AlbumsDatabase
 from lollypop.database_artists import ArtistsDatabase
 from lollypop.database_genres import GenresDatabase
 from lollypop.database_tracks import TracksDatabase
+from lollypop.database_lookups import LookupsDatabase
+from lollypop.database_scrobbles import ScrobblesDatabase
+from lollypop.task_pool import TaskPool
+from lollypop.state import State
 from lollypop.notification import NotificationManager
 from lollypop.playlists import Playlists
 from lollypop.objects import Album, Track
 from lollypop.helper_task import TaskHelper
+from lollypop.helper_download import DownloadHelper
 from lollypop.collectionscanner import CollectionScanner
 
 
@@ -130,6 +134,10 @@ class Application(Gtk.Application):
                              GLib.OptionArg.NONE,
                              "Lollypop version",
                              None)
+        self.add_main_option("full-rescan", b"f", GLib.OptionFlags.NONE,
+                             GLib.OptionArg.NONE,
+                             "Rescan all collection directories",
+                             None)
         self.connect("command-line", self.__on_command_line)
         self.connect("handle-local-options", self.__on_handle_local_options)
         self.connect("activate", self.__on_activate)
@@ -165,15 +173,23 @@ class Application(Gtk.Application):
         styleContext = Gtk.StyleContext()
         styleContext.add_provider_for_screen(screen, cssProvider,
                                              Gtk.STYLE_PROVIDER_PRIORITY_USER)
+        self.task_pool = TaskPool()
         self.db = Database()
         self.playlists = Playlists()
         self.albums = AlbumsDatabase()
         self.artists = ArtistsDatabase()
+        # Sort keys are missing after upgrade or an interrupted scan
+        self.albums.update_sortkeys()
+        self.artists.update_sortkeys()
         self.genres = GenresDatabase()
         self.tracks = TracksDatabase()
         self.player = Player()
         self.inhibitor = Inhibitor()
         self.scanner = CollectionScanner()
+        self.download_helper = DownloadHelper()
+        self.lookups = LookupsDatabase()
+        self.scrobbles = ScrobblesDatabase()
+        self.state = State()
         self.art = Art()
         self.notify = NotificationManager()
         self.art.update_art_size()
@@ -286,41 +302,31 @@ class Application(Gtk.Application):
             Save window position and view
         """
         if self.settings.get_value("save-state"):
+            values = {"is_playing": self.player.is_playing,
+                      "is_party": self.player.is_party,
+                      "queue": list(self.player.queue)}
             # Save current track
             if self.player.current_track.id is None:
-                track_id = -1
+                values["track_id"] = -1
             elif self.player.current_track.id == Type.RADIOS:
                 from lollypop.radios import Radios
                 radios = Radios()
-                track_id = radios.get_id(
+                values["track_id"] = radios.get_id(
                     self.player.current_track.album_artists[0])
+                values["playlist_ids"] = [Type.RADIOS]
             else:
-                track_id = self.player.current_track.id
-                # Save albums context
-                try:
-                    with open(LOLLYPOP_DATA_PATH + "/Albums.bin", "wb") as f:
-                        dump(list(self.player.albums), f)
-                except Exception as e:
-                    Logger.error("Application::__save_state(): %s" % e)
-            dump(track_id, open(LOLLYPOP_DATA_PATH + "/track_id.bin", "wb"))
-            dump([self.player.is_playing, self.player.is_party],
-                 open(LOLLYPOP_DATA_PATH + "/player.bin", "wb"))
-            dump(self.player.queue,
-                 open(LOLLYPOP_DATA_PATH + "/queue.bin", "wb"))
-            # Save current playlist
-            if self.player.current_track.id == Type.RADIOS:
-                playlist_ids = [Type.RADIOS]
-            elif not self.player.get_playlist_ids():
-                playlist_ids = []
-            else:
+                values["track_id"] = self.player.current_track.id
+                values["position"] = self.player.position
+                # Save current playlist or albums context
                 playlist_ids = self.player.get_playlist_ids()
-            dump(playlist_ids,
-                 open(LOLLYPOP_DATA_PATH + "/playlist_ids.bin", "wb"))
-        if self.player.current_track.id is not None:
-            position = self.player.position
-        else:
-            position = 0
-        dump(position, open(LOLLYPOP_DATA_PATH + "/position.bin", "wb"))
+                if playlist_ids:
+                    values["playlist_ids"] = list(playlist_ids)
+                    values["playlist_track_ids"] = [
+                        track.id
+                        for track in self.player.get_playlist_tracks()]
+                elif not self.player.is_party:
+                    values["albums"] = self.player.albums.get_state()
+            self.state.save(values)
         self.player.stop_all()
         self.window.container.stop_all()
 
@@ -420,6 +426,8 @@ class Application(Gtk.Application):
             self.player.prev()
         elif options.contains("emulate-phone"):
             self.window.container.add_fake_phone()
+        elif options.contains("full-rescan"):
+            self.scanner.update(full=True)
         elif len(args) > 1:
             uris = []
             pls = []
@@ -489,8 +497,8 @@ class Application(Gtk.Application):
         """
         if self.window:
             helper = TaskHelper()
-            helper.run(self.art.clean_all_cache)
-            self.scanner.update()
+            helper.run(self.art.clean_all_cache, lane=TaskLane.LONG)
+            self.scanner.update(full=True)
 
     def __on_fs_destroyed(self, widget):
         """
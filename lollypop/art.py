@@ -14,6 +14,8 @@ from lollypop.art_album import AlbumArt
 from lollypop.art_radio import RadioArt
 from lollypop.logger import Logger
 from lollypop.downloader import Downloader
+from lollypop.helper_task import TaskHelper
+from lollypop.define import TaskLane
 
 from shutil import rmtree
 
@@ -32,12 +34,16 @@ class Art(AlbumArt, RadioArt, Downloader):
         Downloader.__init__(self)
         self._create_cache()
         self._create_store()
+        helper = TaskHelper()
+        helper.run(self.thumbnails.migrate, lane=TaskLane.LONG)
 
     def clean_all_cache(self):
         """
             Remove all covers from cache
         """
         try:
+            self.surface_cache.clear()
+            self.thumbnails.clear()
             rmtree(self._CACHE_PATH)
             self._create_cache()
         except Exception as e:
@@ -12,10 +12,11 @@
 
 from gi.repository import GLib, Gdk, GdkPixbuf, Gio, Gst
 
-import re
-
 from lollypop.art_base import BaseArt
 from lollypop.tagreader import TagReader
+from lollypop.art_loader import ArtLoader
+from lollypop.art_cache import SurfaceCache
+from lollypop.art_thumbnails import ThumbnailStore
 from lollypop.define import App, ArtSize
 from lollypop.objects import Album
 from lollypop.logger import Logger
@@ -30,6 +31,8 @@ class AlbumArt(BaseArt, TagReader):
     """
 
     _MIMES = ("jpeg", "jpg", "png", "gif")
+    # Decoded surfaces kept in memory
+    __SURFACES_BYTES = 32 * 1024 * 1024
 
     def __init__(self):
         """
@@ -37,6 +40,11 @@ class AlbumArt(BaseArt, TagReader):
         """
         BaseArt.__init__(self)
         TagReader.__init__(self)
+        self.__loader = ArtLoader()
+        self.surface_cache = SurfaceCache(self.__SURFACES_BYTES)
+        self.thumbnails = ThumbnailStore(self._CACHE_PATH)
+        self.connect("album-artwork-changed",
+                     self.__on_album_artwork_changed)
         self.__favorite = App().settings.get_value(
             "favorite-cover").get_string()
         if not self.__favorite:
@@ -59,14 +67,19 @@ class AlbumArt(BaseArt, TagReader):
             f = Gio.File.new_for_path(cache_path_jpg)
             if f.query_exists():
                 return cache_path_jpg
+            # Thumbnails are packed, export a file for other applications
+            pixbuf = self.__get_album_pixbuf(album, size, False)
+            if pixbuf is not None:
+                pixbuf.savev(cache_path_jpg, "jpeg", ["quality"],
+                             [str(App().settings.get_value(
+                                 "cover-quality").get_int32())])
+                return cache_path_jpg
             else:
-                self.get_album_artwork(album, size, 1)
-                if f.query_exists():
-                    return cache_path_jpg
-                else:
-                    return self._get_default_icon_path(
-                        size,
-                        "folder-music-symbolic")
+                self.cache_album_art(album.id)
+                self.get_default_icon("folder-music-symbolic", size, 1)
+                return self._get_default_icon_path(
+                    size,
+                    "folder-music-symbolic")
         except Exception as e:
             print("Art::get_album_cache_path(): %s" % e, ascii(filename))
             return None
@@ -154,79 +167,54 @@ class AlbumArt(BaseArt, TagReader):
             @param disable_cache as bool
             @return cairo surface
         """
-        size *= scale
-        filename = self.get_album_cache_name(album)
-        cache_path_jpg = "%s/%s_%s.jpg" % (self._CACHE_PATH, filename, size)
-        pixbuf = None
+        if not disable_cache:
+            surface = self.get_album_artwork_cached(album, size, scale)
+            if surface is not None:
+                return surface
+        pixbuf = self.__get_album_pixbuf(album, size * scale, disable_cache)
+        surface = self.__pixbuf_to_surface(pixbuf, album, size, scale)
+        if not disable_cache:
+            self.surface_cache.add(self.get_album_cache_name(album),
+                                   size, scale, surface)
+        return surface
 
-        try:
-            # Look in cache
-            f = Gio.File.new_for_path(cache_path_jpg)
-            if f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(cache_path_jpg,
-                                                                size,
-                                                                size)
-            else:
-                # Use favorite folder artwork
-                if pixbuf is None:
-                    uri = self.get_album_artwork_uri(album)
-                    data = None
-                    if uri is not None:
-                        f = Gio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._preserve_ratio(uri)
-                        bytes = GLib.Bytes(data)
-                        stream = Gio.MemoryInputStream.new_from_bytes(bytes)
-                        bytes.unref()
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                            stream,
-                            size,
-                            size,
-                            ratio,
-                            None)
-                        stream.close()
-                # Use tags artwork
-                if pixbuf is None and album.tracks:
-                    try:
-                        pixbuf = self.pixbuf_from_tags(
-                            album.tracks[0].uri, size)
-                    except Exception as e:
-                        print("AlbumArt::get_album_artwork()", e)
-
-                # Use folder artwork
-                if pixbuf is None and album.uri != "":
-                    uri = self.get_first_album_artwork(album)
-                    # Look in album folder
-                    if uri is not None:
-                        f = Gio.File.new_for_uri(uri)
-                        (status, data, tag) = f.load_contents(None)
-                        ratio = self._preserve_ratio(uri)
-                        bytes = GLib.Bytes(data)
-                        stream = Gio.MemoryInputStream.new_from_bytes(bytes)
-                        bytes.unref()
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(
-                            stream,
-                            size,
-                            size,
-                            ratio,
-                            None)
-                        stream.close()
-                # Use default artwork
-                if pixbuf is None:
-                    self.cache_album_art(album.id)
-                    return self.get_default_icon("folder-music-symbolic",
-                                                 size,
-                                                 scale)
-                elif not disable_cache:
-                    pixbuf.savev(cache_path_jpg, "jpeg", ["quality"],
-                                 [str(App().settings.get_value(
-                                     "cover-quality").get_int32())])
-            surface = Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, None)
-            return surface
+    def get_album_artwork_cached(self, album, size, scale):
+        """
+            Get album artwork if already decoded
+            @param album as Album
+            @param size as int
+            @param scale factor as int
+            @return cairo surface/None
+        """
+        return self.surface_cache.get(self.get_album_cache_name(album),
+                                      size, scale)
 
-        except Exception as e:
-            Logger.error("AlbumArt::get_album_artwork(): %s" % e)
-            return self.get_default_icon("folder-music-symbolic", size, scale)
+    def get_album_artwork_async(self, album, size, scale, callback,
+                                cancellable=None, *args):
+        """
+            Get a cairo surface for album in a worker thread
+            callback(surface, *args) is called in main loop, not called if
+            cancellable is cancelled, called at once if surface is cached
+            @param album as Album
+            @param size as int
+            @param scale factor as int
+            @param callback as function
+            @param cancellable as Gio.Cancellable/None
+        """
+        name = self.get_album_cache_name(album)
+        surface = self.surface_cache.get(name, size, scale)
+        if surface is not None:
+            callback(surface, *args)
+            return
+        self.__loader.load((name, size, scale),
+                           lambda discoverer: self.__get_album_pixbuf(
+                               album, size * scale, False, discoverer),
+                           lambda pixbuf: self.__add_surface(
+                               name, size, scale, self.__pixbuf_to_surface(
+                                   pixbuf, album, size, scale)),
+                           callback,
+                           cancellable,
+                           *args)
 
     def get_album_artwork2(self, uri, size, scale):
         """
@@ -329,38 +317,37 @@ class AlbumArt(BaseArt, TagReader):
             @param album as Album
         """
         cache_name = self.get_album_cache_name(album)
-        try:
-            d = Gio.File.new_for_path(self._CACHE_PATH)
-            infos = d.enumerate_children(
-                "standard::name",
-                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
-                None)
-            for info in infos:
-                f = infos.get_child(info)
-                basename = f.get_basename()
-                if re.search(r"%s_.*\.jpg" % re.escape(cache_name), basename):
+        self.surface_cache.invalidate(cache_name)
+        self.thumbnails.remove(cache_name)
+        # Files exported by get_album_cache_path()
+        for size in self.thumbnails.get_sizes():
+            try:
+                f = Gio.File.new_for_path("%s/%s_%s.jpg" % (self._CACHE_PATH,
+                                                            cache_name,
+                                                            size))
+                if f.query_exists():
                     f.delete()
-        except Exception as e:
-            Logger.error("AlbumArt::clean_album_cache(): %s" % e)
+            except Exception as e:
+                Logger.error("AlbumArt::clean_album_cache(): %s" % e)
 
-    def pixbuf_from_tags(self, uri, size):
+    def pixbuf_from_tags(self, uri, size, discoverer=None):
         """
             Return cover from tags
             @param uri as str
             @param size as int
+            @param discoverer as Discoverer/None
         """
         pixbuf = None
         if uri.startswith("http:") or uri.startswith("https:"):
             return
         try:
-            info = self.get_info(uri)
-            exist = False
+            if discoverer is None:
+                discoverer = self
+            info = discoverer.get_info(uri)
+            sample = None
             if info is not None:
-                (exist, sample) = info.get_tags().get_sample_index("image", 0)
-                # Some file store it in a preview-image tag
-                if not exist:
-                    (exist, sample) = info.get_tags().get_sample_index(
-                        "preview-image", 0)
+                sample = self.get_artwork_sample(info.get_tags())
+            exist = sample is not None
             if exist:
                 (exist, mapflags) = sample.get_buffer().map(Gst.MapFlags.READ)
             if exist:
@@ -390,6 +377,122 @@ class AlbumArt(BaseArt, TagReader):
 #######################
 # PRIVATE             #
 #######################
+    def __get_album_pixbuf(self, album, size, disable_cache,
+                           discoverer=None):
+        """
+            Get pixbuf for album, save it to cache
+            @param album as Album
+            @param size as int
+            @param disable_cache as bool
+            @param discoverer as Discoverer/None
+            @return GdkPixbuf.Pixbuf/None
+            @thread safe if discoverer is not None
+        """
+        filename = self.get_album_cache_name(album)
+        pixbuf = None
+
+        try:
+            # Look in cache
+            pixbuf = self.thumbnails.get(filename, size)
+            if pixbuf is not None:
+                return pixbuf
+            # Use favorite folder artwork
+            uri = self.get_album_artwork_uri(album)
+            if uri is not None:
+                pixbuf = self.__pixbuf_from_uri(uri, size)
+            # Use tags artwork
+            if pixbuf is None and album.id is not None and album.id >= 0:
+                try:
+                    pixbuf = self.__pixbuf_from_album_tags(album, size,
+                                                           discoverer)
+                except Exception as e:
+                    print("AlbumArt::__get_album_pixbuf()", e)
+            # Use folder artwork
+            if pixbuf is None and album.uri != "":
+                uri = self.get_first_album_artwork(album)
+                # Look in album folder
+                if uri is not None:
+                    pixbuf = self.__pixbuf_from_uri(uri, size)
+            if pixbuf is not None and not disable_cache:
+                self.thumbnails.add(filename, size, pixbuf)
+        except Exception as e:
+            Logger.error("AlbumArt::__get_album_pixbuf(): %s" % e)
+        return pixbuf
+
+    def __add_surface(self, name, size, scale, surface):
+        """
+            Add surface to cache
+            @param name as str
+            @param size as int
+            @param scale as int
+            @param surface as cairo.Surface
+            @return cairo.Surface
+        """
+        self.surface_cache.add(name, size, scale, surface)
+        return surface
+
+    def __pixbuf_from_album_tags(self, album, size, discoverer):
+        """
+            Get pixbuf from album tracks tags, only discover tracks
+            known to have an artwork or not checked yet
+            @param album as Album
+            @param size as int
+            @param discoverer as Discoverer/None
+            @return GdkPixbuf.Pixbuf/None
+        """
+        track = App().tracks.get_artwork_track(album.id)
+        # No track with an embedded artwork
+        if track is None:
+            return None
+        (track_id, uri, artwork) = track
+        pixbuf = self.pixbuf_from_tags(uri, size, discoverer)
+        if artwork is None:
+            App().tracks.set_artwork(track_id, pixbuf is not None)
+        return pixbuf
+
+    def __pixbuf_from_uri(self, uri, size):
+        """
+            Load pixbuf at uri
+            @param uri as str
+            @param size as int
+            @return GdkPixbuf.Pixbuf
+        """
+        f = Gio.File.new_for_uri(uri)
+        (status, data, tag) = f.load_contents(None)
+        ratio = self._preserve_ratio(uri)
+        bytes = GLib.Bytes(data)
+        stream = Gio.MemoryInputStream.new_from_bytes(bytes)
+        bytes.unref()
+        pixbuf = GdkPixbuf.Pixbuf.new_from_stream_at_scale(stream,
+                                                           size,
+                                                           size,
+                                                           ratio,
+                                                           None)
+        stream.close()
+        return pixbuf
+
+    def __pixbuf_to_surface(self, pixbuf, album, size, scale):
+        """
+            Get a cairo surface for pixbuf, default icon if None
+            @param pixbuf as GdkPixbuf.Pixbuf/None
+            @param album as Album
+            @param size as int
+            @param scale factor as int
+            @return cairo surface
+            @thread main
+        """
+        try:
+            if pixbuf is not None:
+                return Gdk.cairo_surface_create_from_pixbuf(pixbuf,
+                                                            scale,
+                                                            None)
+            self.cache_album_art(album.id)
+        except Exception as e:
+            Logger.error("AlbumArt::__pixbuf_to_surface(): %s" % e)
+        return self.get_default_icon("folder-music-symbolic",
+                                     size * scale,
+                                     scale)
+
     def __save_artwork_tags(self, data, album):
         """
             Save artwork in tags
@@ -473,3 +576,12 @@ class AlbumArt(BaseArt, TagReader):
         else:
             # Lollypop-portal or kid3-cli removed?
             App().settings.set_value("save-to-tags", GLib.Variant("b", False))
+
+    def __on_album_artwork_changed(self, art, album_id):
+        """
+            Drop decoded artworks for album
+            @param art as Art
+            @param album_id as int
+        """
+        self.surface_cache.invalidate(
+            self.get_album_cache_name(Album(album_id)))
@@ -0,0 +1,113 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from threading import Lock
+
+from lollypop.logger import Logger
+
+
+class SurfaceCache:
+    """
+        Byte bounded LRU cache for cairo surfaces
+        Surfaces are stored by (cache name, size, scale)
+    """
+    # Log statistics every 500 lookups
+    __LOG_INTERVAL = 500
+
+    def __init__(self, max_bytes):
+        """
+            Init cache
+            @param max_bytes as int
+        """
+        self.__max_bytes = max_bytes
+        self.__bytes = 0
+        self.__surfaces = OrderedDict()
+        self.__lock = Lock()
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, name, size, scale):
+        """
+            Get surface
+            @param name as str
+            @param size as int
+            @param scale as int
+            @return cairo.Surface/None
+        """
+        key = (name, size, scale)
+        with self.__lock:
+            item = self.__surfaces.get(key, None)
+            if item is None:
+                self.__misses += 1
+            else:
+                self.__surfaces.move_to_end(key)
+                self.__hits += 1
+            if (self.__hits + self.__misses) % self.__LOG_INTERVAL == 0:
+                Logger.debug("SurfaceCache::get(): %s" % self.get_stats())
+        return None if item is None else item[0]
+
+    def add(self, name, size, scale, surface):
+        """
+            Store surface
+            @param name as str
+            @param size as int
+            @param scale as int
+            @param surface as cairo.Surface
+        """
+        key = (name, size, scale)
+        try:
+            length = surface.get_stride() * surface.get_height()
+        except Exception as e:
+            Logger.error("SurfaceCache::add(): %s" % e)
+            return
+        if length > self.__max_bytes:
+            return
+        with self.__lock:
+            old = self.__surfaces.pop(key, None)
+            if old is not None:
+                self.__bytes -= old[1]
+            self.__surfaces[key] = (surface, length)
+            self.__bytes += length
+            while self.__bytes > self.__max_bytes:
+                (key, (surface, length)) = self.__surfaces.popitem(last=False)
+                self.__bytes -= length
+
+    def invalidate(self, name):
+        """
+            Drop surfaces for name, all sizes
+            @param name as str
+        """
+        with self.__lock:
+            for key in [key for key in self.__surfaces.keys()
+                        if key[0] == name]:
+                (surface, length) = self.__surfaces.pop(key)
+                self.__bytes -= length
+            Logger.debug("SurfaceCache::invalidate(): %s" % self.get_stats())
+
+    def clear(self):
+        """
+            Drop all surfaces
+        """
+        with self.__lock:
+            self.__surfaces = OrderedDict()
+            self.__bytes = 0
+
+    def get_stats(self):
+        """
+            Get cache statistics
+            @return {str: int}
+        """
+        return {"surfaces": len(self.__surfaces),
+                "bytes": self.__bytes,
+                "hits": self.__hits,
+                "misses": self.__misses}
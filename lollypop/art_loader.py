@@ -0,0 +1,135 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+from threading import Thread, Lock, Condition
+
+from lollypop.tagreader import Discoverer
+from lollypop.logger import Logger
+
+
+class ArtLoader:
+    """
+        Decode artworks with a pool of worker threads
+        Requests for the same key are coalesced in one job
+        Last requests are handled first: they are for visible widgets
+    """
+    __WORKERS = 2
+
+    def __init__(self):
+        """
+            Init loader
+        """
+        self.__lock = Lock()
+        self.__condition = Condition(self.__lock)
+        # Pending and running jobs by key
+        self.__jobs = {}
+        # Pending keys, last is next
+        self.__queue = []
+        self.__threads = []
+
+    def load(self, key, loader, finish, callback, cancellable, *args):
+        """
+            Run loader(discoverer) in a worker, then finish(result) and
+            callback(value, *args) in main loop
+            @param key as object
+            @param loader as function
+            @param finish as function
+            @param callback as function
+            @param cancellable as Gio.Cancellable/None
+            @thread main
+        """
+        waiter = (callback, cancellable, args)
+        with self.__lock:
+            job = self.__jobs.get(key, None)
+            if job is not None:
+                job["waiters"].append(waiter)
+                # Move pending job to front
+                if key in self.__queue:
+                    self.__queue.remove(key)
+                    self.__queue.append(key)
+                return
+            self.__jobs[key] = {"loader": loader,
+                                "finish": finish,
+                                "waiters": [waiter]}
+            self.__queue.append(key)
+            if len(self.__threads) < self.__WORKERS:
+                thread = Thread(target=self.__run)
+                thread.daemon = True
+                self.__threads.append(thread)
+                thread.start()
+            else:
+                self.__condition.notify()
+
+#######################
+# PRIVATE             #
+#######################
+    def __is_cancelled(self, job):
+        """
+            True if all waiters are cancelled
+            @param job as {}
+            @return bool
+        """
+        for (callback, cancellable, args) in job["waiters"]:
+            if cancellable is None or not cancellable.is_cancelled():
+                return False
+        return True
+
+    def __get_next(self):
+        """
+            Wait for a job to run, drop cancelled jobs
+            @return (key as object, job as {})
+        """
+        with self.__lock:
+            while True:
+                while not self.__queue:
+                    self.__condition.wait()
+                key = self.__queue.pop(-1)
+                job = self.__jobs[key]
+                if self.__is_cancelled(job):
+                    del self.__jobs[key]
+                    continue
+                return (key, job)
+
+    def __run(self):
+        """
+            Run jobs
+            @thread safe
+        """
+        # Discoverer is not thread safe, one by worker
+        discoverer = Discoverer()
+        while True:
+            (key, job) = self.__get_next()
+            result = None
+            try:
+                result = job["loader"](discoverer)
+            except Exception as e:
+                Logger.error("ArtLoader::__run(): %s" % e)
+            GLib.idle_add(self.__on_loaded, key, result)
+
+    def __on_loaded(self, key, result):
+        """
+            Call waiters callbacks
+            @param key as object
+            @param result as object
+        """
+        with self.__lock:
+            job = self.__jobs.pop(key)
+        waiters = [(callback, args)
+                   for (callback, cancellable, args) in job["waiters"]
+                   if cancellable is None or not cancellable.is_cancelled()]
+        if not waiters:
+            return
+        value = job["finish"](result)
+        for (callback, args) in waiters:
+            callback(value, *args)
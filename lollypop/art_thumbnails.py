@@ -0,0 +1,325 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib, Gio, GdkPixbuf
+
+import os
+import re
+import mmap
+import struct
+from threading import Lock
+
+from lollypop.logger import Logger
+
+
+class ThumbnailAtlas:
+    """
+        Raw pixbufs for one size packed in a data file
+        An index file records (name, offset, length, width, height,
+        rowstride, alpha) for each thumbnail. It is an append only log,
+        an offset of -1 removes the name. Index is loaded in memory and
+        data file is memory mapped
+    """
+    __RECORD = struct.Struct("<HqIIIIB")
+    # Compact data file when dead bytes are over this and live bytes
+    __COMPACT_BYTES = 4 * 1024 * 1024
+
+    def __init__(self, path):
+        """
+            Init atlas, compact it if needed
+            @param path as str (without extension)
+        """
+        self.__data_path = path + ".data"
+        self.__index_path = path + ".index"
+        self.__lock = Lock()
+        self.__map = None
+        self.__entries = {}
+        self.__load()
+        self.__data = open(self.__data_path, "ab")
+        self.__index = open(self.__index_path, "ab")
+
+    def get(self, name):
+        """
+            Get pixbuf for name
+            @param name as str
+            @return GdkPixbuf.Pixbuf/None
+        """
+        with self.__lock:
+            entry = self.__entries.get(name, None)
+            if entry is None:
+                return None
+            (offset, length, width, height, rowstride, alpha) = entry
+            if self.__map is None or len(self.__map) < offset + length:
+                self.__remap()
+            data = self.__map[offset:offset + length]
+        return GdkPixbuf.Pixbuf.new_from_bytes(GLib.Bytes.new(data),
+                                               GdkPixbuf.Colorspace.RGB,
+                                               alpha,
+                                               8,
+                                               width,
+                                               height,
+                                               rowstride)
+
+    def add(self, name, pixbuf):
+        """
+            Store pixbuf for name
+            @param name as str
+            @param pixbuf as GdkPixbuf.Pixbuf
+        """
+        data = pixbuf.read_pixel_bytes().get_data()
+        entry = (len(data), pixbuf.get_width(), pixbuf.get_height(),
+                 pixbuf.get_rowstride(), pixbuf.get_has_alpha())
+        with self.__lock:
+            offset = self.__data.seek(0, os.SEEK_END)
+            self.__data.write(data)
+            self.__data.flush()
+            self.__entries[name] = (offset,) + entry
+            self.__write_record(self.__index, name, (offset,) + entry)
+            self.__index.flush()
+
+    def remove(self, name):
+        """
+            Remove pixbuf for name
+            @param name as str
+        """
+        with self.__lock:
+            if self.__entries.pop(name, None) is not None:
+                self.__write_record(self.__index, name,
+                                    (-1, 0, 0, 0, 0, False))
+                self.__index.flush()
+
+    def close(self):
+        """
+            Close files
+        """
+        with self.__lock:
+            if self.__map is not None:
+                self.__map.close()
+                self.__map = None
+            self.__data.close()
+            self.__index.close()
+
+    @property
+    def count(self):
+        """
+            Thumbnails count
+            @return int
+        """
+        return len(self.__entries)
+
+#######################
+# PRIVATE             #
+#######################
+    def __remap(self):
+        """
+            Map data file again, it grew
+        """
+        if self.__map is not None:
+            self.__map.close()
+            self.__map = None
+        with open(self.__data_path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __write_record(self, f, name, entry):
+        """
+            Write index record
+            @param f as file
+            @param name as str
+            @param entry as (int, int, int, int, int, bool)
+        """
+        encoded = name.encode("utf-8")
+        f.write(self.__RECORD.pack(len(encoded), *entry) + encoded)
+
+    def __load(self):
+        """
+            Load index, drop truncated records
+        """
+        try:
+            size = os.path.getsize(self.__data_path)
+            with open(self.__index_path, "rb") as f:
+                index = f.read()
+        except OSError:
+            size = 0
+            index = b""
+        position = 0
+        while position + self.__RECORD.size <= len(index):
+            (name_length, offset, length, width, height, rowstride, alpha) =\
+                self.__RECORD.unpack_from(index, position)
+            start = position + self.__RECORD.size
+            if start + name_length > len(index):
+                break
+            name = index[start:start + name_length].decode("utf-8")
+            position = start + name_length
+            if offset == -1:
+                self.__entries.pop(name, None)
+            elif offset + length <= size:
+                self.__entries[name] = (offset, length, width,
+                                        height, rowstride, bool(alpha))
+        live = sum([entry[1] for entry in self.__entries.values()])
+        if size - live > max(live, self.__COMPACT_BYTES) or\
+                position != len(index):
+            self.__compact()
+
+    def __compact(self):
+        """
+            Rewrite data and index files with live thumbnails only
+        """
+        entries = {}
+        try:
+            with open(self.__data_path, "rb") as src:
+                with open(self.__data_path + ".tmp", "wb") as data:
+                    with open(self.__index_path + ".tmp", "wb") as index:
+                        for (name, entry) in self.__entries.items():
+                            src.seek(entry[0])
+                            offset = data.tell()
+                            data.write(src.read(entry[1]))
+                            entries[name] = (offset,) + entry[1:]
+                            self.__write_record(index, name,
+                                                entries[name])
+            os.replace(self.__data_path + ".tmp", self.__data_path)
+            os.replace(self.__index_path + ".tmp", self.__index_path)
+            self.__entries = entries
+        except Exception as e:
+            Logger.error("ThumbnailAtlas::__compact(): %s" % e)
+            # Start from scratch
+            self.__entries = {}
+            for path in [self.__data_path, self.__index_path]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+class ThumbnailStore:
+    """
+        Thumbnails stored by cache name, one atlas by pixel size
+    """
+    __OLD_CACHE = re.compile(r"^(.*)_([0-9]+)\.jpg$")
+
+    def __init__(self, path):
+        """
+            Init store
+            @param path as str
+        """
+        self.__path = path
+        self.__lock = Lock()
+        self.__atlases = {}
+
+    def get(self, name, size):
+        """
+            Get pixbuf
+            @param name as str
+            @param size as int
+            @return GdkPixbuf.Pixbuf/None
+        """
+        atlas = self.__get_atlas(size, False)
+        if atlas is None:
+            return None
+        return atlas.get(name)
+
+    def add(self, name, size, pixbuf):
+        """
+            Store pixbuf
+            @param name as str
+            @param size as int
+            @param pixbuf as GdkPixbuf.Pixbuf
+        """
+        try:
+            self.__get_atlas(size, True).add(name, pixbuf)
+        except Exception as e:
+            Logger.error("ThumbnailStore::add(): %s" % e)
+
+    def remove(self, name):
+        """
+            Remove pixbufs for name, all sizes
+            @param name as str
+        """
+        for size in self.get_sizes():
+            atlas = self.__get_atlas(size, False)
+            if atlas is not None:
+                atlas.remove(name)
+
+    def get_sizes(self):
+        """
+            Get stored sizes
+            @return [int]
+        """
+        sizes = set()
+        try:
+            for filename in os.listdir(self.__path):
+                if filename.startswith("thumbnails_") and\
+                        filename.endswith(".index"):
+                    sizes.add(int(filename[11:-6]))
+        except Exception as e:
+            Logger.error("ThumbnailStore::get_sizes(): %s" % e)
+        with self.__lock:
+            return list(sizes | set(self.__atlases.keys()))
+
+    def clear(self):
+        """
+            Close all atlases, files are kept
+        """
+        with self.__lock:
+            for atlas in self.__atlases.values():
+                atlas.close()
+            self.__atlases = {}
+
+    def migrate(self):
+        """
+            Move JPEG files from old cache to atlases, only once
+            @thread safe
+        """
+        marker = Gio.File.new_for_path("%s/thumbnails.migrated" % self.__path)
+        if marker.query_exists():
+            return
+        try:
+            d = Gio.File.new_for_path(self.__path)
+            infos = d.enumerate_children(
+                "standard::name",
+                Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                None)
+            count = 0
+            for info in infos:
+                match = self.__OLD_CACHE.match(info.get_name())
+                # Default icons are still cached as files
+                if match is None or match.group(1).endswith("-symbolic"):
+                    continue
+                f = infos.get_child(info)
+                try:
+                    pixbuf = GdkPixbuf.Pixbuf.new_from_file(f.get_path())
+                    self.add(match.group(1), int(match.group(2)), pixbuf)
+                    count += 1
+                except Exception as e:
+                    Logger.warning("ThumbnailStore::migrate(): %s" % e)
+                f.delete()
+            marker.create(Gio.FileCreateFlags.NONE, None).close()
+            Logger.info("ThumbnailStore::migrate(): %s thumbnails" % count)
+        except Exception as e:
+            Logger.error("ThumbnailStore::migrate(): %s" % e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_atlas(self, size, create):
+        """
+            Get atlas for size
+            @param size as int
+            @param create as bool
+            @return ThumbnailAtlas/None
+        """
+        with self.__lock:
+            atlas = self.__atlases.get(size, None)
+            if atlas is None:
+                path = "%s/thumbnails_%s" % (self.__path, size)
+                if not create and not os.path.exists(path + ".index"):
+                    return None
+                atlas = ThumbnailAtlas(path)
+                self.__atlases[size] = atlas
+            return atlas
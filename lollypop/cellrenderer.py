@@ -28,9 +28,22 @@ class CellRendererAlbum(Gtk.CellRenderer):
     def do_render(self, ctx, widget, background_area, cell_area, flags):
         if self.album == Type.NONE:
             return
-        surface = App().art.get_album_artwork(Album(self.album),
+        album = Album(self.album)
+        scale = widget.get_scale_factor()
+        surface = App().art.get_album_artwork_cached(album,
+                                                     ArtSize.MEDIUM,
+                                                     scale)
+        # Placeholder until artwork is loaded
+        if surface is None:
+            App().art.get_album_artwork_async(album,
                                               ArtSize.MEDIUM,
-                                              widget.get_scale_factor())
+                                              scale,
+                                              self.__on_album_artwork,
+                                              None,
+                                              widget)
+            surface = App().art.get_default_icon("folder-music-symbolic",
+                                                 ArtSize.MEDIUM * scale,
+                                                 scale)
         width = surface.get_width()
         height = surface.get_height()
         # If cover smaller than wanted size, translate
@@ -68,6 +81,17 @@ class CellRendererAlbum(Gtk.CellRenderer):
     def do_get_preferred_height(self, widget):
         return self.do_get_preferred_width(widget)
 
+#######################
+# PRIVATE             #
+#######################
+    def __on_album_artwork(self, surface, widget):
+        """
+            Redraw widget with loaded artwork
+            @param surface as cairo.Surface
+            @param widget as Gtk.Widget
+        """
+        widget.queue_draw()
+
 
 class CellRendererArtist(Gtk.CellRendererText):
     rowid = GObject.Property(type=int)
@@ -13,18 +13,23 @@
 # (ↄ)2018 Some changes made by Francisco José Rodríguez Bogado <bogado@qinn.es>
 
 from gettext import gettext as _
-from threading import Thread
+from os import cpu_count
+from queue import Queue, Empty
+from threading import Thread, Condition, Event
 from time import time
 
 from gi.repository import Gio, GLib, GObject
+from lollypop.database_directories import DirectoriesDatabase
 from lollypop.database_history import History
+from lollypop.database_ingest import DatabaseIngest
+from lollypop.database_purge import DatabasePurge
 from lollypop.define import App, Type
 from lollypop.inotify import Inotify
 from lollypop.logger import Logger
 from lollypop.objects import Album, Track
 from lollypop.sqlcursor import SqlCursor
-from lollypop.tagreader import TagReader
-from lollypop.utils import is_audio, is_pls
+from lollypop.tagreader import TagReader, Discoverer
+from lollypop.utils import is_audio, is_pls, get_mtime
 
 
 class CollectionScanner(GObject.GObject, TagReader):
@@ -37,6 +42,12 @@ class CollectionScanner(GObject.GObject, TagReader):
         "genre-updated": (GObject.SignalFlags.RUN_FIRST, None, (int, bool)),
         "album-updated": (GObject.SignalFlags.RUN_FIRST, None, (int, bool))
     }
+    __ATTRIBUTES = "standard::name,standard::type,standard::is-hidden,"\
+                   "standard::content-type,time::changed,time::modified,"\
+                   "time::modified-usec"
+    # With WAL, other writers wait for scanner transaction: commit at least
+    # every 0.5 second, not only every ingest batch
+    __COMMIT_INTERVAL = 0.5
 
     def __init__(self):
         """
@@ -47,28 +58,44 @@ class CollectionScanner(GObject.GObject, TagReader):
 
         self.__thread = None
         self.__history = None
+        self.__ingest = DatabaseIngest()
+        self.__directories = DirectoriesDatabase()
+        self.__full = False
+        self.__pending_signals = []
+        self.__no_artist_album_ids = set()
+        self.__committed = 0
         self.__disable_compilations = True
+        self.__workers = 1
         if App().settings.get_value("auto-update"):
             self.__inotify = Inotify()
         else:
             self.__inotify = None
         App().albums.update_max_count()
 
-    def update(self, uris=[], saved=True):
+    def update(self, uris=[], saved=True, full=False):
         """
             Update database
-            @param uris as [str]
+            @param uris as [str], only update tracks below those uris
             @param saved as bool
+            @param full as bool, walk all directories, even unchanged ones
         """
+        # Kept until a scan completes
+        if full:
+            self.__full = True
         # Stop previous scan
         if self.is_locked():
             self.stop()
-            GLib.timeout_add(250, self.update)
+            GLib.timeout_add(250, self.update, uris, saved)
         else:
             self.__disable_compilations = not App().settings.get_value(
                 "show-compilations")
+            workers = App().settings.get_value("scan-workers").get_int32()
+            if workers <= 0:
+                workers = cpu_count() or 1
+            self.__workers = workers
 
-            if not uris:
+            collection = not uris
+            if collection:
                 uris = App().settings.get_music_uris()
                 if not uris:
                     return
@@ -76,7 +103,8 @@ class CollectionScanner(GObject.GObject, TagReader):
             App().window.container.progress.add(self)
             App().window.container.progress.set_fraction(0.0, self)
 
-            self.__thread = Thread(target=self.__scan, args=(uris, saved))
+            self.__thread = Thread(target=self.__scan,
+                                   args=(uris, saved, collection))
             self.__thread.daemon = True
             self.__thread.start()
 
@@ -95,14 +123,29 @@ class CollectionScanner(GObject.GObject, TagReader):
 #######################
 # PRIVATE             #
 #######################
-    def __get_objects_for_uris(self, uris):
+    def __get_objects_for_uris(self, uris, full, known_uris):
         """
             Return all tracks/dirs for uris
+            Directories unchanged since last scan are not enumerated,
+            their tracks are taken from database
             @param uris as string
-            @return (track uri as [str], track dirs as [str])
+            @param full as bool, enumerate all directories
+            @param known_uris as {str}, tracks in database
+            @return (tracks as {uri as str: mtime as int/None},
+                     track dirs as [str],
+                     manifest as {uri as str: (mtime as int, count as int)})
+            mtime is None for tracks in unchanged directories
         """
-        tracks = []
-        files = []
+        manifest = {} if full else self.__directories.get()
+        # Subdirectories and tracks we already know, by parent
+        known_dirs = {}
+        for uri in manifest.keys():
+            known_dirs.setdefault(uri.rsplit("/", 1)[0], []).append(uri)
+        known_tracks = {}
+        for uri in known_uris:
+            known_tracks.setdefault(uri.rsplit("/", 1)[0], []).append(uri)
+        new_manifest = {}
+        tracks = {}
         track_dirs = []
         walk_uris = list(uris)
         while walk_uris:
@@ -110,45 +153,77 @@ class CollectionScanner(GObject.GObject, TagReader):
             try:
                 # Directly add files, walk through directories
                 f = Gio.File.new_for_uri(uri)
-                info = f.query_info(
-                    "standard::name,standard::type,standard::is-hidden",
-                    Gio.FileQueryInfoFlags.NONE,
-                    None)
-                if info.get_file_type() == Gio.FileType.DIRECTORY:
-                    track_dirs.append(uri)
-                    infos = f.enumerate_children(
-                        "standard::name,standard::type,standard::is-hidden",
-                        Gio.FileQueryInfoFlags.NONE,
-                        None)
-                    for info in infos:
-                        f = infos.get_child(info)
-                        child_uri = f.get_uri()
-                        if info.get_is_hidden():
-                            continue
-                        elif info.get_file_type() == Gio.FileType.DIRECTORY:
-                            track_dirs.append(child_uri)
-                            walk_uris.append(child_uri)
-                        else:
-                            files.append(f)
-                else:
-                    files.append(f)
-            except Exception as e:
-                Logger.error("""CollectionScanner::
-                             __get_objects_for_uris(): %s""" % e)
-                return ([], [])
-        for f in files:
-            try:
-                if is_pls(f):
-                    App().playlists.import_tracks(f)
-                elif is_audio(f):
-                    tracks.append(f.get_uri())
-                else:
-                    Logger.debug("""%s not detected
-                                 as a music file""" % f.get_uri())
+                try:
+                    info = f.query_info(self.__ATTRIBUTES,
+                                        Gio.FileQueryInfoFlags.NONE,
+                                        None)
+                except GLib.Error as e:
+                    # Removed since, its tracks will be deleted
+                    if e.matches(Gio.io_error_quark(),
+                                 Gio.IOErrorEnum.NOT_FOUND):
+                        continue
+                    raise e
+                if info.get_file_type() != Gio.FileType.DIRECTORY:
+                    self.__add_object(f, info, tracks)
+                    continue
+                uri = f.get_uri()
+                track_dirs.append(uri)
+                mtime = get_mtime(info)
+                subdirs = known_dirs.get(uri, [])
+                files = known_tracks.get(uri, [])
+                if manifest.get(uri, None) ==\
+                        (mtime, len(subdirs) + len(files)):
+                    new_manifest[uri] = manifest[uri]
+                    walk_uris += subdirs
+                    for track_uri in files:
+                        tracks[track_uri] = None
+                    continue
+                count = 0
+                infos = f.enumerate_children(self.__ATTRIBUTES,
+                                             Gio.FileQueryInfoFlags.NONE,
+                                             None)
+                for info in infos:
+                    f = infos.get_child(info)
+                    if info.get_is_hidden():
+                        continue
+                    elif info.get_file_type() == Gio.FileType.DIRECTORY:
+                        walk_uris.append(f.get_uri())
+                        count += 1
+                    elif self.__add_object(f, info, tracks):
+                        count += 1
+                new_manifest[uri] = (mtime, count)
             except Exception as e:
                 Logger.error("""CollectionScanner::
                              __get_objects_for_uris(): %s""" % e)
-        return (tracks, track_dirs)
+                return ({}, [], {})
+        return (tracks, track_dirs, new_manifest)
+
+    def __add_object(self, f, info, tracks):
+        """
+            Import playlist or add track uri and mtime to tracks
+            @param f as Gio.File
+            @param info as Gio.FileInfo
+            @param tracks as {uri as str: mtime as int}
+            @return True if f is a track
+        """
+        try:
+            if is_pls(f, info):
+                App().playlists.import_tracks(f)
+            elif is_audio(f, info):
+                # We do not use time::modified because many tag editors
+                # just preserve this setting
+                mtime = info.get_attribute_as_string("time::changed")
+                # Fallback for remote fs
+                if mtime is None:
+                    mtime = info.get_attribute_as_string("time::modified")
+                tracks[f.get_uri()] = int(mtime)
+                return True
+            else:
+                Logger.debug("""%s not detected
+                             as a music file""" % f.get_uri())
+        except Exception as e:
+            Logger.error("CollectionScanner::__add_object(): %s" % e)
+        return False
 
     def __update_progress(self, current, total):
         """
@@ -165,58 +240,67 @@ class CollectionScanner(GObject.GObject, TagReader):
         App().window.container.progress.set_fraction(1.0, self)
         self.stop()
         self.emit("scan-finished", modifications)
+        Logger.debug("CollectionScanner::__finish(): %s" %
+                     App().db.get_stats())
+        if self.__inotify is not None:
+            Logger.debug("CollectionScanner::__finish(): %s" %
+                         self.__inotify.get_stats())
         # Update max count value
         App().albums.update_max_count()
         if App().settings.get_value("artist-artwork"):
             App().art.cache_artists_info()
 
-    def __scan(self, uris, saved):
+    def __scan(self, uris, saved, collection):
         """
             Scan music collection for music files
             @param uris as [str]
             @param saved as bool
+            @param collection as bool, uris are collection uris
             @thread safe
         """
         modifications = False
         if self.__history is None:
             self.__history = History()
+        full = self.__full
         mtimes = App().tracks.get_mtimes()
-        (new_tracks, new_dirs) = self.__get_objects_for_uris(uris)
-        orig_tracks = App().tracks.get_uris()
-        was_empty = len(orig_tracks) == 0
+        # First scan if collection is empty, not only below uris
+        was_empty = not mtimes
+        # Only tracks below uris may be updated or deleted
+        if not collection:
+            scanned = set(uris)
+            prefixes = tuple(uri.rstrip("/") + "/" for uri in uris)
+            mtimes = {uri: mtime for (uri, mtime) in mtimes.items()
+                      if uri in scanned or uri.startswith(prefixes)}
+        orig_tracks = set(mtimes.keys())
+        (new_tracks, new_dirs, manifest) = self.__get_objects_for_uris(
+            uris, full, orig_tracks)
 
         count = len(new_tracks) + len(orig_tracks)
-        # Add monitors on dirs
+        # Watch or poll dirs
         if self.__inotify is not None:
-            for d in new_dirs:
-                if d.startswith("file://"):
-                    self.__inotify.add_monitor(d)
+            directories = {uri: mtime for (uri, (mtime, count))
+                           in manifest.items() if uri.startswith("file://")}
+            if collection:
+                GLib.idle_add(self.__inotify.set_directories, directories)
+            else:
+                GLib.idle_add(self.__inotify.add_directories, directories)
 
         i = 0
         # Look for new files/modified files
         try:
             to_add = []
+            to_delete = []
             SqlCursor.add(App().db)
-            for uri in new_tracks:
+            for (uri, mtime) in new_tracks.items():
                 if self.__thread is None:
                     return
                 try:
+                    # In an unchanged directory
+                    if mtime is None:
+                        orig_tracks.discard(uri)
+                        i += 2
+                        continue
                     GLib.idle_add(self.__update_progress, i, count)
-                    f = Gio.File.new_for_uri(uri)
-                    # We do not use time::modified because many tag editors
-                    # just preserve this setting
-                    try:
-                        info = f.query_info("time::changed",
-                                            Gio.FileQueryInfoFlags.NONE,
-                                            None)
-                        mtime = int(info.get_attribute_as_string(
-                            "time::changed"))
-                    except:  # Fallback for remote fs
-                        info = f.query_info("time::modified",
-                                            Gio.FileQueryInfoFlags.NONE,
-                                            None)
-                        mtime = int(info.get_attribute_as_string(
-                            "time::modified"))
                     # If songs exists and mtime unchanged, continue,
                     # else rescan
                     if uri in orig_tracks:
@@ -226,8 +310,7 @@ class CollectionScanner(GObject.GObject, TagReader):
                             i += 1
                             continue
                         else:
-                            SqlCursor.allow_thread_execution(App().db)
-                            self.__del_from_db(uri)
+                            to_delete.append(uri)
                     # If not saved, use 0 as mtime, easy delete on quit
                     if not saved:
                         mtime = 0
@@ -244,21 +327,42 @@ class CollectionScanner(GObject.GObject, TagReader):
             # Now because we need to populate history
             # Only if we are saving
             if saved:
-                for uri in orig_tracks:
-                    i += 1
-                    GLib.idle_add(self.__update_progress, i, count)
-                    self.__del_from_db(uri)
-            # Add files to db
-            for (uri, mtime) in to_add:
+                i += len(orig_tracks)
+                self.__del_from_db(to_delete + list(orig_tracks))
+                GLib.idle_add(self.__update_progress, i, count)
+                SqlCursor.commit(App().db)
+                SqlCursor.allow_thread_execution(App().db)
+            # Add files to db, tags are read by a pool of discoverers
+            # and tracks are written by batches
+            self.__ingest.seed()
+            self.__committed = time()
+            for (uri, mtime, info) in self.__get_infos(to_add):
                 try:
                     Logger.debug("Adding file: %s" % uri)
                     i += 1
                     GLib.idle_add(self.__update_progress, i, count)
-                    self.__add2db(uri, mtime)
-                    SqlCursor.allow_thread_execution(App().db)
+                    if isinstance(info, Exception):
+                        raise info
+                    self.__add2db(uri, mtime, info)
+                    if self.__ingest.full or time() - self.__committed >\
+                            self.__COMMIT_INTERVAL:
+                        self.__flush()
+                        SqlCursor.allow_thread_execution(App().db)
                 except Exception as e:
                     Logger.error("CollectionScanner::__scan(add): %s, %s" %
                                  (e, uri))
+            self.__flush()
+            # Sort keys for new albums and artists
+            App().albums.update_sortkeys()
+            App().artists.update_sortkeys()
+            # Scan completed, save manifest for next scan
+            if saved and self.__thread is not None:
+                if collection:
+                    self.__directories.set(manifest)
+                    self.__full = False
+                else:
+                    self.__directories.update(manifest)
+                SqlCursor.commit(App().db)
             SqlCursor.remove(App().db)
         except Exception as e:
             Logger.error("CollectionScanner::__scan(): %s" % e)
@@ -268,18 +372,82 @@ class CollectionScanner(GObject.GObject, TagReader):
         del self.__history
         self.__history = None
 
+    def __get_infos(self, to_add):
+        """
+            Read tags for files with a pool of discoverers
+            Results are yielded in to_add order
+            @param to_add as [(str, int)]
+            @return generator of (uri as str, mtime as int,
+                                  info as GstPbutils.DiscovererInfo/Exception)
+            @thread safe
+        """
+        if not to_add:
+            return
+        todo = Queue()
+        for (index, (uri, mtime)) in enumerate(to_add):
+            todo.put((index, uri))
+        # Do not let workers read too far ahead of the db writer
+        window = self.__workers * 4
+        results = {}
+        condition = Condition()
+        stopped = Event()
+        current = [0]
+
+        def read_tags():
+            discoverer = Discoverer()
+            while not stopped.is_set():
+                try:
+                    (index, uri) = todo.get_nowait()
+                except Empty:
+                    return
+                with condition:
+                    while index >= current[0] + window and\
+                            not stopped.is_set():
+                        condition.wait()
+                try:
+                    info = discoverer.get_info(uri)
+                except Exception as e:
+                    info = e
+                with condition:
+                    results[index] = info
+                    condition.notify_all()
+
+        workers = min(self.__workers, len(to_add))
+        Logger.debug("CollectionScanner::__get_infos(): %s workers" % workers)
+        for i in range(0, workers):
+            thread = Thread(target=read_tags)
+            thread.daemon = True
+            thread.start()
+        try:
+            for (index, (uri, mtime)) in enumerate(to_add):
+                with condition:
+                    while index not in results:
+                        if self.__thread is None:
+                            return
+                        condition.wait(1)
+                    info = results.pop(index)
+                    current[0] = index + 1
+                    condition.notify_all()
+                yield (uri, mtime, info)
+        finally:
+            with condition:
+                stopped.set()
+                condition.notify_all()
+
     # pylint: disable=too-many-statements,too-many-locals
-    def __add2db(self, uri, mtime):
+    def __add2db(self, uri, mtime, info=None):
         """
             Add new file to db with information
             @param uri as string
             @param mtime as int
+            @param info as GstPbutils.DiscovererInfo
             @return track id as int
             @warning, be sure SqlCursor is available for App().db
         """
         fgio = Gio.File.new_for_uri(uri)
-        Logger.debug("CollectionScanner::add2db(): Read tags")
-        info = self.get_info(uri)
+        if info is None:
+            Logger.debug("CollectionScanner::add2db(): Read tags")
+            info = self.get_info(uri)
         tags = info.get_tags()
         name = fgio.get_basename()
         title = self.get_title(tags, name)
@@ -299,6 +467,8 @@ class CollectionScanner(GObject.GObject, TagReader):
         year = self.get_original_year(tags)
         if year is None:
             year = self.get_year(tags)
+        # Remember embedded artwork while tags are loaded
+        artwork = self.get_artwork_sample(tags) is not None
         duration = int(info.get_duration() / 1000000000)
 
         # If no artists tag, use album artist
@@ -323,12 +493,13 @@ class CollectionScanner(GObject.GObject, TagReader):
             album_mtime = mtime
 
         Logger.debug("CollectionScanner::add2db(): Add artists %s" % artists)
-        artist_ids = self.add_artists(artists, a_sortnames)
+        artist_ids = self.add_artists(artists, a_sortnames, self.__ingest)
 
         Logger.debug("CollectionScanner::add2db(): "
                      "Add album artists %s" % album_artists)
         (album_artist_ids,
-         new_artist_ids) = self.add_album_artists(album_artists, aa_sortnames)
+         new_artist_ids) = self.add_album_artists(album_artists, aa_sortnames,
+                                                  self.__ingest)
 
         # User does not want compilations
         if self.__disable_compilations and not album_artist_ids:
@@ -352,126 +523,95 @@ class CollectionScanner(GObject.GObject, TagReader):
         (album_id, new_album) = self.add_album(album_name, mb_album_id,
                                                album_artist_ids,
                                                uri, loved, album_pop,
-                                               album_rate, mtime)
+                                               album_rate, mtime,
+                                               self.__ingest)
 
         (genre_ids,
-         new_genre_ids) = self.add_genres(genres)
+         new_genre_ids) = self.add_genres(genres, self.__ingest)
 
-        # Add track to db
+        # Add track to db, written on next flush
         Logger.debug("CollectionScanner::add2db(): Add track")
-        track_id = App().tracks.add(title, uri, duration,
-                                    tracknumber, discnumber, discname,
-                                    album_id, year, track_pop, track_rate,
-                                    track_ltime, mtime, mb_track_id)
-
-        Logger.debug("CollectionScanner::add2db(): Update track")
-        self.__update_track(track_id, artist_ids, genre_ids)
-        Logger.debug("CollectionScanner::add2db(): Update album")
-        self.__update_album(album_id, album_artist_ids, genre_ids, year)
-        if new_album:
-            SqlCursor.commit(App().db)
+        track_id = self.__ingest.add_track(title, uri, duration,
+                                           tracknumber, discnumber, discname,
+                                           album_id, year, track_pop,
+                                           track_rate, track_ltime, mtime,
+                                           mb_track_id, artwork, artist_ids,
+                                           genre_ids)
+        if not album_artist_ids:
+            self.__no_artist_album_ids.add(album_id)
+        # Notify UI once committed
         for genre_id in new_genre_ids:
-            GLib.idle_add(self.emit, "genre-updated", genre_id, True)
+            self.__pending_signals.append(("genre-updated", genre_id, True))
         for artist_id in new_artist_ids:
-            GLib.idle_add(self.emit, "artist-updated", artist_id, True)
+            self.__pending_signals.append(("artist-updated", artist_id, True))
         return track_id
 
-    def __del_from_db(self, uri):
+    def __del_from_db(self, uris):
         """
-            Delete track from db
-            @param uri as str
+            Delete tracks from db, save their stats in history
+            @param uris as [str]
+            @warning, be sure SqlCursor is available for App().db
         """
         try:
-            f = Gio.File.new_for_uri(uri)
-            name = f.get_basename()
-            track_id = App().tracks.get_id_by_uri(uri)
-            album_id = App().tracks.get_album_id(track_id)
-            genre_ids = App().tracks.get_genre_ids(track_id)
-            album_artist_ids = App().albums.get_artist_ids(album_id)
-            artist_ids = App().tracks.get_artist_ids(track_id)
-            popularity = App().tracks.get_popularity(track_id)
-            rate = App().tracks.get_rate(track_id)
-            ltime = App().tracks.get_ltime(track_id)
-            mtime = App().tracks.get_mtime(track_id)
-            duration = App().tracks.get_duration(track_id)
-            album_popularity = App().albums.get_popularity(album_id)
-            album_rate = App().albums.get_rate(album_id)
-            loved = App().albums.get_loved(album_id)
-            uri = App().tracks.get_uri(track_id)
-            self.__history.add(name, duration, popularity, rate,
-                               ltime, mtime, loved, album_popularity,
-                               album_rate)
-            App().tracks.remove(track_id)
-            App().tracks.clean(track_id)
-            cleaned = App().albums.clean(album_id)
-            if cleaned:
-                SqlCursor.commit(App().db)
-                GLib.idle_add(self.emit, "album-updated",
-                              album_id, True)
-            for artist_id in album_artist_ids + artist_ids:
-                cleaned = App().artists.clean(artist_id)
-                # Force update even if not cleaned as artist may
-                # have been removed from a selected genre
-                GLib.idle_add(self.emit, "artist-updated",
-                              artist_id, False)
+            if not uris:
+                return
+            purge = DatabasePurge()
+            purge.seed(uris=uris)
+            self.__history.add_many(purge.get_history())
+            purge.remove_tracks()
+            (album_ids, artist_ids, genre_ids) = purge.clean()
+            # Force update even if not cleaned as artist may
+            # have been removed from a selected genre
+            for album_id in album_ids:
+                self.__pending_signals.append(("album-updated",
+                                               album_id, True))
+            for artist_id in artist_ids:
+                self.__pending_signals.append(("artist-updated",
+                                               artist_id, False))
             for genre_id in genre_ids:
-                cleaned = App().genres.clean(genre_id)
-                if cleaned:
-                    SqlCursor.commit(App().db)
-                    GLib.idle_add(self.emit, "genre-updated",
-                                  genre_id, False)
+                self.__pending_signals.append(("genre-updated",
+                                               genre_id, False))
+            self.__flush()
         except Exception as e:
             Logger.error("CollectionScanner::__del_from_db: %s" % e)
 
-    def __update_album(self, album_id, artist_ids, genre_ids, year):
+    def __flush(self):
+        """
+            Write buffered tracks in one transaction and notify UI
+            @warning, be sure SqlCursor is available for App().db
         """
-            Set album artists
+        Logger.debug("CollectionScanner::__flush()")
+        self.__ingest.flush()
+        for album_id in self.__no_artist_album_ids:
+            self.__update_album(album_id)
+        self.__no_artist_album_ids = set()
+        SqlCursor.commit(App().db)
+        self.__committed = time()
+        for (signal, object_id, add) in self.__pending_signals:
+            GLib.idle_add(self.emit, signal, object_id, add)
+        self.__pending_signals = []
+
+    def __update_album(self, album_id):
+        """
+            Set album artists based on content
             @param album id as int
-            @param artist ids as [int]
-            @param genre ids as [int]
-            @param year as int
             @commit needed
         """
         album_artist_ids = []
         add = True
-        # Set artist ids based on content
-        if not artist_ids:
-            new_artist_ids = App().albums.calculate_artist_ids(album_id)
-            current_artist_ids = App().albums.get_artist_ids(album_id)
-            if new_artist_ids != current_artist_ids:
+        new_artist_ids = App().albums.calculate_artist_ids(album_id)
+        current_artist_ids = App().albums.get_artist_ids(album_id)
+        if new_artist_ids != current_artist_ids:
+            album_artist_ids = new_artist_ids
+            if Type.COMPILATIONS in new_artist_ids:
+                add = False
+                album_artist_ids = current_artist_ids
+            else:
                 album_artist_ids = new_artist_ids
-                if Type.COMPILATIONS in new_artist_ids:
-                    add = False
-                    album_artist_ids = current_artist_ids
-                else:
-                    album_artist_ids = new_artist_ids
-                App().albums.set_artist_ids(album_id, new_artist_ids)
+            App().albums.set_artist_ids(album_id, new_artist_ids)
         # Update UI based on previous artist calculation
         for artist_id in album_artist_ids:
-            GLib.idle_add(self.emit, "artist-updated", artist_id, add)
-        # Update album genres
-        for genre_id in genre_ids:
-            App().albums.add_genre(album_id, genre_id)
-
-        # Update year based on tracks
-        year = App().tracks.get_year_for_album(album_id)
-        App().albums.set_year(album_id, year)
-
-    def __update_track(self, track_id, artist_ids, genre_ids):
-        """
-            Set track artists/genres
-            @param track id as int
-            @param artist ids as [int]
-            @param genre ids as [int]
-            @param mtime as int
-            @param popularity as int
-            @commit needed
-        """
-        # Set artists/genres for track
-        for artist_id in artist_ids:
-            App().tracks.add_artist(track_id, artist_id)
-        for genre_id in genre_ids:
-            App().tracks.add_genre(track_id, genre_id)
+            self.__pending_signals.append(("artist-updated", artist_id, add))
 
     def __play_new_tracks(self, uris):
         """
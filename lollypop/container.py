@@ -611,6 +611,7 @@ class Container(Gtk.Overlay):
                 if artist_ids and artist_ids[0] == Type.COMPILATIONS:
                     items += App().albums.get_compilation_ids(genre_ids)
                 items += App().albums.get_ids(artist_ids, genre_ids)
+            App().albums.cache.prefetch(items)
             return [Album(album_id, genre_ids, artist_ids)
                     for album_id in items]
         self.__stop_current_view()
@@ -662,6 +663,7 @@ class Container(Gtk.Overlay):
                     items = App().albums.get_compilation_ids(genre_ids)
                 if not is_compilation:
                     items += App().albums.get_ids([], genre_ids)
+            App().albums.cache.prefetch(items)
             return [Album(album_id, genre_ids, artist_ids)
                     for album_id in items]
 
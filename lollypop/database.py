@@ -13,17 +13,51 @@
 from gi.repository import GLib, Gio
 
 import sqlite3
-from threading import Lock
+from threading import Lock, local
+from time import time
 
 from lollypop.define import App
 from lollypop.objects import Album
 from lollypop.database_upgrade import DatabaseUpgrade
+from lollypop.database_purge import DatabasePurge
 from lollypop.sqlcursor import SqlCursor
 from lollypop.logger import Logger
 from lollypop.localized import LocalizedCollation
 from lollypop.utils import noaccents
 
 
+class DatabaseLock:
+    """
+        Thread lock recording time spent waiting for it
+    """
+
+    def __init__(self):
+        """
+            Init lock
+        """
+        self.__lock = Lock()
+        self.waits = 0
+        self.wait_time = 0.0
+
+    def acquire(self):
+        """
+            Acquire lock
+        """
+        if self.__lock.acquire(False):
+            return
+        start = time()
+        self.__lock.acquire()
+        # Protected by lock
+        self.waits += 1
+        self.wait_time += time() - start
+
+    def release(self):
+        """
+            Release lock
+        """
+        self.__lock.release()
+
+
 class Database:
     """
         Base database object
@@ -46,10 +80,12 @@ class Database:
                                               rate INT NOT NULL,
                                               loved INT NOT NULL,
                                               mtime INT NOT NULL,
-                                              synced INT NOT NULL)"""
+                                              synced INT NOT NULL,
+                                              sortkey INT)"""
     __create_artists = """CREATE TABLE artists (id INTEGER PRIMARY KEY,
                                                name TEXT NOT NULL,
-                                               sortname TEXT NOT NULL)"""
+                                               sortname TEXT NOT NULL,
+                                               sortkey INT)"""
     __create_genres = """CREATE TABLE genres (id INTEGER PRIMARY KEY,
                                             name TEXT NOT NULL)"""
     __create_album_artists = """CREATE TABLE album_artists (
@@ -71,7 +107,8 @@ class Database:
                                               rate INT NOT NULL,
                                               ltime INT NOT NULL,
                                               mtime INT NOT NULL,
-                                              mb_track_id TEXT
+                                              mb_track_id TEXT,
+                                              artwork INT
                                               )"""
     __create_track_artists = """CREATE TABLE track_artists (
                                                 track_id INT NOT NULL,
@@ -79,6 +116,11 @@ class Database:
     __create_track_genres = """CREATE TABLE track_genres (
                                                 track_id INT NOT NULL,
                                                 genre_id INT NOT NULL)"""
+    __create_directories = """CREATE TABLE directories (
+                                                id INTEGER PRIMARY KEY,
+                                                uri TEXT NOT NULL,
+                                                mtime INT NOT NULL,
+                                                count INT NOT NULL)"""
     __create_album_artists_idx = """CREATE index idx_aa ON album_artists(
                                                 album_id)"""
     __create_track_artists_idx = """CREATE index idx_ta ON track_artists(
@@ -87,12 +129,51 @@ class Database:
                                                 album_id)"""
     __create_track_genres_idx = """CREATE index idx_tg ON track_genres(
                                                 track_id)"""
+    __create_directories_idx = """CREATE UNIQUE index idx_dir ON directories(
+                                                uri)"""
+    # Filters and sorts used by views
+    __create_query_idx = [
+        "CREATE index idx_ag_genre ON album_genres(genre_id, album_id)",
+        "CREATE index idx_aa_artist ON album_artists(artist_id, album_id)",
+        "CREATE index idx_tg_genre ON track_genres(genre_id, track_id)",
+        "CREATE index idx_ta_artist ON track_artists(artist_id, track_id)",
+        "CREATE index idx_tracks_album ON tracks(album_id, discnumber,\
+                                                 tracknumber)",
+        "CREATE index idx_albums_sort ON albums(sortkey)",
+        "CREATE index idx_albums_year ON albums(year, sortkey)",
+        "CREATE index idx_albums_pop ON albums(popularity DESC, sortkey)",
+        "CREATE index idx_artists_sort ON artists(sortkey)"]
+    # Full text search on names, kept in sync by triggers
+    __create_fts = ["""CREATE VIRTUAL TABLE {table}_fts USING fts5(name)""",
+                    """CREATE TRIGGER {table}_fts_insert
+                       AFTER INSERT ON {table}
+                       BEGIN
+                        INSERT INTO {table}_fts (rowid, name)
+                        VALUES (new.rowid, new.name);
+                       END""",
+                    """CREATE TRIGGER {table}_fts_delete
+                       AFTER DELETE ON {table}
+                       BEGIN
+                        DELETE FROM {table}_fts WHERE rowid=old.rowid;
+                       END""",
+                    """CREATE TRIGGER {table}_fts_update
+                       AFTER UPDATE OF name ON {table}
+                       BEGIN
+                        UPDATE {table}_fts SET name=new.name
+                        WHERE rowid=old.rowid;
+                       END"""]
 
     def __init__(self):
         """
             Create database tables or manage update if needed
         """
-        self.thread_lock = Lock()
+        self.thread_lock = DatabaseLock()
+        # One connection per thread, kept open
+        self.__pool = local()
+        self.__stats_lock = Lock()
+        self.__connections = 0
+        self.__reuses = 0
+        self.wal = False
         f = Gio.File.new_for_path(self.DB_PATH)
         upgrade = DatabaseUpgrade()
         if not f.query_exists():
@@ -110,66 +191,104 @@ class Database:
                     sql.execute(self.__create_tracks)
                     sql.execute(self.__create_track_artists)
                     sql.execute(self.__create_track_genres)
+                    sql.execute(self.__create_directories)
                     sql.execute(self.__create_album_artists_idx)
                     sql.execute(self.__create_track_artists_idx)
                     sql.execute(self.__create_album_genres_idx)
                     sql.execute(self.__create_track_genres_idx)
+                    sql.execute(self.__create_directories_idx)
+                    for request in self.__create_query_idx:
+                        sql.execute(request)
                     sql.execute("PRAGMA user_version=%s" % upgrade.version)
+                with SqlCursor(self) as sql:
+                    for table in ["tracks", "albums", "artists"]:
+                        for request in self.__create_fts:
+                            sql.execute(request.format(table=table))
             except Exception as e:
                 Logger.error("Database::__init__(): %s" % e)
         else:
             upgrade.upgrade(self)
+        # With WAL, readers do not wait for writers
+        try:
+            with SqlCursor(self) as sql:
+                result = sql.execute("PRAGMA journal_mode=WAL")
+                v = result.fetchone()
+                self.wal = v is not None and v[0] == "wal"
+        except Exception as e:
+            Logger.error("Database::__init__(): %s" % e)
 
     def get_cursor(self):
         """
-            Return a new sqlite cursor
+            Return sqlite cursor for current thread
         """
+        c = getattr(self.__pool, "connection", None)
+        if c is not None:
+            with self.__stats_lock:
+                self.__reuses += 1
+            return c
         try:
             c = sqlite3.connect(self.DB_PATH, 600.0)
             c.create_collation("LOCALIZED", LocalizedCollation())
             c.create_function("noaccents", 1, noaccents)
+            c.execute("PRAGMA synchronous=NORMAL")
+            self.__pool.connection = c
+            with self.__stats_lock:
+                self.__connections += 1
             return c
         except:
             exit(-1)
 
+    def release_cursor(self, c):
+        """
+            Give back cursor to pool
+            @param c as sqlite3.Connection
+        """
+        if c.in_transaction:
+            c.rollback()
+
+    def get_stats(self):
+        """
+            Get connection pool and lock statistics
+            @return {str: int/float}
+        """
+        with self.__stats_lock:
+            return {"connections": self.__connections,
+                    "reuses": self.__reuses,
+                    "lock_waits": self.thread_lock.waits,
+                    "lock_wait_time": self.thread_lock.wait_time}
+
     def drop_db(self):
         """
             Drop database
         """
         try:
+            c = getattr(self.__pool, "connection", None)
+            if c is not None:
+                c.close()
+                self.__pool.connection = None
             f = Gio.File.new_for_path(self.DB_PATH)
             f.trash()
+            for suffix in ["-wal", "-shm"]:
+                f = Gio.File.new_for_path(self.DB_PATH + suffix)
+                if f.query_exists():
+                    f.delete()
         except Exception as e:
-            Logger.error("Database::drop_db():", e)
+            Logger.error("Database::drop_db(): %s" % e)
 
     def del_tracks(self, track_ids):
         """
             Delete tracks from db
             @param track_ids as [int]
         """
-        all_album_ids = []
-        all_artist_ids = []
-        all_genre_ids = []
-        for track_id in track_ids:
-            album_id = App().tracks.get_album_id(track_id)
-            art_file = App().art.get_album_cache_name(Album(album_id))
-            genre_ids = App().tracks.get_genre_ids(track_id)
-            album_artist_ids = App().albums.get_artist_ids(album_id)
-            artist_ids = App().tracks.get_artist_ids(track_id)
-            uri = App().tracks.get_uri(track_id)
-            App().playlists.remove(uri)
-            App().tracks.remove(track_id)
-            App().tracks.clean(track_id)
-            all_album_ids.append(album_id)
-            all_artist_ids += album_artist_ids + artist_ids
-            all_genre_ids += genre_ids
-        for album_id in list(set(all_album_ids)):
-            if App().albums.clean(album_id):
-                App().art.clean_store(art_file)
-        for artist_id in list(set(all_artist_ids)):
-            App().artists.clean(artist_id)
-        for genre_id in list(set(all_genre_ids)):
-            App().genres.clean(genre_id)
+        purge = DatabasePurge()
+        purge.seed(track_ids)
+        App().playlists.remove_uris(purge.get_uris())
+        purge.remove_tracks()
+        art_files = [App().art.get_album_cache_name(Album(album_id))
+                     for album_id in purge.get_orphan_album_ids()]
+        purge.clean()
+        for art_file in art_files:
+            App().art.clean_store(art_file)
 
 #######################
 # PRIVATE             #
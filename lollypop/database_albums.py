@@ -14,9 +14,11 @@ from gettext import gettext as _
 import itertools
 
 from lollypop.sqlcursor import SqlCursor
+from lollypop.database_cache import RowCache
 from lollypop.define import App, Type, OrderBy
 from lollypop.logger import Logger
 from lollypop.utils import remove_static_genres, noaccents
+from lollypop.localized import sort_key
 
 
 class AlbumsDatabase:
@@ -30,6 +32,7 @@ class AlbumsDatabase:
         """
         self.__max_count = 1
         self._cached_randoms = []
+        self.cache = RowCache(self.get_rows, 2000)
 
     def add(self, album_name, mb_album_id, artist_ids,
             uri, loved, popularity, rate, mtime):
@@ -58,6 +61,7 @@ class AlbumsDatabase:
                 sql.execute("INSERT INTO album_artists\
                              (album_id, artist_id)\
                              VALUES (?, ?)", (result.lastrowid, artist_id))
+            self.cache.invalidate(result.lastrowid)
             return result.lastrowid
 
     def add_artist(self, album_id, artist_id):
@@ -73,6 +77,7 @@ class AlbumsDatabase:
                 sql.execute("INSERT INTO "
                             "album_artists (album_id, artist_id)"
                             "VALUES (?, ?)", (album_id, artist_id))
+        self.cache.invalidate(album_id)
 
     def add_genre(self, album_id, genre_id):
         """
@@ -105,6 +110,7 @@ class AlbumsDatabase:
                     sql.execute("INSERT INTO album_artists\
                                 (album_id, artist_id)\
                                 VALUES (?, ?)", (album_id, artist_id))
+        self.cache.invalidate(album_id)
 
     def set_synced(self, album_id, synced):
         """
@@ -116,6 +122,7 @@ class AlbumsDatabase:
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE albums SET synced=? WHERE rowid=?",
                         (synced, album_id))
+        self.cache.invalidate(album_id)
 
     def set_loved(self, album_id, loved):
         """
@@ -127,6 +134,7 @@ class AlbumsDatabase:
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE albums SET loved=? WHERE rowid=?",
                         (loved, album_id))
+        self.cache.invalidate(album_id)
 
     def set_rate(self, album_id, rate):
         """
@@ -136,6 +144,7 @@ class AlbumsDatabase:
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE albums SET rate=? WHERE rowid=?",
                         (rate, album_id))
+        self.cache.invalidate(album_id)
 
     def set_year(self, album_id, year):
         """
@@ -147,6 +156,7 @@ class AlbumsDatabase:
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE albums SET year=? WHERE rowid=?",
                         (year, album_id))
+        self.cache.invalidate(album_id)
 
     def set_uri(self, album_id, uri):
         """
@@ -157,6 +167,7 @@ class AlbumsDatabase:
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE albums SET uri=? WHERE rowid=?",
                         (uri, album_id))
+        self.cache.invalidate(album_id)
 
     def set_popularity(self, album_id, popularity):
         """
@@ -170,6 +181,7 @@ class AlbumsDatabase:
                             (popularity, album_id))
             except:  # Database is locked
                 pass
+        self.cache.invalidate(album_id)
 
     def get_synced_ids(self):
         """
@@ -357,6 +369,59 @@ class AlbumsDatabase:
                                   WHERE album_id=?", (album_id,))
             return list(itertools.chain(*result))
 
+    def get_rows(self, album_ids):
+        """
+            Get attributes for albums in one pass, see objects.Album
+            @param album_ids as [int]
+            @return {album id as int: {attribute as str: object}}
+        """
+        with SqlCursor(App().db) as sql:
+            rows = {}
+            filters = tuple(album_ids)
+            placeholders = ",".join("?" * len(album_ids))
+            result = sql.execute("SELECT rowid, name, year, uri,\
+                                  synced, loved\
+                                  FROM albums WHERE rowid IN (%s)" %
+                                 placeholders, filters)
+            for (album_id, name, year, uri, synced, loved) in result:
+                rows[album_id] = {"name": name,
+                                  "year": year or None,
+                                  "uri": uri,
+                                  "synced": synced,
+                                  "loved": loved,
+                                  "artist_ids": [],
+                                  "artists": []}
+            result = sql.execute("SELECT album_artists.album_id,\
+                                  album_artists.artist_id, artists.name\
+                                  FROM album_artists LEFT JOIN artists\
+                                  ON artists.rowid=album_artists.artist_id\
+                                  WHERE album_artists.album_id IN (%s)\
+                                  ORDER BY album_artists.rowid" %
+                                 placeholders, filters)
+            for (album_id, artist_id, name) in result:
+                if album_id in rows.keys():
+                    rows[album_id]["artist_ids"].append(artist_id)
+                    if name is not None:
+                        rows[album_id]["artists"].append(name)
+            return rows
+
+    def update_sortkeys(self):
+        """
+            Set albums sort keys if some are missing
+            Sort key is album rank in LOCALIZED collation order
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid FROM albums\
+                                  WHERE sortkey IS NULL LIMIT 1")
+            if result.fetchone() is None:
+                return
+            result = sql.execute("SELECT rowid, name, sortkey FROM albums")
+            rows = sorted(result, key=lambda row: sort_key(row[1]))
+            sql.executemany("UPDATE albums SET sortkey=? WHERE rowid=?",
+                            [(rank, row[0]) for (rank, row) in enumerate(rows)
+                             if row[2] != rank])
+
     def get_name(self, album_id):
         """
             Get album name for album id
@@ -608,28 +673,13 @@ class AlbumsDatabase:
         if not self.__has_artists(album_id):
             artist_ids = []
         with SqlCursor(App().db) as sql:
-            filters = (album_id,)
-            request = "SELECT DISTINCT tracks.rowid\
-                       FROM tracks"
-            if genre_ids:
-                request += ", track_genres"
-                filters += tuple(genre_ids)
-            if artist_ids:
-                request += ", track_artists"
-                filters += tuple(artist_ids)
-            request += " WHERE album_id=? "
-            if genre_ids:
-                request += "AND track_genres.track_id=tracks.rowid AND ("
-                for genre_id in genre_ids:
-                    request += "track_genres.genre_id=? OR "
-                request += "1=0)"
-            if artist_ids:
-                request += "AND track_artists.track_id=tracks.rowid AND ("
-                for artist_id in artist_ids:
-                    request += "track_artists.artist_id=? OR "
-                request += "1=0)"
-            request += " ORDER BY discnumber, tracknumber"
-            result = sql.execute(request, filters)
+            (request, filters) = self.__get_tracks_filter(genre_ids,
+                                                          artist_ids)
+            request = "SELECT tracks.rowid\
+                       FROM tracks\
+                       WHERE album_id=?" + request +\
+                      " ORDER BY discnumber, tracknumber"
+            result = sql.execute(request, (album_id,) + filters)
             return list(itertools.chain(*result))
 
     def get_track_uris(self, album_id, genre_ids, artist_ids):
@@ -649,28 +699,13 @@ class AlbumsDatabase:
         if not self.__has_artists(album_id):
             artist_ids = []
         with SqlCursor(App().db) as sql:
-            filters = (album_id,)
+            (request, filters) = self.__get_tracks_filter(genre_ids,
+                                                          artist_ids)
             request = "SELECT DISTINCT tracks.uri\
-                       FROM tracks"
-            if genre_ids:
-                request += ", track_genres"
-                filters += tuple(genre_ids)
-            if artist_ids:
-                request += ", track_artists"
-                filters += tuple(artist_ids)
-            request += " WHERE album_id=? "
-            if genre_ids:
-                request += "AND track_genres.track_id = tracks.rowid AND ("
-                for genre_id in genre_ids:
-                    request += "track_genres.genre_id=? OR "
-                request += "1=0)"
-            if artist_ids:
-                request += "AND track_artists.track_id=tracks.rowid AND ("
-                for artist_id in artist_ids:
-                    request += "track_artists.artist_id=? OR "
-                request += "1=0)"
-            request += " ORDER BY discnumber, tracknumber, tracks.name"
-            result = sql.execute(request, filters)
+                       FROM tracks\
+                       WHERE album_id=?" + request +\
+                      " ORDER BY discnumber, tracknumber, tracks.name"
+            result = sql.execute(request, (album_id,) + filters)
             return list(itertools.chain(*result))
 
     def get_disc_track_ids(self, album_id, genre_ids, artist_ids, disc):
@@ -690,29 +725,14 @@ class AlbumsDatabase:
         if not self.__has_artists(album_id):
             artist_ids = []
         with SqlCursor(App().db) as sql:
-            filters = (album_id, disc)
-            request = "SELECT DISTINCT tracks.rowid\
-                       FROM tracks"
-            if genre_ids:
-                request += ", track_genres"
-                filters += tuple(genre_ids)
-            if artist_ids:
-                request += ", track_artists"
-                filters += tuple(artist_ids)
-            request += " WHERE album_id=?\
-                       AND discnumber=?"
-            if genre_ids:
-                request += " AND track_genres.track_id = tracks.rowid AND ("
-                for genre_id in genre_ids:
-                    request += "track_genres.genre_id=? OR "
-                request += "1=0)"
-            if artist_ids:
-                request += " AND track_artists.track_id=tracks.rowid AND ("
-                for artist_id in artist_ids:
-                    request += "track_artists.artist_id=? OR "
-                request += "1=0)"
-            request += " ORDER BY discnumber, tracknumber, tracks.name"
-            result = sql.execute(request, filters)
+            (request, filters) = self.__get_tracks_filter(genre_ids,
+                                                          artist_ids)
+            request = "SELECT tracks.rowid\
+                       FROM tracks\
+                       WHERE album_id=?\
+                       AND discnumber=?" + request +\
+                      " ORDER BY discnumber, tracknumber, tracks.name"
+            result = sql.execute(request, (album_id, disc) + filters)
             return list(itertools.chain(*result))
 
     def get_id_by_uri(self, uri):
@@ -740,76 +760,40 @@ class AlbumsDatabase:
         """
         genre_ids = remove_static_genres(genre_ids)
         orderby = App().settings.get_enum("orderby")
+        # Sort keys follow LOCALIZED collation, see update_sortkeys()
         if artist_ids or orderby == OrderBy.ARTIST:
-            order = " ORDER BY artists.sortname\
-                     COLLATE NOCASE COLLATE LOCALIZED,\
+            order = " ORDER BY artists.sortkey,\
                      albums.year,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sortkey"
         elif orderby == OrderBy.NAME:
-            order = " ORDER BY albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+            order = " ORDER BY albums.sortkey"
         elif orderby == OrderBy.YEAR:
             order = " ORDER BY albums.year,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sortkey"
         else:
             order = " ORDER BY albums.popularity DESC,\
-                     albums.name\
-                     COLLATE NOCASE COLLATE LOCALIZED"
+                     albums.sortkey"
 
         with SqlCursor(App().db) as sql:
-            result = []
-            # Get albums for all artists
-            if not artist_ids and not genre_ids:
-                request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, album_artists, artists\
-                           WHERE albums.rowid = album_artists.album_id AND\
-                           artists.rowid = album_artists.artist_id"
-                request += order
-                result = sql.execute(request)
+            filters = ()
+            request = "SELECT DISTINCT albums.rowid\
+                       FROM albums, album_artists, artists\
+                       WHERE albums.rowid = album_artists.album_id AND\
+                       artists.rowid = album_artists.artist_id"
+            # Get albums for artists
+            if artist_ids:
+                request += " AND album_artists.artist_id IN (%s)" %\
+                    ",".join("?" * len(artist_ids))
+                filters += tuple(artist_ids)
             # Get albums for genres
-            elif not artist_ids:
-                filters = tuple(genre_ids)
-                request = "SELECT DISTINCT albums.rowid FROM albums,\
-                           album_genres, album_artists, artists\
-                           WHERE albums.rowid = album_artists.album_id AND\
-                           artists.rowid = album_artists.artist_id AND\
-                           album_genres.album_id=albums.rowid AND ( "
-                for genre_id in genre_ids:
-                    request += "album_genres.genre_id=? OR "
-                request += "1=0)"
-                request += order
-                result = sql.execute(request, filters)
-            # Get albums for artist
-            elif not genre_ids:
-                filters = tuple(artist_ids)
-                request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, album_artists, artists\
-                           WHERE album_artists.album_id=albums.rowid AND\
-                           artists.rowid = album_artists.artist_id AND ("
-                for artist_id in artist_ids:
-                    request += "artists.rowid=? OR "
-                request += "1=0)"
-                request += order
-                result = sql.execute(request, filters)
-            # Get albums for artist id and genre id
-            else:
-                filters = tuple(artist_ids)
+            if genre_ids:
+                request += " AND albums.rowid IN (\
+                                SELECT album_id FROM album_genres\
+                                WHERE genre_id IN (%s))" %\
+                    ",".join("?" * len(genre_ids))
                 filters += tuple(genre_ids)
-                request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, album_genres, album_artists, artists\
-                           WHERE album_genres.album_id=albums.rowid AND\
-                           artists.rowid = album_artists.artist_id AND\
-                           album_artists.album_id=albums.rowid AND ("
-                for artist_id in artist_ids:
-                    request += "artists.rowid=? OR "
-                request += "1=0) AND ("
-                for genre_id in genre_ids:
-                    request += "album_genres.genre_id=? OR "
-                request += "1=0)"
-                request += order
-                result = sql.execute(request, filters)
+            request += order
+            result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
     def get_compilation_ids(self, genre_ids=[]):
@@ -833,13 +817,14 @@ class AlbumsDatabase:
                 filters = (Type.COMPILATIONS,)
                 filters += tuple(genre_ids)
                 request = "SELECT DISTINCT albums.rowid\
-                           FROM albums, album_genres, album_artists\
-                           WHERE album_genres.album_id=albums.rowid\
-                           AND album_artists.album_id=albums.rowid\
-                           AND album_artists.artist_id=? AND ( "
-                for genre_id in genre_ids:
-                    request += "album_genres.genre_id=? OR "
-                request += "1==0) ORDER BY albums.name,albums.year"
+                           FROM albums, album_artists\
+                           WHERE album_artists.album_id=albums.rowid\
+                           AND album_artists.artist_id=?\
+                           AND albums.rowid IN (\
+                                SELECT album_id FROM album_genres\
+                                WHERE genre_id IN (%s))\
+                           ORDER BY albums.name,albums.year" %\
+                    ",".join("?" * len(genre_ids))
                 result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
@@ -931,6 +916,21 @@ class AlbumsDatabase:
             result = sql.execute(request, filters)
             return list(itertools.chain(*result))
 
+    def search_fts(self, query, limit=25):
+        """
+            Search for albums matching full text query, best first
+            @param query as str (FTS5 MATCH expression)
+            @param limit as int
+            @return [(album id as int, score as float)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, -bm25(albums_fts)\
+                                  FROM albums_fts\
+                                  WHERE albums_fts MATCH ?\
+                                  ORDER BY rank LIMIT ?",
+                                 (query, limit))
+            return list(result)
+
     def calculate_artist_ids(self, album_id):
         """
             Calculate artist ids based on tracks
@@ -971,6 +971,7 @@ class AlbumsDatabase:
             @param return True if album deleted or genre modified
             @warning commit needed
         """
+        self.cache.invalidate(album_id)
         with SqlCursor(App().db) as sql:
             ret = False
             # Check album really have tracks from its genres
@@ -1028,6 +1029,29 @@ class AlbumsDatabase:
 #######################
 # PRIVATE             #
 #######################
+    def __get_tracks_filter(self, genre_ids, artist_ids):
+        """
+            Get SQL filter on tracks for genres and artists
+            @param genre_ids as [int]
+            @param artist_ids as [int]
+            @return (request as str, filters as (int))
+        """
+        request = ""
+        filters = ()
+        if genre_ids:
+            request += " AND EXISTS (SELECT 1 FROM track_genres\
+                            WHERE track_genres.track_id=tracks.rowid\
+                            AND track_genres.genre_id IN (%s))" %\
+                ",".join("?" * len(genre_ids))
+            filters += tuple(genre_ids)
+        if artist_ids:
+            request += " AND EXISTS (SELECT 1 FROM track_artists\
+                            WHERE track_artists.track_id=tracks.rowid\
+                            AND track_artists.artist_id IN (%s))" %\
+                ",".join("?" * len(artist_ids))
+            filters += tuple(artist_ids)
+        return (request, filters)
+
     def __has_genres(self, album_id):
         """
             Return True if album has more than one genre
@@ -16,6 +16,7 @@ import itertools
 from lollypop.sqlcursor import SqlCursor
 from lollypop.define import App, Type
 from lollypop.utils import format_artist_name, noaccents
+from lollypop.localized import sort_key
 
 
 class ArtistsDatabase:
@@ -54,10 +55,28 @@ class ArtistsDatabase:
         """
         with SqlCursor(App().db) as sql:
             sql.execute("UPDATE artists\
-                         SET sortname=?\
+                         SET sortname=?, sortkey=NULL\
                          WHERE rowid=?",
                         (sortname, artist_id))
 
+    def update_sortkeys(self):
+        """
+            Set artists sort keys if some are missing
+            Sort key is artist rank in LOCALIZED collation order of sortname
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid FROM artists\
+                                  WHERE sortkey IS NULL LIMIT 1")
+            if result.fetchone() is None:
+                return
+            result = sql.execute("SELECT rowid, sortname, sortkey\
+                                  FROM artists")
+            rows = sorted(result, key=lambda row: sort_key(row[1]))
+            sql.executemany("UPDATE artists SET sortkey=? WHERE rowid=?",
+                            [(rank, row[0]) for (rank, row) in enumerate(rows)
+                             if row[2] != rank])
+
     def get_sortname(self, artist_id):
         """
             Return sortname
@@ -235,6 +254,25 @@ class ArtistsDatabase:
                                   LIMIT 25", ("%" + noaccents(string) + "%",))
             return list(itertools.chain(*result))
 
+    def search_fts(self, query, limit=25):
+        """
+            Search for album artists matching full text query, best first
+            @param query as str (FTS5 MATCH expression)
+            @param limit as int
+            @return [(artist id as int, score as float)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, -bm25(artists_fts)\
+                                  FROM artists_fts\
+                                  WHERE artists_fts MATCH ?\
+                                  AND EXISTS (\
+                                    SELECT 1 FROM album_artists\
+                                    WHERE album_artists.artist_id=\
+                                          artists_fts.rowid)\
+                                  ORDER BY rank LIMIT ?",
+                                 (query, limit))
+            return list(result)
+
     def count(self):
         """
             Count artists
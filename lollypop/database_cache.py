@@ -0,0 +1,114 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from collections import OrderedDict
+from threading import Lock
+
+
+class RowCache:
+    """
+        Size bounded LRU cache for database rows
+        Rows are loaded by loader([ids]) -> {id: {attr: value}}
+    """
+    # SQLite limits variables count in a request
+    CHUNK = 500
+
+    def __init__(self, loader, max_size):
+        """
+            Init cache
+            @param loader as function
+            @param max_size as int
+        """
+        self.__loader = loader
+        self.__max_size = max_size
+        self.__rows = OrderedDict()
+        self.__lock = Lock()
+        # Increased on invalidation, rows loaded before are dropped
+        self.__generation = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    def get(self, object_id):
+        """
+            Get row for object id, load it if needed
+            @param object_id as int
+            @return {str: object}/None
+        """
+        with self.__lock:
+            row = self.__rows.get(object_id, None)
+            if row is not None:
+                self.__rows.move_to_end(object_id)
+                self.__hits += 1
+                return row
+            self.__misses += 1
+        return self.__load([object_id]).get(object_id, None)
+
+    def prefetch(self, object_ids):
+        """
+            Load missing rows in bulk, only what the cache can hold
+            @param object_ids as [int]
+        """
+        with self.__lock:
+            missing = [object_id for object_id in
+                       OrderedDict.fromkeys(object_ids[:self.__max_size])
+                       if object_id is not None and object_id >= 0 and
+                       object_id not in self.__rows]
+        for i in range(0, len(missing), self.CHUNK):
+            self.__load(missing[i:i + self.CHUNK])
+
+    def invalidate(self, object_id):
+        """
+            Drop row for object id
+            @param object_id as int
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__rows.pop(object_id, None)
+
+    def clear(self):
+        """
+            Drop all rows
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__rows = OrderedDict()
+
+    def get_stats(self):
+        """
+            Get cache statistics
+            @return {str: int}
+        """
+        return {"rows": len(self.__rows),
+                "hits": self.__hits,
+                "misses": self.__misses}
+
+#######################
+# PRIVATE             #
+#######################
+    def __load(self, object_ids):
+        """
+            Load rows and store them
+            @param object_ids as [int]
+            @return {int: {str: object}}
+        """
+        generation = self.__generation
+        rows = self.__loader(object_ids)
+        with self.__lock:
+            # Rows may be outdated, do not store them
+            if generation != self.__generation:
+                return rows
+            for (object_id, row) in rows.items():
+                self.__rows[object_id] = row
+                self.__rows.move_to_end(object_id)
+            while len(self.__rows) > self.__max_size:
+                self.__rows.popitem(last=False)
+        return rows
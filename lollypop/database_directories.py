@@ -0,0 +1,58 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App
+
+
+class DirectoriesDatabase:
+    """
+        Collection manifest: modification time and children count
+        of directories at last scan
+    """
+
+    def __init__(self):
+        """
+            Init directories database object
+        """
+        pass
+
+    def get(self):
+        """
+            Get manifest
+            @return {uri as str: (mtime as int, count as int)}
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT uri, mtime, count FROM directories")
+            return {uri: (mtime, count) for (uri, mtime, count) in result}
+
+    def set(self, manifest):
+        """
+            Replace manifest
+            @param manifest as {uri as str: (mtime as int, count as int)}
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            sql.execute("DELETE FROM directories")
+        self.update(manifest)
+
+    def update(self, manifest):
+        """
+            Update manifest entries
+            @param manifest as {uri as str: (mtime as int, count as int)}
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            sql.executemany("INSERT OR REPLACE INTO directories\
+                             (uri, mtime, count) VALUES (?, ?, ?)",
+                            [(uri, mtime, count) for (uri, (mtime, count))
+                             in manifest.items()])
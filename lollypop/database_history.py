@@ -39,6 +39,8 @@ class History:
                             album_rate INT NOT NULL,
                             loved_album INT NOT NULL,
                             album_popularity INT NOT NULL)"""
+    __create_history_idx = """CREATE INDEX IF NOT EXISTS idx_history
+                               ON history(name, duration)"""
 
     def __init__(self):
         """
@@ -51,6 +53,8 @@ class History:
                 sql.execute(self.__create_history)
         except:
             pass
+        with SqlCursor(self) as sql:
+            sql.execute(self.__create_history_idx)
         with SqlCursor(self) as sql:
             result = sql.execute("SELECT COUNT(*)\
                                   FROM history")
@@ -93,6 +97,22 @@ class History:
                             (name, duration, popularity, rate, ltime, mtime,
                              loved_album, album_popularity, album_rate))
 
+    def add_many(self, items):
+        """
+            Add items to history
+            @param items as [(name, duration, popularity, rate, ltime, mtime,
+                              loved album, album_popularity, album_rate)]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM history\
+                             WHERE name=? AND duration=?",
+                            [item[0:2] for item in items])
+            sql.executemany("INSERT INTO history\
+                             (name, duration, popularity, rate, ltime, mtime,\
+                             loved_album, album_popularity, album_rate)\
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items)
+
     def get(self, name, duration):
         """
             Get stats for track with filename and duration
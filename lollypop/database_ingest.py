@@ -0,0 +1,288 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from string import ascii_uppercase, ascii_lowercase
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App
+
+
+class DatabaseIngest:
+    """
+        Bulk ingest helper for collection scanner
+        Artist, genre and album ids are resolved in memory,
+        tracks are buffered and written with executemany()
+        @warning: be sure SqlCursor is available for App().db
+    """
+    # SQLite NOCASE only folds ASCII characters
+    __NOCASE = str.maketrans(ascii_uppercase, ascii_lowercase)
+
+    def __init__(self, batch_size=500):
+        """
+            Init ingest buffer
+            @param batch_size as int
+        """
+        self.__batch_size = batch_size
+        self.__artist_ids = {}
+        self.__artist_ids_nocase = {}
+        self.__artist_sortnames = {}
+        self.__genre_ids = {}
+        self.__album_ids = {}
+        self.__album_ids_no_artist = {}
+        self.__album_uris = {}
+        self.__album_genres = set()
+        self.__next_track_id = 1
+        self.__reset()
+
+    def seed(self):
+        """
+            Load ids from database
+        """
+        self.__artist_ids = {}
+        self.__artist_ids_nocase = {}
+        self.__artist_sortnames = {}
+        self.__genre_ids = {}
+        self.__album_ids = {}
+        self.__album_ids_no_artist = {}
+        self.__album_uris = {}
+        self.__album_genres = set()
+        self.__reset()
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, name, sortname\
+                                  FROM artists ORDER BY rowid")
+            for (artist_id, name, sortname) in result:
+                self.__set_artist(artist_id, name, sortname)
+            result = sql.execute("SELECT rowid, name\
+                                  FROM genres ORDER BY rowid")
+            for (genre_id, name) in result:
+                self.__genre_ids.setdefault(name, genre_id)
+            album_artist_ids = {}
+            result = sql.execute("SELECT album_id, artist_id\
+                                  FROM album_artists")
+            for (album_id, artist_id) in result:
+                album_artist_ids.setdefault(album_id, []).append(artist_id)
+            result = sql.execute("SELECT rowid, name, mb_album_id,\
+                                  no_album_artist, uri\
+                                  FROM albums ORDER BY rowid")
+            for (album_id, name, mb_album_id, no_album_artist, uri) in result:
+                self.__album_uris[album_id] = uri
+                if no_album_artist:
+                    self.__album_ids_no_artist.setdefault(name, album_id)
+                else:
+                    self.__set_album(album_id, name, mb_album_id,
+                                     album_artist_ids.get(album_id, []))
+            result = sql.execute("SELECT album_id, genre_id\
+                                  FROM album_genres")
+            self.__album_genres = set(result)
+            result = sql.execute("SELECT MAX(rowid) FROM tracks")
+            v = result.fetchone()
+            if v is not None and v[0] is not None:
+                self.__next_track_id = v[0] + 1
+
+    def get_artist_id(self, name):
+        """
+            Get artist id
+            @param name as str
+            @return int/None
+        """
+        # Special case, id name is fully uppercase, do not use NOCASE
+        if name.isupper():
+            return self.__artist_ids.get(name, None)
+        return self.__artist_ids_nocase.get(name.translate(self.__NOCASE),
+                                            None)
+
+    def add_artist(self, name, sortname):
+        """
+            Add a new artist
+            @param name as str
+            @param sortname as str
+            @return artist id as int
+        """
+        artist_id = App().artists.add(name, sortname)
+        self.__set_artist(artist_id, name, sortname)
+        return artist_id
+
+    def set_artist_sortname(self, artist_id, sortname):
+        """
+            Set artist sortname if changed
+            @param artist_id as int
+            @param sortname as str
+        """
+        if self.__artist_sortnames.get(artist_id, None) != sortname:
+            App().artists.set_sortname(artist_id, sortname)
+            self.__artist_sortnames[artist_id] = sortname
+
+    def get_genre_id(self, name):
+        """
+            Get genre id
+            @param name as str
+            @return int/None
+        """
+        return self.__genre_ids.get(name, None)
+
+    def add_genre(self, name):
+        """
+            Add a new genre
+            @param name as str
+            @return genre id as int
+        """
+        genre_id = App().genres.add(name)
+        self.__genre_ids[name] = genre_id
+        return genre_id
+
+    def get_album_id(self, album_name, mb_album_id, artist_ids):
+        """
+            Get non compilation album id
+            @param album_name as str
+            @param mb_album_id as str
+            @param artist_ids as [int]
+            @return int/None
+        """
+        if not artist_ids:
+            return self.__album_ids_no_artist.get(album_name, None)
+        key = (album_name.translate(self.__NOCASE), mb_album_id or None)
+        for artist_id in artist_ids:
+            album_id = self.__album_ids.get(key + (artist_id,), None)
+            if album_id is not None:
+                return album_id
+        return None
+
+    def add_album(self, album_name, mb_album_id, artist_ids,
+                  uri, loved, popularity, rate, mtime):
+        """
+            Add a new album, same params as AlbumsDatabase.add()
+            @return album id as int
+        """
+        album_id = App().albums.add(album_name, mb_album_id, artist_ids,
+                                    uri, loved, popularity, rate, mtime)
+        self.__album_uris[album_id] = uri
+        if artist_ids:
+            self.__set_album(album_id, album_name, mb_album_id, artist_ids)
+        else:
+            self.__album_ids_no_artist.setdefault(album_name, album_id)
+        return album_id
+
+    def set_album_uri(self, album_id, uri):
+        """
+            Set album uri if changed
+            @param album_id as int
+            @param uri as str
+        """
+        if self.__album_uris.get(album_id, None) != uri:
+            App().albums.set_uri(album_id, uri)
+            self.__album_uris[album_id] = uri
+
+    def add_track(self, name, uri, duration, tracknumber, discnumber,
+                  discname, album_id, year, popularity, rate, ltime,
+                  mtime, mb_track_id, artwork, artist_ids, genre_ids):
+        """
+            Buffer a new track, same params as TracksDatabase.add()
+            @param artist_ids as [int]
+            @param genre_ids as [int]
+            @return track id as int
+        """
+        track_id = self.__next_track_id
+        self.__next_track_id += 1
+        self.__tracks.append((track_id, name, uri, duration, tracknumber,
+                              discnumber, discname, album_id, year,
+                              popularity, rate, ltime, mtime, mb_track_id,
+                              artwork))
+        for artist_id in dict.fromkeys(artist_ids):
+            self.__track_artists.append((track_id, artist_id))
+        for genre_id in dict.fromkeys(genre_ids):
+            self.__track_genres.append((track_id, genre_id))
+            if (album_id, genre_id) not in self.__album_genres:
+                self.__album_genres.add((album_id, genre_id))
+                self.__new_album_genres.append((album_id, genre_id))
+        self.__touched_album_ids[album_id] = None
+        return track_id
+
+    @property
+    def full(self):
+        """
+            True if buffer should be flushed
+            @return bool
+        """
+        return len(self.__tracks) >= self.__batch_size
+
+    def flush(self):
+        """
+            Write buffered tracks to database
+            @return touched album ids as [int]
+            @warning: commit needed
+        """
+        album_ids = list(self.__touched_album_ids.keys())
+        if not self.__tracks:
+            return album_ids
+        with SqlCursor(App().db) as sql:
+            sql.executemany("INSERT INTO tracks (rowid, name, uri, duration,\
+                             tracknumber, discnumber, discname, album_id,\
+                             year, popularity, rate, ltime, mtime,\
+                             mb_track_id, artwork) VALUES\
+                             (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            self.__tracks)
+            sql.executemany("INSERT INTO track_artists (track_id, artist_id)\
+                             VALUES (?, ?)", self.__track_artists)
+            sql.executemany("INSERT INTO track_genres (track_id, genre_id)\
+                             VALUES (?, ?)", self.__track_genres)
+            sql.executemany("INSERT INTO album_genres (album_id, genre_id)\
+                             VALUES (?, ?)", self.__new_album_genres)
+            # Update year based on tracks, use most used year
+            sql.executemany("UPDATE albums SET year=(\
+                                SELECT year FROM tracks\
+                                WHERE tracks.album_id=albums.rowid\
+                                GROUP BY year\
+                                ORDER BY COUNT(year) DESC\
+                                LIMIT 1)\
+                             WHERE rowid=?",
+                            [(album_id,) for album_id in album_ids])
+        for album_id in album_ids:
+            App().albums.cache.invalidate(album_id)
+        self.__reset()
+        return album_ids
+
+#######################
+# PRIVATE             #
+#######################
+    def __reset(self):
+        """
+            Reset write buffers
+        """
+        self.__tracks = []
+        self.__track_artists = []
+        self.__track_genres = []
+        self.__new_album_genres = []
+        self.__touched_album_ids = {}
+
+    def __set_artist(self, artist_id, name, sortname):
+        """
+            Cache artist
+            @param artist_id as int
+            @param name as str
+            @param sortname as str
+        """
+        self.__artist_ids.setdefault(name, artist_id)
+        self.__artist_ids_nocase.setdefault(name.translate(self.__NOCASE),
+                                            artist_id)
+        self.__artist_sortnames[artist_id] = sortname
+
+    def __set_album(self, album_id, album_name, mb_album_id, artist_ids):
+        """
+            Cache album
+            @param album_id as int
+            @param album_name as str
+            @param mb_album_id as str
+            @param artist_ids as [int]
+        """
+        key = (album_name.translate(self.__NOCASE), mb_album_id or None)
+        for artist_id in artist_ids:
+            self.__album_ids.setdefault(key + (artist_id,), album_id)
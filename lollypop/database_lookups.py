@@ -0,0 +1,99 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from threading import Lock
+from time import time
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import LookupResult
+
+
+class LookupsDatabase:
+    """
+        Web services lookups results, allow Lollypop to not query
+        services again for items they do not know
+        Found items are not cached: they are stored by callers
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/lookups.db" % __LOCAL_PATH
+    # Seconds before retrying a lookup, by result
+    __TTLS = {LookupResult.ERROR: 3600,
+              LookupResult.NOT_FOUND: 14 * 86400}
+    # Bios are not often added to services, keep it the longest TTL
+    __BIO_TTL = 30 * 86400
+    __create_lookups = """CREATE TABLE IF NOT EXISTS lookups (
+                            service TEXT NOT NULL,
+                            kind TEXT NOT NULL,
+                            item TEXT NOT NULL,
+                            mtime INT NOT NULL,
+                            result INT NOT NULL,
+                            PRIMARY KEY (service, kind, item))"""
+
+    def __init__(self):
+        """
+            Init lookups database
+        """
+        self.thread_lock = Lock()
+        with SqlCursor(self) as sql:
+            sql.execute(self.__create_lookups)
+            # Forget expired entries
+            sql.execute("DELETE FROM lookups WHERE mtime<?",
+                        (time() - self.__BIO_TTL,))
+
+    def set_result(self, service, kind, item, result):
+        """
+            Save lookup result
+            @param service as str
+            @param kind as str ("artist", "album", "bio")
+            @param item as str
+            @param result as LookupResult
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR REPLACE INTO lookups\
+                         (service, kind, item, mtime, result)\
+                         VALUES (?, ?, ?, ?, ?)",
+                        (service, kind, item, int(time()), result))
+
+    def is_cached(self, service, kind, item):
+        """
+            True if service failed for item and TTL is not expired
+            @param service as str
+            @param kind as str
+            @param item as str
+            @return bool
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT mtime, result FROM lookups\
+                                  WHERE service=? AND kind=? AND item=?",
+                                 (service, kind, item))
+            v = result.fetchone()
+            if v is None:
+                return False
+            (mtime, result) = v
+            ttl = self.__TTLS.get(result, 0)
+            if kind == "bio" and result == LookupResult.NOT_FOUND:
+                ttl = self.__BIO_TTL
+            return time() - mtime < ttl
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
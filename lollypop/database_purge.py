@@ -0,0 +1,209 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import Gio
+
+import itertools
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.define import App
+
+
+class DatabasePurge:
+    """
+        Bulk delete helper
+        Tracks to delete are stored in a temporary table, then removed
+        with set based queries. Orphan albums, artists and genres are
+        cleaned in a single pass
+        @warning: be sure SqlCursor is available for App().db
+    """
+    __create_purge = ["CREATE TEMP TABLE IF NOT EXISTS purge_tracks (\
+                           track_id INTEGER PRIMARY KEY)",
+                      "CREATE TEMP TABLE IF NOT EXISTS purge_uris (\
+                           uri TEXT PRIMARY KEY)",
+                      "CREATE TEMP TABLE IF NOT EXISTS purge_albums (\
+                           album_id INTEGER PRIMARY KEY)",
+                      "CREATE TEMP TABLE IF NOT EXISTS purge_artists (\
+                           artist_id INTEGER PRIMARY KEY)",
+                      "CREATE TEMP TABLE IF NOT EXISTS purge_genres (\
+                           genre_id INTEGER PRIMARY KEY)"]
+
+    def __init__(self):
+        """
+            Init purge
+        """
+        self.__count = 0
+
+    def seed(self, track_ids=[], uris=[]):
+        """
+            Set tracks to delete
+            @param track_ids as [int]
+            @param uris as [str]
+        """
+        with SqlCursor(App().db) as sql:
+            for request in self.__create_purge:
+                sql.execute(request)
+            for table in ["purge_tracks", "purge_uris", "purge_albums",
+                          "purge_artists", "purge_genres"]:
+                sql.execute("DELETE FROM temp.%s" % table)
+            sql.executemany("INSERT OR IGNORE INTO temp.purge_tracks\
+                             (track_id) VALUES (?)",
+                            [(track_id,) for track_id in track_ids])
+            sql.executemany("INSERT OR IGNORE INTO temp.purge_uris\
+                             (uri) VALUES (?)", [(uri,) for uri in uris])
+            sql.execute("INSERT OR IGNORE INTO temp.purge_tracks (track_id)\
+                         SELECT rowid FROM tracks\
+                         WHERE uri IN (SELECT uri FROM temp.purge_uris)")
+            # Objects to check once tracks are removed
+            sql.execute("INSERT INTO temp.purge_albums (album_id)\
+                         SELECT DISTINCT album_id FROM tracks\
+                         WHERE rowid IN (SELECT track_id\
+                                         FROM temp.purge_tracks)")
+            sql.execute("INSERT OR IGNORE INTO temp.purge_artists\
+                         (artist_id)\
+                         SELECT artist_id FROM track_artists\
+                         WHERE track_id IN (SELECT track_id\
+                                            FROM temp.purge_tracks)\
+                         UNION SELECT artist_id FROM album_artists\
+                         WHERE album_id IN (SELECT album_id\
+                                            FROM temp.purge_albums)")
+            sql.execute("INSERT OR IGNORE INTO temp.purge_genres (genre_id)\
+                         SELECT genre_id FROM track_genres\
+                         WHERE track_id IN (SELECT track_id\
+                                            FROM temp.purge_tracks)")
+            result = sql.execute("SELECT COUNT(*) FROM temp.purge_tracks")
+            self.__count = result.fetchone()[0]
+
+    @property
+    def count(self):
+        """
+            Tracks to delete count
+            @return int
+        """
+        return self.__count
+
+    def get_uris(self):
+        """
+            Get uris for tracks to delete
+            @return [str]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT uri FROM tracks\
+                                  WHERE rowid IN (SELECT track_id\
+                                                  FROM temp.purge_tracks)")
+            return list(itertools.chain(*result))
+
+    def get_history(self):
+        """
+            Get stats for tracks to delete, same order as History.add()
+            @return [(name as str, duration as int, popularity as int,
+                      rate as int, ltime as int, mtime as int,
+                      loved album as bool, album popularity as int,
+                      album rate as int)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT tracks.uri, tracks.duration,\
+                                  tracks.popularity, tracks.rate,\
+                                  tracks.ltime, tracks.mtime, albums.loved,\
+                                  albums.popularity, albums.rate\
+                                  FROM tracks, albums\
+                                  WHERE albums.rowid=tracks.album_id\
+                                  AND tracks.rowid IN (\
+                                    SELECT track_id FROM temp.purge_tracks)")
+            return [(Gio.File.new_for_uri(v[0]).get_basename(),) + v[1:]
+                    for v in result]
+
+    def remove_tracks(self):
+        """
+            Remove tracks
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            for table in ["track_genres", "track_artists"]:
+                sql.execute("DELETE FROM %s\
+                             WHERE track_id IN (SELECT track_id\
+                                                FROM temp.purge_tracks)" %
+                            table)
+            sql.execute("DELETE FROM tracks\
+                         WHERE rowid IN (SELECT track_id\
+                                         FROM temp.purge_tracks)")
+        App().tracks.cache.clear()
+
+    def get_orphan_album_ids(self):
+        """
+            Get albums without tracks, call after remove_tracks()
+            @return [int]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT album_id FROM temp.purge_albums\
+                                  WHERE album_id NOT IN (SELECT album_id\
+                                                         FROM tracks)")
+            return list(itertools.chain(*result))
+
+    def clean(self):
+        """
+            Remove orphan albums, artists and genres,
+            call after remove_tracks()
+            @return (cleaned album ids as [int],
+                     artist ids to update as [int],
+                     removed genre ids as [int])
+            @warning: commit needed
+        """
+        with SqlCursor(App().db) as sql:
+            # Album genres without tracks
+            result = sql.execute("SELECT album_id, genre_id\
+                                  FROM album_genres\
+                                  WHERE album_id IN (SELECT album_id\
+                                                     FROM temp.purge_albums)")
+            album_genres = set(result)
+            result = sql.execute("SELECT DISTINCT tracks.album_id,\
+                                  track_genres.genre_id\
+                                  FROM tracks, track_genres\
+                                  WHERE track_genres.track_id=tracks.rowid\
+                                  AND tracks.album_id IN (\
+                                    SELECT album_id FROM temp.purge_albums)")
+            orphan_genres = album_genres - set(result)
+            sql.executemany("DELETE FROM album_genres\
+                             WHERE album_id=? AND genre_id=?",
+                            orphan_genres)
+            orphan_album_ids = self.get_orphan_album_ids()
+            sql.execute("DELETE FROM temp.purge_albums\
+                         WHERE album_id IN (SELECT album_id FROM tracks)")
+            for table in ["album_genres", "album_artists"]:
+                sql.execute("DELETE FROM %s\
+                             WHERE album_id IN (SELECT album_id\
+                                                FROM temp.purge_albums)" %
+                            table)
+            sql.execute("DELETE FROM albums\
+                         WHERE rowid IN (SELECT album_id\
+                                         FROM temp.purge_albums)")
+            sql.execute("DELETE FROM artists\
+                         WHERE rowid IN (SELECT artist_id\
+                                         FROM temp.purge_artists)\
+                         AND rowid NOT IN (SELECT artist_id\
+                                           FROM album_artists)\
+                         AND rowid NOT IN (SELECT artist_id\
+                                           FROM track_artists)")
+            result = sql.execute("SELECT artist_id FROM temp.purge_artists")
+            artist_ids = list(itertools.chain(*result))
+            sql.execute("DELETE FROM temp.purge_genres\
+                         WHERE genre_id IN (SELECT genre_id\
+                                            FROM track_genres)")
+            result = sql.execute("SELECT genre_id FROM temp.purge_genres")
+            genre_ids = list(itertools.chain(*result))
+            sql.execute("DELETE FROM genres\
+                         WHERE rowid IN (SELECT genre_id\
+                                         FROM temp.purge_genres)")
+            App().albums.cache.clear()
+            album_ids = set(orphan_album_ids)
+            album_ids |= {album_id for (album_id, genre_id) in orphan_genres}
+            return (list(album_ids), artist_ids, genre_ids)
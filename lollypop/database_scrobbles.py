@@ -0,0 +1,261 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from gi.repository import GLib
+
+import sqlite3
+from threading import Lock
+
+from lollypop.sqlcursor import SqlCursor
+from lollypop.helper_task import TaskHelper
+from lollypop.define import TaskLane, ScrobbleResult
+from lollypop.logger import Logger
+
+
+class ScrobblesDatabase:
+    """
+        Journal of listens not yet delivered to scrobbling services
+        Listens are stored before any network request and removed once
+        the service accepted them, so nothing is lost on quit or when
+        network is down. A listen is unique by (service, timestamp,
+        artist, title): journaling or submitting it again is harmless
+        Only failures are retried: when service rejects a batch, it is
+        split until rejected listens are isolated and removed
+    """
+    __LOCAL_PATH = GLib.get_user_data_dir() + "/lollypop"
+    __DB_PATH = "%s/scrobbles.db" % __LOCAL_PATH
+    # Seconds before retrying a failed submission, doubled on each failure
+    __RETRY_DELAY = 60
+    __MAX_RETRY_DELAY = 3600
+    __create_scrobbles = """CREATE TABLE IF NOT EXISTS scrobbles (
+                            id INTEGER PRIMARY KEY,
+                            service TEXT NOT NULL,
+                            artist TEXT NOT NULL,
+                            album TEXT NOT NULL,
+                            title TEXT NOT NULL,
+                            timestamp INT NOT NULL,
+                            duration INT NOT NULL,
+                            tracknumber INT NOT NULL,
+                            mb_track_id TEXT NOT NULL,
+                            mb_album_id TEXT NOT NULL,
+                            attempts INT NOT NULL DEFAULT 0,
+                            UNIQUE (service, timestamp, artist, title))"""
+
+    def __init__(self):
+        """
+            Init scrobbles database
+        """
+        self.thread_lock = Lock()
+        self.__lock = Lock()
+        # Services with a running submission
+        self.__running = set()
+        # Services with a scheduled retry
+        self.__retries = set()
+        self.__failures = {}
+        self.__stats = {}
+        with SqlCursor(self) as sql:
+            sql.execute(self.__create_scrobbles)
+
+    def add(self, service, track, timestamp):
+        """
+            Journal a listen
+            @param service as str
+            @param track as Track
+            @param timestamp as int
+        """
+        with SqlCursor(self) as sql:
+            sql.execute("INSERT OR IGNORE INTO scrobbles\
+                         (service, artist, album, title, timestamp,\
+                          duration, tracknumber, mb_track_id, mb_album_id)\
+                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (service,
+                         ", ".join(track.artists),
+                         track.album_name or "",
+                         track.title,
+                         timestamp,
+                         int(track.duration),
+                         track.number or 0,
+                         track.mb_track_id or "",
+                         track.album.mb_album_id or ""))
+
+    def get(self, service, limit):
+        """
+            Get oldest listens for service
+            @param service as str
+            @param limit as int
+            @return [{}]
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT id, artist, album, title,\
+                                  timestamp, duration, tracknumber,\
+                                  mb_track_id, mb_album_id\
+                                  FROM scrobbles WHERE service=?\
+                                  ORDER BY timestamp LIMIT ?",
+                                 (service, limit))
+            keys = ["id", "artist", "album", "title", "timestamp",
+                    "duration", "tracknumber", "mb_track_id", "mb_album_id"]
+            return [dict(zip(keys, row)) for row in result]
+
+    def get_count(self, service):
+        """
+            Get pending listens count for service
+            @param service as str
+            @return int
+            @thread safe
+        """
+        with SqlCursor(self) as sql:
+            result = sql.execute("SELECT COUNT(*) FROM scrobbles\
+                                  WHERE service=?", (service,))
+            return result.fetchone()[0]
+
+    def submit(self, service, callback, batch_size, retry):
+        """
+            Submit journaled listens in a thread, by batches
+            callback(listens) must return a ScrobbleResult
+            On failure, retry() is called later in main loop
+            @param service as str
+            @param callback as function
+            @param batch_size as int
+            @param retry as function
+        """
+        with self.__lock:
+            if service in self.__running:
+                return
+            self.__running.add(service)
+        helper = TaskHelper()
+        helper.run(self.__submit, service, callback, batch_size, retry,
+                   lane=TaskLane.NETWORK)
+
+    def get_stats(self, service):
+        """
+            Get delivery statistics for service
+            @param service as str
+            @return {str: int}
+            @thread safe
+        """
+        with self.__lock:
+            stats = dict(self.__stats.get(service, {"delivered": 0,
+                                                    "failed": 0,
+                                                    "rejected": 0}))
+        stats["backlog"] = self.get_count(service)
+        return stats
+
+    def get_cursor(self):
+        """
+            Return a new sqlite cursor
+        """
+        try:
+            return sqlite3.connect(self.__DB_PATH, 600.0)
+        except:
+            exit(-1)
+
+#######################
+# PRIVATE             #
+#######################
+    def __update_stats(self, service, key, count):
+        """
+            Update statistics for service
+            @param service as str
+            @param key as str
+            @param count as int
+        """
+        with self.__lock:
+            stats = self.__stats.setdefault(service, {"delivered": 0,
+                                                      "failed": 0,
+                                                      "rejected": 0})
+            stats[key] += count
+
+    def __submit(self, service, callback, batch_size, retry):
+        """
+            Submit listens until journal is empty or service fails
+            @param service as str
+            @param callback as function
+            @param batch_size as int
+            @param retry as function
+            @thread safe
+        """
+        try:
+            while True:
+                listens = self.get(service, batch_size)
+                if not listens:
+                    break
+                if self.__deliver(service, callback, listens):
+                    with self.__lock:
+                        self.__failures.pop(service, None)
+                    continue
+                # Failed listens are kept until service accepts them
+                ids = [(listen["id"],) for listen in listens]
+                with SqlCursor(self) as sql:
+                    sql.executemany("UPDATE scrobbles\
+                                     SET attempts=attempts+1 WHERE id=?",
+                                    ids)
+                self.__update_stats(service, "failed", len(ids))
+                with self.__lock:
+                    failures = self.__failures.get(service, 0)
+                    self.__failures[service] = failures + 1
+                    if service in self.__retries:
+                        break
+                    self.__retries.add(service)
+                delay = min(self.__RETRY_DELAY * 2 ** min(failures, 6),
+                            self.__MAX_RETRY_DELAY)
+                GLib.timeout_add_seconds(delay, self.__on_retry,
+                                         service, retry)
+                break
+        finally:
+            with self.__lock:
+                self.__running.discard(service)
+        Logger.debug("ScrobblesDatabase::__submit(): %s %s" %
+                     (service, self.get_stats(service)))
+
+    def __deliver(self, service, callback, listens):
+        """
+            Submit listens and remove them from journal
+            If service rejects listens, split them to find rejected ones
+            @param service as str
+            @param callback as function
+            @param listens as [{}]
+            @return False if submission failed
+            @thread safe
+        """
+        try:
+            result = callback(listens)
+        except Exception as e:
+            Logger.error("ScrobblesDatabase::__deliver(): %s" % e)
+            result = ScrobbleResult.FAILED
+        if result == ScrobbleResult.FAILED:
+            return False
+        elif result == ScrobbleResult.REJECTED and len(listens) > 1:
+            middle = len(listens) // 2
+            return self.__deliver(service, callback, listens[:middle]) and\
+                self.__deliver(service, callback, listens[middle:])
+        ids = [(listen["id"],) for listen in listens]
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM scrobbles WHERE id=?", ids)
+        if result == ScrobbleResult.ACCEPTED:
+            self.__update_stats(service, "delivered", len(ids))
+        else:
+            Logger.warning("ScrobblesDatabase::__deliver(): %s rejected %s" %
+                           (service, listens[0]))
+            self.__update_stats(service, "rejected", len(ids))
+        return True
+
+    def __on_retry(self, service, retry):
+        """
+            Call retry function
+            @param service as str
+            @param retry as function
+        """
+        with self.__lock:
+            self.__retries.discard(service)
+        retry()
+        return False
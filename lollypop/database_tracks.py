@@ -15,6 +15,7 @@ from gettext import gettext as _
 import itertools
 
 from lollypop.sqlcursor import SqlCursor
+from lollypop.database_cache import RowCache
 from lollypop.define import App
 from lollypop.utils import noaccents
 
@@ -29,10 +30,11 @@ class TracksDatabase:
         """
             Init tracks database object
         """
-        pass
+        self.cache = RowCache(self.get_rows, 5000)
 
     def add(self, name, uri, duration, tracknumber, discnumber, discname,
-            album_id, year, popularity, rate, ltime, mtime, mb_track_id):
+            album_id, year, popularity, rate, ltime, mtime, mb_track_id,
+            artwork=None):
         """
             Add a new track to database
             @param name as string
@@ -49,15 +51,16 @@ class TracksDatabase:
             @param ltime as int
             @param mtime as int
             @param mb_track_id as str
+            @param artwork as bool/None (None if unknown)
             @return inserted rowid as int
             @warning: commit needed
         """
         with SqlCursor(App().db) as sql:
             result = sql.execute(
                 "INSERT INTO tracks (name, uri, duration, tracknumber,\
-                discnumber, discname, album_id,\
-                year, popularity, rate, ltime, mtime, mb_track_id) VALUES\
-                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
+                discnumber, discname, album_id, year, popularity, rate,\
+                ltime, mtime, mb_track_id, artwork) VALUES\
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", (
                     name,
                     uri,
                     duration,
@@ -70,7 +73,9 @@ class TracksDatabase:
                     rate,
                     ltime,
                     mtime,
-                    mb_track_id))
+                    mb_track_id,
+                    artwork))
+            self.cache.invalidate(result.lastrowid)
             return result.lastrowid
 
     def add_artist(self, track_id, artist_id):
@@ -164,6 +169,57 @@ class TracksDatabase:
                 return v[0]
             return None
 
+    def get_rows(self, track_ids):
+        """
+            Get attributes for tracks in one pass, see objects.Track
+            @param track_ids as [int]
+            @return {track id as int: {attribute as str: object}}
+        """
+        with SqlCursor(App().db) as sql:
+            rows = {}
+            filters = tuple(track_ids)
+            placeholders = ",".join("?" * len(track_ids))
+            result = sql.execute("SELECT tracks.rowid, tracks.name,\
+                                  tracks.uri, tracks.album_id, albums.name,\
+                                  tracks.popularity, tracks.duration,\
+                                  tracks.year, tracks.mtime,\
+                                  tracks.mb_track_id\
+                                  FROM tracks LEFT JOIN albums\
+                                  ON albums.rowid=tracks.album_id\
+                                  WHERE tracks.rowid IN (%s)" %
+                                 placeholders, filters)
+            for (track_id, name, uri, album_id, album_name, popularity,
+                 duration, year, mtime, mb_track_id) in result:
+                rows[track_id] = {"name": name,
+                                  "uri": uri,
+                                  "album_id": album_id,
+                                  "album_name": album_name or _("Unknown"),
+                                  "popularity": popularity,
+                                  "duration": duration,
+                                  "year": str(year) if year else "",
+                                  "mtime": mtime,
+                                  "mb_track_id": mb_track_id,
+                                  "artist_ids": [],
+                                  "artists": [],
+                                  "genre_ids": [],
+                                  "genres": []}
+            for (table, field) in [("artists", "artist"),
+                                   ("genres", "genre")]:
+                result = sql.execute("SELECT track_{0}s.track_id,\
+                                      track_{0}s.{0}_id, {1}.name\
+                                      FROM track_{0}s LEFT JOIN {1}\
+                                      ON {1}.rowid=track_{0}s.{0}_id\
+                                      WHERE track_{0}s.track_id IN ({2})\
+                                      ORDER BY track_{0}s.rowid".format(
+                                          field, table, placeholders),
+                                     filters)
+                for (track_id, object_id, name) in result:
+                    if track_id in rows.keys():
+                        rows[track_id][field + "_ids"].append(object_id)
+                        if name is not None:
+                            rows[track_id][table].append(name)
+            return rows
+
     def get_name(self, track_id):
         """
             Get track name for track id
@@ -251,6 +307,7 @@ class TracksDatabase:
                         (uri, track_id))
             if uri.startswith("http") or uri.startswith("https"):
                 self.set_duration(track_id, 0)
+        self.cache.invalidate(track_id)
 
     def set_rate(self, track_id, rate):
         """
@@ -262,6 +319,7 @@ class TracksDatabase:
             sql.execute("UPDATE tracks SET rate=?\
                          WHERE rowid=?",
                         (rate, track_id))
+        self.cache.invalidate(track_id)
 
     def get_album_id(self, track_id):
         """
@@ -277,6 +335,37 @@ class TracksDatabase:
                 return v[0]
             return -1
 
+    def get_artwork_track(self, album_id):
+        """
+            Get track to read embedded artwork from for album,
+            tracks with artwork first, then tracks not checked yet
+            @param album id as int
+            @return (track id as int, uri as str, artwork as bool/None)/None
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, uri, artwork FROM tracks\
+                                  WHERE album_id=?\
+                                  AND (artwork IS NULL OR artwork=1)\
+                                  ORDER BY artwork DESC, discnumber,\
+                                  tracknumber LIMIT 1", (album_id,))
+            v = result.fetchone()
+            if v is not None:
+                return (v[0], v[1], None if v[2] is None else bool(v[2]))
+            return None
+
+    def set_artwork(self, track_id, artwork):
+        """
+            Set embedded artwork availability
+            @param track id as int
+            @param artwork as bool
+        """
+        with SqlCursor(App().db) as sql:
+            try:
+                sql.execute("UPDATE tracks SET artwork=? WHERE rowid=?",
+                            (artwork, track_id))
+            except:  # Database is locked
+                pass
+
     def get_mb_track_id(self, track_id):
         """
             Get MusicBrainz recording id for track id
@@ -426,6 +515,7 @@ class TracksDatabase:
             sql.execute("UPDATE tracks\
                          SET duration=?\
                          WHERE rowid=?", (duration, track_id,))
+        self.cache.invalidate(track_id)
 
     def is_empty(self):
         """
@@ -530,6 +620,7 @@ class TracksDatabase:
             current += 1
             sql.execute("UPDATE tracks set popularity=? WHERE rowid=?",
                         (current, track_id))
+        self.cache.invalidate(track_id)
 
     def set_listened_at(self, track_id, time):
         """
@@ -613,6 +704,7 @@ class TracksDatabase:
                             (popularity, track_id))
             except:  # Database is locked
                 pass
+        self.cache.invalidate(track_id)
 
     def get_popularity(self, track_id):
         """
@@ -675,6 +767,7 @@ class TracksDatabase:
             @param track_id as int
             @warning commit needed
         """
+        self.cache.invalidate(track_id)
         with SqlCursor(App().db) as sql:
             sql.execute("DELETE FROM track_artists\
                          WHERE track_id = ?", (track_id,))
@@ -694,6 +787,21 @@ class TracksDatabase:
                                  ("%" + noaccents(searched) + "%",))
             return list(itertools.chain(*result))
 
+    def search_fts(self, query, limit=25):
+        """
+            Search for tracks matching full text query, best first
+            @param query as str (FTS5 MATCH expression)
+            @param limit as int
+            @return [(track id as int, score as float)]
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT rowid, -bm25(tracks_fts)\
+                                  FROM tracks_fts\
+                                  WHERE tracks_fts MATCH ?\
+                                  ORDER BY rank LIMIT ?",
+                                 (query, limit))
+            return list(result)
+
     def search_track(self, artist, title):
         """
             Get track id for artist and title
@@ -715,6 +823,29 @@ class TracksDatabase:
                 return track_id
         return None
 
+    def get_artists_titles(self):
+        """
+            Get all tracks artists and titles, ordered by track id
+            and then by artist
+            @return [(track id as int, title as str, artist as str,
+                      album artist as bool)]
+            @thread safe
+        """
+        with SqlCursor(App().db) as sql:
+            result = sql.execute("SELECT tracks.rowid, tracks.name,\
+                                  artists.name,\
+                                  EXISTS(SELECT 1 FROM album_artists\
+                                         WHERE album_artists.album_id=\
+                                               tracks.album_id\
+                                         AND album_artists.artist_id=\
+                                             artists.rowid)\
+                                  FROM tracks, track_artists, artists\
+                                  WHERE track_artists.track_id=tracks.rowid\
+                                  AND artists.rowid=track_artists.artist_id\
+                                  ORDER BY tracks.rowid,\
+                                  track_artists.rowid")
+            return list(result)
+
     def remove(self, track_id):
         """
             Remove track
@@ -727,3 +858,4 @@ class TracksDatabase:
                          WHERE track_id=?", (track_id,))
             sql.execute("DELETE FROM tracks\
                          WHERE rowid=?", (track_id,))
+        self.cache.invalidate(track_id)
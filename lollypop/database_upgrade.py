@@ -63,6 +63,11 @@ class DatabaseUpgrade:
             26: self.__upgrade_26,
             27: "UPDATE tracks SET duration=CAST(duration AS INT)",
             28: self.__upgrade_28,
+            29: self.__upgrade_29,
+            30: self.__upgrade_30,
+            31: self.__upgrade_31,
+            # Embedded artwork: NULL unknown, 0 none, 1 available
+            32: "ALTER TABLE tracks ADD artwork INT",
         }
 
     def upgrade(self, db):
@@ -567,3 +572,69 @@ class DatabaseUpgrade:
             if list(itertools.chain(*result)):
                 App().settings.set_value("show-compilations",
                                          GLib.Variant("b", True))
+
+    def __upgrade_29(self, db):
+        """
+            Add full text search tables for tracks, albums and artists
+        """
+        with SqlCursor(db) as sql:
+            for table in ["tracks", "albums", "artists"]:
+                sql.execute("CREATE VIRTUAL TABLE %s_fts USING fts5(name)" %
+                            table)
+                sql.execute("""CREATE TRIGGER {table}_fts_insert
+                               AFTER INSERT ON {table}
+                               BEGIN
+                                INSERT INTO {table}_fts (rowid, name)
+                                VALUES (new.rowid, new.name);
+                               END""".format(table=table))
+                sql.execute("""CREATE TRIGGER {table}_fts_delete
+                               AFTER DELETE ON {table}
+                               BEGIN
+                                DELETE FROM {table}_fts
+                                WHERE rowid=old.rowid;
+                               END""".format(table=table))
+                sql.execute("""CREATE TRIGGER {table}_fts_update
+                               AFTER UPDATE OF name ON {table}
+                               BEGIN
+                                UPDATE {table}_fts SET name=new.name
+                                WHERE rowid=old.rowid;
+                               END""".format(table=table))
+                sql.execute("INSERT INTO %s_fts (rowid, name)\
+                             SELECT rowid, name FROM %s" % (table, table))
+
+    def __upgrade_30(self, db):
+        """
+            Add directories manifest used by incremental scans
+        """
+        with SqlCursor(db) as sql:
+            sql.execute("""CREATE TABLE directories (
+                                        id INTEGER PRIMARY KEY,
+                                        uri TEXT NOT NULL,
+                                        mtime INT NOT NULL,
+                                        count INT NOT NULL)""")
+            sql.execute("CREATE UNIQUE index idx_dir ON directories(uri)")
+
+    def __upgrade_31(self, db):
+        """
+            Add sort keys and indexes for views filters and sorts,
+            sort keys are set on startup, see Application::init()
+        """
+        with SqlCursor(db) as sql:
+            sql.execute("ALTER TABLE albums ADD sortkey INT")
+            sql.execute("ALTER TABLE artists ADD sortkey INT")
+            sql.execute("CREATE index idx_ag_genre\
+                         ON album_genres(genre_id, album_id)")
+            sql.execute("CREATE index idx_aa_artist\
+                         ON album_artists(artist_id, album_id)")
+            sql.execute("CREATE index idx_tg_genre\
+                         ON track_genres(genre_id, track_id)")
+            sql.execute("CREATE index idx_ta_artist\
+                         ON track_artists(artist_id, track_id)")
+            sql.execute("CREATE index idx_tracks_album\
+                         ON tracks(album_id, discnumber, tracknumber)")
+            sql.execute("CREATE index idx_albums_sort ON albums(sortkey)")
+            sql.execute("CREATE index idx_albums_year\
+                         ON albums(year, sortkey)")
+            sql.execute("CREATE index idx_albums_pop\
+                         ON albums(popularity DESC, sortkey)")
+            sql.execute("CREATE index idx_artists_sort ON artists(sortkey)")
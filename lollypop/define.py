@@ -65,6 +65,31 @@ class ArtSize:
     MAX = 4000
 
 
+class LookupResult:
+    ERROR = -1           # Network or service error
+    NOT_FOUND = 0
+    FOUND = 1
+
+
+class ScrobbleResult:
+    ACCEPTED = 0
+    FAILED = 1           # Network or service error, retry later
+    REJECTED = 2         # Service refused listens, never retry
+
+
+class DownloadPriority:
+    LOW = 0              # Background caching
+    NORMAL = 1
+    HIGH = 2             # Artwork for visible widgets
+
+
+class TaskLane:
+    UI = 0               # Loads for visible widgets
+    BACKGROUND = 1       # Database and files
+    NETWORK = 2          # Web services
+    LONG = 3             # Jobs running for minutes: sync, import, cleanup
+
+
 class Shuffle:
     NONE = 0             # No shuffle
     TRACKS = 1           # Shuffle by tracks on genre
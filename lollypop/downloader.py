@@ -17,7 +17,8 @@ from base64 import b64encode
 
 from lollypop.information_store import InformationStore
 from lollypop.define import App, GOOGLE_API_ID, Type
-from lollypop.define import SPOTIFY_CLIENT_ID, SPOTIFY_SECRET
+from lollypop.define import DownloadPriority, LookupResult
+from lollypop.define import SPOTIFY_CLIENT_ID, SPOTIFY_SECRET, TaskLane
 from lollypop.utils import get_network_available
 from lollypop.logger import Logger
 from lollypop.helper_task import TaskHelper
@@ -32,24 +33,21 @@ class Downloader:
         """
             Init art downloader
         """
-        self.__albums_queue = []
-        self.__albums_history = []
-        self.__in_albums_download = False
+        self.__albums_history = set()
         self.__cache_artists_running = False
         InformationStore.init()
 
-    def cache_album_art(self, album_id):
+    def cache_album_art(self, album_id, priority=DownloadPriority.HIGH):
         """
-            Download album artwork
+            Download album artwork, last requested first
             @param album id as int
+            @param priority as DownloadPriority
         """
         if album_id in self.__albums_history:
             return
         if get_network_available():
-            self.__albums_queue.append(album_id)
-            if not self.__in_albums_download:
-                helper = TaskHelper()
-                helper.run(self.__cache_albums_art)
+            App().download_helper.run(priority, ("album", album_id),
+                                      self.__cache_album_art, album_id)
 
     def cache_artists_info(self):
         """
@@ -59,7 +57,7 @@ class Downloader:
             return
         self.__cache_artists_running = True
         helper = TaskHelper()
-        helper.run(self.__cache_artists_artwork)
+        helper.run(self.__cache_artists_artwork, lane=TaskLane.LONG)
 
     def get_google_search_uri(self, search):
         """
@@ -100,18 +98,32 @@ class Downloader:
         """
             Return lastfm artist information
             @param artist as str
-            @return uri as str
+            @return (LookupResult, uri as str/None)
         """
-        if App().lastfm is not None:
-            return App().lastfm.get_artist_artwork_uri(artist)
-        else:
-            return None
+        if App().lastfm is None or not get_network_available():
+            return (LookupResult.ERROR, None)
+        from pylast import WSError
+        try:
+            uri = App().lastfm.get_artist_artwork_uri(artist)
+            if uri is not None:
+                return (LookupResult.FOUND, uri)
+        except WSError as e:
+            Logger.debug("Downloader::_get_lastfm_artist_artwork(): %s [%s]" %
+                         (e, artist))
+            # Only "invalid parameters" means artist is unknown
+            if e.get_id() != "6":
+                return (LookupResult.ERROR, None)
+        except Exception as e:
+            Logger.debug("Downloader::_get_lastfm_artist_artwork(): %s [%s]" %
+                         (e, artist))
+            return (LookupResult.ERROR, None)
+        return (LookupResult.NOT_FOUND, None)
 
     def _get_deezer_artist_artwork_uri(self, artist):
         """
             Return deezer artist information
             @param artist as str
-            @return uri as str/None
+            @return (LookupResult, uri as str/None)
         """
         try:
             artist_formated = GLib.uri_escape_string(
@@ -120,19 +132,21 @@ class Downloader:
                   "q=%s&output=json&index=0&limit=1&" % artist_formated
             helper = TaskHelper()
             (status, data) = helper.load_uri_content_sync(uri, None)
-            if status:
+            if status and data:
                 decode = json.loads(data.decode("utf-8"))
-                return decode["data"][0]["picture_xl"]
+                if not decode["data"]:
+                    return (LookupResult.NOT_FOUND, None)
+                return (LookupResult.FOUND, decode["data"][0]["picture_xl"])
         except Exception as e:
             Logger.debug("Downloader::_get_deezer_artist_artwork(): %s [%s]" %
                          (e, artist))
-        return None
+        return (LookupResult.ERROR, None)
 
     def _get_spotify_artist_artwork_uri(self, artist):
         """
             Return spotify artist information
             @param artist as str
-            @return uri as str/None
+            @return (LookupResult, uri as str/None)
         """
         try:
             artist_formated = GLib.uri_escape_string(
@@ -143,53 +157,50 @@ class Downloader:
             helper = TaskHelper()
             helper.add_header("Authorization", token)
             (status, data) = helper.load_uri_content_sync(uri, None)
-            if status:
+            if status and data:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["artists"]["items"]:
-                    if item["name"].lower() == artist.lower():
-                        return item["images"][0]["url"]
+                    if item["name"].lower() == artist.lower() and\
+                            item["images"]:
+                        return (LookupResult.FOUND, item["images"][0]["url"])
+                return (LookupResult.NOT_FOUND, None)
         except Exception as e:
             Logger.debug("Downloader::_get_spotify_artist_artwork(): %s [%s]" %
                          (e, artist))
-        return None
+        return (LookupResult.ERROR, None)
 
     def _get_deezer_album_artwork(self, artist, album):
         """
             Get album artwork from deezer
             @param artist as string
             @param album as string
-            @return image as bytes
+            @return (LookupResult, image as bytes/None)
             @tread safe
         """
-        image = None
         try:
             album_formated = GLib.uri_escape_string(album, None, True)
             uri = "https://api.deezer.com/search/album/?" +\
                   "q=%s&output=json" % album_formated
             helper = TaskHelper()
             (status, data) = helper.load_uri_content_sync(uri, None)
-            if status:
+            if status and data:
                 decode = json.loads(data.decode("utf-8"))
-                uri = None
                 for item in decode["data"]:
                     if item["artist"]["name"].lower() == artist.lower():
-                        uri = item["cover_xl"]
-                        break
-                if uri is not None:
-                    (status, image) = helper.load_uri_content_sync(uri, None)
+                        return self.__load_artwork(item["cover_xl"])
+                return (LookupResult.NOT_FOUND, None)
         except Exception as e:
             Logger.error("Downloader::__get_deezer_album_artwork: %s" % e)
-        return image
+        return (LookupResult.ERROR, None)
 
     def _get_spotify_album_artwork(self, artist, album):
         """
             Get album artwork from spotify
             @param artist as string
             @param album as string
-            @return image as bytes
+            @return (LookupResult, image as bytes/None)
             @tread safe
         """
-        image = None
         artists_spotify_ids = []
         try:
             token = self.__get_spotify_token(None)
@@ -201,40 +212,37 @@ class Downloader:
             helper = TaskHelper()
             helper.add_header("Authorization", token)
             (status, data) = helper.load_uri_content_sync(uri, None)
-            if status:
-                decode = json.loads(data.decode("utf-8"))
-                for item in decode["artists"]["items"]:
-                    artists_spotify_ids.append(item["id"])
+            if not status or not data:
+                return (LookupResult.ERROR, None)
+            decode = json.loads(data.decode("utf-8"))
+            for item in decode["artists"]["items"]:
+                artists_spotify_ids.append(item["id"])
 
             for artist_spotify_id in artists_spotify_ids:
                 uri = "https://api.spotify.com/v1/artists/" +\
                       "%s/albums" % artist_spotify_id
                 (status, data) = helper.load_uri_content_sync(uri, None)
-                if status:
-                    decode = json.loads(data.decode("utf-8"))
-                    uri = None
-                    for item in decode["items"]:
-                        if item["name"] == album:
-                            uri = item["images"][0]["url"]
-                            break
-                    if uri is not None:
-                        (status, image) = helper.load_uri_content_sync(uri,
-                                                                       None)
-                    break
+                if not status or not data:
+                    return (LookupResult.ERROR, None)
+                decode = json.loads(data.decode("utf-8"))
+                for item in decode["items"]:
+                    if item["name"] == album and item["images"]:
+                        return self.__load_artwork(item["images"][0]["url"])
+                break
+            return (LookupResult.NOT_FOUND, None)
         except Exception as e:
             Logger.error("Downloader::_get_album_art_spotify: %s [%s/%s]" %
                          (e, artist, album))
-        return image
+        return (LookupResult.ERROR, None)
 
     def _get_itunes_album_artwork(self, artist, album):
         """
             Get album artwork from itunes
             @param artist as string
             @param album as string
-            @return image as bytes
+            @return (LookupResult, image as bytes/None)
             @tread safe
         """
-        image = None
         try:
             album_formated = GLib.uri_escape_string(
                 album, None, True).replace(" ", "+")
@@ -242,40 +250,46 @@ class Downloader:
                   "?entity=album&term=%s" % album_formated
             helper = TaskHelper()
             (status, data) = helper.load_uri_content_sync(uri, None)
-            if status:
+            if status and data:
                 decode = json.loads(data.decode("utf-8"))
                 for item in decode["results"]:
                     if item["artistName"].lower() == artist.lower():
                         uri = item["artworkUrl60"].replace("60x60",
                                                            "512x512")
-                        (status, image) = helper.load_uri_content_sync(uri,
-                                                                       None)
-                        break
+                        return self.__load_artwork(uri)
+                return (LookupResult.NOT_FOUND, None)
         except Exception as e:
             Logger.error("Downloader::_get_album_art_itunes: %s [%s/%s]" %
                          (e, artist, album))
-        return image
+        return (LookupResult.ERROR, None)
 
     def _get_lastfm_album_artwork(self, artist, album):
         """
             Get album artwork from lastfm
             @param artist as string
             @param album as string
-            @return data as bytes
+            @return (LookupResult, image as bytes/None)
             @tread safe
         """
-        image = None
-        if App().lastfm is not None:
-            try:
-                helper = TaskHelper()
-                last_album = App().lastfm.get_album(artist, album)
-                uri = last_album.get_cover_image(4)
-                if uri is not None:
-                    (status, image) = helper.load_uri_content_sync(uri, None)
-            except Exception as e:
-                Logger.error("Downloader::_get_album_art_lastfm: %s [%s/%s]" %
-                             (e, artist, album))
-        return image
+        if App().lastfm is None:
+            return (LookupResult.ERROR, None)
+        from pylast import WSError
+        try:
+            last_album = App().lastfm.get_album(artist, album)
+            uri = last_album.get_cover_image(4)
+            if uri is not None:
+                return self.__load_artwork(uri)
+        except WSError as e:
+            Logger.debug("Downloader::_get_album_art_lastfm: %s [%s/%s]" %
+                         (e, artist, album))
+            # Only "invalid parameters" means album is unknown
+            if e.get_id() != "6":
+                return (LookupResult.ERROR, None)
+        except Exception as e:
+            Logger.error("Downloader::_get_album_art_lastfm: %s [%s/%s]" %
+                         (e, artist, album))
+            return (LookupResult.ERROR, None)
+        return (LookupResult.NOT_FOUND, None)
 
 #######################
 # PRIVATE             #
@@ -291,7 +305,7 @@ class Downloader:
             credentials = "%s:%s" % (SPOTIFY_CLIENT_ID, SPOTIFY_SECRET)
             encoded = b64encode(credentials.encode("utf-8"))
             credentials = encoded.decode("utf-8")
-            session = Soup.Session.new()
+            session = App().download_helper.session
             data = {"grant_type": "client_credentials"}
             msg = Soup.form_request_new_from_hash("POST", token_uri, data)
             msg.request_headers.append("Authorization",
@@ -307,73 +321,104 @@ class Downloader:
 
     def __cache_artists_artwork(self):
         """
-            Cache artwork for all artists
+            Queue artwork download for all artists
+            @thread safe
         """
-        # Then cache for lastfm/spotify/deezer/...
         for (artist_id, artist, sort) in App().artists.get([]):
-            if not get_network_available() or\
-                    InformationStore.artwork_exists(artist):
+            if not get_network_available():
+                break
+            if InformationStore.artwork_exists(artist):
                 continue
-            artwork_set = False
-            for (api, helper, unused) in InformationStore.WEBSERVICES:
-                Logger.debug("Downloader::__cache_artists_info(): %s@%s" %
-                             (artist, api))
-                if helper is None:
-                    continue
-                try:
-                    method = getattr(self, helper)
-                    uri = method(artist)
-                    if uri is not None:
-                        (status, data) = TaskHelper().load_uri_content_sync(
-                            uri,
-                            None)
-                        if status:
-                            InformationStore.add_artist_artwork(
-                                artist,
-                                data)
-                            Logger.debug("""Downloader::
-                                         __cache_artists_info(): %s""" % uri)
-                        else:
-                            InformationStore.add_artist_artwork(
-                                artist,
-                                None)
-                except Exception as e:
-                    Logger.error("Downloader::__cache_artists_info(): %s, %s" %
-                                 (e, artist))
-                    InformationStore.add_artist_artwork(
-                                artist,
-                                None)
-            if artwork_set:
-                GLib.idle_add(App().art.emit, "artist-artwork-changed", artist)
+            App().download_helper.run(DownloadPriority.LOW,
+                                      ("artist", artist),
+                                      self.__cache_artist_artwork,
+                                      artist)
         self.__cache_artists_running = False
 
-    def __cache_albums_art(self):
+    def __cache_artist_artwork(self, artist):
         """
-            Cache albums artwork (from queue)
+            Cache artwork for artist, from lastfm/spotify/deezer/...
+            @param artist as str
             @thread safe
         """
-        self.__in_albums_download = True
+        if InformationStore.artwork_exists(artist):
+            return
+        artwork_set = False
+        for (api, helper, unused) in InformationStore.WEBSERVICES:
+            Logger.debug("Downloader::__cache_artist_artwork(): %s@%s" %
+                         (artist, api))
+            if helper is None or not self.__is_available(api) or\
+                    App().lookups.is_cached(api, "artist", artist):
+                continue
+            try:
+                method = getattr(self, helper)
+                (result, uri) = method(artist)
+                if result == LookupResult.FOUND:
+                    (result, data) = self.__load_artwork(uri)
+                if result == LookupResult.FOUND:
+                    InformationStore.add_artist_artwork(artist, data)
+                    artwork_set = True
+                    Logger.debug("""Downloader::
+                                 __cache_artist_artwork(): %s""" % uri)
+            except Exception as e:
+                Logger.error("Downloader::__cache_artist_artwork(): %s, %s" %
+                             (e, artist))
+                result = LookupResult.ERROR
+            App().lookups.set_result(api, "artist", artist, result)
+            if artwork_set:
+                break
+        if artwork_set:
+            GLib.idle_add(App().art.emit, "artist-artwork-changed", artist)
+
+    def __cache_album_art(self, album_id):
+        """
+            Cache album artwork
+            @param album id as int
+            @thread safe
+        """
+        if album_id in self.__albums_history:
+            return
+        self.__albums_history.add(album_id)
         try:
-            while self.__albums_queue:
-                album_id = self.__albums_queue.pop()
-                album = App().albums.get_name(album_id)
-                artist_ids = App().albums.get_artist_ids(album_id)
-                is_compilation = artist_ids and\
-                    artist_ids[0] == Type.COMPILATIONS
-                if is_compilation:
-                    artist = ""
-                else:
-                    artist = ", ".join(App().albums.get_artists(album_id))
-                for (api, unused, helper) in InformationStore.WEBSERVICES:
-                    if helper is None:
-                        continue
-                    method = getattr(self, helper)
-                    data = method(artist, album)
-                    if data is not None:
-                        self.__albums_history.append(album_id)
-                        App().art.save_album_artwork(data, album_id)
-                        break
+            album = App().albums.get_name(album_id)
+            artist_ids = App().albums.get_artist_ids(album_id)
+            is_compilation = artist_ids and\
+                artist_ids[0] == Type.COMPILATIONS
+            if is_compilation:
+                artist = ""
+            else:
+                artist = ", ".join(App().albums.get_artists(album_id))
+            item = "%s - %s" % (artist, album)
+            for (api, unused, helper) in InformationStore.WEBSERVICES:
+                if helper is None or not self.__is_available(api) or\
+                        App().lookups.is_cached(api, "album", item):
+                    continue
+                method = getattr(self, helper)
+                (result, data) = method(artist, album)
+                App().lookups.set_result(api, "album", item, result)
+                if result == LookupResult.FOUND:
+                    App().art.save_album_artwork(data, album_id)
+                    break
         except Exception as e:
-            Logger.error("Downloader::__cache_albums_art: %s" % e)
-        self.__albums_history.append(album_id)
-        self.__in_albums_download = False
+            Logger.error("Downloader::__cache_album_art: %s" % e)
+
+    def __load_artwork(self, uri):
+        """
+            Load artwork, an empty content is an error
+            @param uri as str
+            @return (LookupResult, data as bytes/None)
+            @thread safe
+        """
+        (status, data) = TaskHelper().load_uri_content_sync(uri, None)
+        if status and data:
+            return (LookupResult.FOUND, data)
+        return (LookupResult.ERROR, None)
+
+    def __is_available(self, api):
+        """
+            True if web service is configured, lookups for services not
+            configured are not cached
+            @param api as str
+            @return bool
+        """
+        return api != "lastfm" or App().lastfm is not None
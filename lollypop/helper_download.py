@@ -0,0 +1,233 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import gi
+gi.require_version("Soup", "2.4")
+from gi.repository import Soup
+
+from threading import Thread, Lock, Condition, BoundedSemaphore
+from heapq import heappush, heappop
+from time import time, sleep
+from urllib.parse import urlparse
+
+from lollypop.logger import Logger
+
+
+class DownloadHelper:
+    """
+        Download scheduler
+        - One Soup session, connections are kept alive and reused
+        - A few connections by host
+        - A minimal delay between requests to a same service
+        - Retry with backoff on server errors
+        - Jobs run by priority, last queued first
+    """
+    __WORKERS = 4
+    __MAX_BY_HOST = 2
+    __TIMEOUT = 30
+    __RETRIES = 3
+    # Seconds, doubled on each retry
+    __BACKOFF = 1.0
+    # Minimal delay in seconds between two requests, by host
+    __RATES = {"api.spotify.com": 0.2,
+               "api.deezer.com": 0.2,
+               "itunes.apple.com": 3.0,
+               "ws.audioscrobbler.com": 0.2,
+               "www.googleapis.com": 1.0,
+               "musicbrainz.org": 1.0}
+
+    def __init__(self):
+        """
+            Init helper
+        """
+        self.__session = Soup.Session.new()
+        self.__session.set_property("max-conns-per-host", self.__MAX_BY_HOST)
+        self.__session.set_property("max-conns",
+                                    self.__WORKERS * self.__MAX_BY_HOST)
+        self.__session.set_property("timeout", self.__TIMEOUT)
+        self.__session.set_property("accept-language-auto", True)
+        self.__lock = Lock()
+        self.__condition = Condition(self.__lock)
+        self.__hosts = {}
+        self.__next_requests = {}
+        self.__queue = []
+        self.__jobs = {}
+        self.__threads = []
+        self.__count = 0
+        self.__stats = {"requests": 0, "retries": 0, "errors": 0}
+
+    @property
+    def session(self):
+        """
+            Shared session
+            @return Soup.Session
+        """
+        return self.__session
+
+    def run(self, priority, key, command, *args):
+        """
+            Queue command(*args), a job already queued for key is
+            moved to the front of its priority
+            @param priority as DownloadPriority
+            @param key as object
+            @param command as function
+        """
+        with self.__lock:
+            job = self.__jobs.get(key, None)
+            if job is not None:
+                # Invalidate queued entry
+                job[3] = None
+                priority = max(priority, -job[0])
+            self.__count += 1
+            job = [-priority, -self.__count, key, (command, args)]
+            self.__jobs[key] = job
+            heappush(self.__queue, job)
+            if len(self.__threads) < self.__WORKERS:
+                thread = Thread(target=self.__run)
+                thread.daemon = True
+                self.__threads.append(thread)
+                thread.start()
+            else:
+                self.__condition.notify()
+
+    def load_uri_content_sync(self, uri, cancellable=None, headers=[]):
+        """
+            Load uri, retry on server errors
+            @param uri as str
+            @param cancellable as Gio.Cancellable
+            @param headers as [(str, str)]
+            @return (loaded as bool, content as bytes)
+        """
+        host = urlparse(uri).netloc
+        for attempt in range(0, self.__RETRIES + 1):
+            if cancellable is not None and cancellable.is_cancelled():
+                break
+            with self.__get_semaphore(host):
+                self.__wait_for_host(host)
+                (status, content, delay) = self._load(uri,
+                                                      cancellable,
+                                                      headers)
+            with self.__lock:
+                self.__stats["requests"] += 1
+            if 200 <= status < 300:
+                return (True, content)
+            # Client errors, retrying will not help
+            elif delay is None or attempt == self.__RETRIES:
+                break
+            with self.__lock:
+                self.__stats["retries"] += 1
+            sleep(max(delay, self.__BACKOFF * 2 ** attempt))
+        with self.__lock:
+            self.__stats["errors"] += 1
+        Logger.warning("DownloadHelper::load_uri_content_sync(): %s" % uri)
+        return (False, b"")
+
+    def get_stats(self):
+        """
+            Get scheduler statistics
+            @return {str: int}
+        """
+        with self.__lock:
+            stats = dict(self.__stats)
+            stats["queued"] = len(self.__jobs)
+            return stats
+
+#######################
+# PROTECTED           #
+#######################
+    def _load(self, uri, cancellable, headers):
+        """
+            Run request
+            @param uri as str
+            @param cancellable as Gio.Cancellable
+            @param headers as [(str, str)]
+            @return (status as int, content as bytes,
+                     retry delay as float/None if retry is useless)
+        """
+        try:
+            msg = Soup.Message.new("GET", uri)
+            request_headers = msg.get_property("request-headers")
+            for (name, value) in headers:
+                request_headers.append(name, value)
+            stream = self.__session.send(msg, cancellable)
+            status = msg.get_property("status-code")
+            content = bytearray(0)
+            buf = stream.read_bytes(4096, cancellable).get_data()
+            while buf:
+                content += buf
+                buf = stream.read_bytes(4096, cancellable).get_data()
+            stream.close()
+            if status == 429 or status >= 500:
+                retry_after = msg.get_property("response-headers").get_one(
+                    "Retry-After")
+                delay = 0
+                if retry_after is not None and retry_after.isdigit():
+                    delay = int(retry_after)
+                return (status, b"", delay)
+            return (status, bytes(content), None)
+        except Exception as e:
+            Logger.error("DownloadHelper::_load(): %s" % e)
+            if cancellable is not None and cancellable.is_cancelled():
+                return (0, b"", None)
+            # Network error, retry
+            return (0, b"", 0)
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_semaphore(self, host):
+        """
+            Get semaphore limiting connections to host
+            @param host as str
+            @return BoundedSemaphore
+        """
+        with self.__lock:
+            semaphore = self.__hosts.get(host, None)
+            if semaphore is None:
+                semaphore = BoundedSemaphore(self.__MAX_BY_HOST)
+                self.__hosts[host] = semaphore
+            return semaphore
+
+    def __wait_for_host(self, host):
+        """
+            Respect rate limit for host
+            @param host as str
+        """
+        rate = self.__RATES.get(host, 0)
+        if not rate:
+            return
+        with self.__lock:
+            now = time()
+            next_request = max(now, self.__next_requests.get(host, 0))
+            self.__next_requests[host] = next_request + rate
+        if next_request > now:
+            sleep(next_request - now)
+
+    def __run(self):
+        """
+            Run queued jobs
+            @thread safe
+        """
+        while True:
+            with self.__lock:
+                while not self.__queue:
+                    self.__condition.wait()
+                job = heappop(self.__queue)
+                # Moved to another place in queue
+                if job[3] is None:
+                    continue
+                del self.__jobs[job[2]]
+            (command, args) = job[3]
+            try:
+                command(*args)
+            except Exception as e:
+                Logger.error("DownloadHelper::__run(): %s" % e)
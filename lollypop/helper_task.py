@@ -10,12 +10,9 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-import gi
-gi.require_version("Soup", "2.4")
-from gi.repository import GLib, Soup
-
-from threading import Thread
+from gi.repository import GLib
 
+from lollypop.define import App, TaskLane
 from lollypop.logger import Logger
 
 
@@ -44,12 +41,14 @@ class TaskHelper:
             run command with params and return to callback
             @param command as function
             @param *args as command arguments
-            @param **kwd as { "callback": (function, *args) }
-        """
-        thread = Thread(target=self.__run,
-                        args=(command, kwd, *args))
-        thread.daemon = True
-        thread.start()
+            @param **kwd as { "callback": (function, *args),
+                              "lane": TaskLane,
+                              "cancellable": Gio.Cancellable }
+        """
+        lane = kwd.get("lane", TaskLane.BACKGROUND)
+        cancellable = kwd.get("cancellable", None)
+        App().task_pool.run(lane, self.__run, command, kwd, *args,
+                            cancellable=cancellable)
 
     def load_uri_content(self, uri, cancellable, callback, *args):
         """
@@ -60,9 +59,7 @@ class TaskHelper:
             @callback (uri as str, status as bool, content as bytes, args)
         """
         try:
-            session = Soup.Session.new()
-            session.set_property('accept-language-auto', True)
-            request = session.request(uri)
+            request = App().download_helper.session.request(uri)
             request.send_async(cancellable,
                                self.__on_request_send_async,
                                callback,
@@ -80,32 +77,9 @@ class TaskHelper:
             @param cancellable as Gio.Cancellable
             @return (loaded as bool, content as bytes)
         """
-        try:
-            session = Soup.Session.new()
-            # Post message
-            if self.__headers:
-                msg = Soup.Message.new("GET", uri)
-                headers = msg.get_property("request-headers")
-                for header in self.__headers:
-                    headers.append(header[0],
-                                   header[1])
-                session.send_message(msg)
-                body = msg.get_property("response-body")
-                bytes = body.flatten().get_data()
-            # Get message
-            else:
-                request = session.request(uri)
-                stream = request.send(cancellable)
-                bytes = bytearray(0)
-                buf = stream.read_bytes(1024, cancellable).get_data()
-                while buf:
-                    bytes += buf
-                    buf = stream.read_bytes(1024, cancellable).get_data()
-                stream.close()
-            return (True, bytes)
-        except Exception as e:
-            Logger.error("TaskHelper::load_uri_content_sync(): %s" % e)
-            return (False, b"")
+        return App().download_helper.load_uri_content_sync(uri,
+                                                           cancellable,
+                                                           self.__headers)
 
 #######################
 # PRIVATE             #
@@ -115,10 +89,14 @@ class TaskHelper:
             Pass command result to callback
             @param command as function
             @param *args as command arguments
-            @param kwd as { "callback": (function, *args) }
+            @param kwd as { "callback": (function, *args),
+                            "cancellable": Gio.Cancellable }
         """
         try:
             result = command(*args)
+            cancellable = kwd.get("cancellable", None)
+            if cancellable is not None and cancellable.is_cancelled():
+                return
             if "callback" in kwd.keys():
                 (callback, *callback_args) = kwd["callback"]
                 if callback is not None:
@@ -12,8 +12,11 @@
 
 from gi.repository import Gio, GLib, GdkPixbuf
 
+from threading import Lock
+
 from lollypop.utils import escape
-from lollypop.define import ArtSize, App
+from lollypop.helper_task import TaskHelper
+from lollypop.define import ArtSize, App, TaskLane
 from lollypop.logger import Logger
 
 
@@ -24,6 +27,17 @@ class InformationStore:
     _INFO_PATH = GLib.get_user_data_dir() + "/lollypop/info"
     _CACHE_PATH = GLib.get_user_cache_dir() + "/lollypop_info"
 
+    # ArtistView, SelectionList and InformationPopover sizes,
+    # for scale factors 1 and 2
+    _SIZES = sorted(set([ArtSize.ARTIST_SMALL * i * scale
+                         for i in [1, 2, 3] for scale in [1, 2]]))
+    # Escaped names with an artwork, value is False for empty artworks
+    _artworks = None
+    _thumbnails = set()
+    # Thumbnails being made, failed ones stay here
+    _pending = set()
+    _lock = Lock()
+
     WEBSERVICES = [("lastfm", "_get_lastfm_artist_artwork_uri",
                     "_get_lastfm_album_artwork"),
                    ("spotify", "_get_spotify_artist_artwork_uri",
@@ -47,91 +61,42 @@ class InformationStore:
                 d.make_directory_with_parents()
         except:
             Logger.info("Can't create %s" % InformationStore._CACHE_PATH)
+        helper = TaskHelper()
+        helper.run(InformationStore._load_index)
 
     def artwork_exists(artist):
         """
-            True if artwork exists
+            True if artwork exists, even if empty
             @param artist as str
             @return bool
+            @thread safe
         """
-        filepath = "%s/%s.jpg" % (InformationStore._INFO_PATH,
-                                  escape(artist))
-        InformationStore.migrate_store(artist, filepath)
-        return GLib.file_test(filepath, GLib.FileTest.EXISTS)
+        InformationStore._load_index()
+        with InformationStore._lock:
+            return escape(artist) in InformationStore._artworks
 
     def get_artwork_path(artist, size):
         """
-            Return path for artwork
+            Return path for artwork, thumbnail is made in background
+            if missing
             @param artist as string
             @param size as int
             @return path as string/None
         """
-        try:
-            extract = None
-            filepath = "%s/%s.jpg" % (
-                InformationStore._INFO_PATH,
-                escape(artist))
-            filepath_at_size = "%s/%s_%s.jpg" % (
-                InformationStore._CACHE_PATH,
-                escape(artist),
-                size)
-            InformationStore.migrate_store(artist, filepath)
-            f = Gio.File.new_for_path(filepath)
-            if not f.query_exists():
+        name = escape(artist)
+        filename = "%s_%s.jpg" % (name, size)
+        InformationStore._load_index()
+        with InformationStore._lock:
+            if not InformationStore._artworks.get(name, False):
                 return None
-            info = f.query_info(
-                "standard::size",
-                Gio.FileQueryInfoFlags.NONE)
-            if info.get_size() == 0:
+            if filename in InformationStore._thumbnails:
+                return "%s/%s" % (InformationStore._CACHE_PATH, filename)
+            if filename in InformationStore._pending:
                 return None
-            # Make cache for this size
-            f = Gio.File.new_for_path(filepath_at_size)
-            if not f.query_exists():
-                pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(filepath,
-                                                                size,
-                                                                size)
-                if pixbuf.get_height() > pixbuf.get_width():
-                    vertical = True
-                elif pixbuf.get_height() < pixbuf.get_width():
-                    vertical = False
-                else:
-                    extract = pixbuf
-                if extract is None:
-                    extract = GdkPixbuf.Pixbuf.new(
-                        GdkPixbuf.Colorspace.RGB,
-                        True, 8,
-                        size, size)
-                    if vertical:
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                            filepath,
-                            size,
-                            -1,
-                            True)
-                        diff = pixbuf.get_height() - size
-                        pixbuf.copy_area(0, diff / 2,
-                                         pixbuf.get_width(),
-                                         size,
-                                         extract,
-                                         0, 0)
-                    else:
-                        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(
-                            filepath,
-                            -1,
-                            size,
-                            True)
-                        diff = pixbuf.get_width() - size
-                        pixbuf.copy_area(diff / 2, 0,
-                                         size,
-                                         pixbuf.get_height(),
-                                         extract,
-                                         0, 0)
-                extract.savev(filepath_at_size, "jpeg",
-                              ["quality"], [str(App().settings.get_value(
-                                            "cover-quality").get_int32())])
-            return filepath_at_size
-        except Exception as e:
-            Logger.error("InformationStore::get_artwork_path(): %s" % e)
-            return None
+            InformationStore._pending.add(filename)
+        helper = TaskHelper()
+        helper.run(InformationStore._make_thumbnails, artist, [size])
+        return None
 
     def get_bio(artist):
         """
@@ -172,11 +137,12 @@ class InformationStore:
 
     def add_artist_artwork(artist, data):
         """
-            Add artist artwork to store
+            Add artist artwork to store, thumbnails are made in background
             @param artist as str
             @param data as bytes
         """
-        filepath = "%s/%s.jpg" % (InformationStore._INFO_PATH, escape(artist))
+        name = escape(artist)
+        filepath = "%s/%s.jpg" % (InformationStore._INFO_PATH, name)
         if data is None:
             f = Gio.File.new_for_path(filepath)
             fstream = f.replace(None, False,
@@ -195,6 +161,13 @@ class InformationStore:
             pixbuf.savev(filepath,
                          "jpeg", ["quality"], [str(App().settings.get_value(
                                                "cover-quality").get_int32())])
+        InformationStore._load_index()
+        with InformationStore._lock:
+            InformationStore._artworks[name] = data is not None
+        if data is not None:
+            helper = TaskHelper()
+            helper.run(InformationStore._make_thumbnails, artist,
+                       InformationStore._SIZES)
 
     def add_artist_bio(artist, content):
         """
@@ -214,47 +187,139 @@ class InformationStore:
 
     def uncache_artwork(artist, scale):
         """
-            Remove artwork from cache
+            Remove artwork thumbnails from cache
             @param artist as str
             @param scale factor as int
         """
-        # ArtistView::__set_artwork()
-        # InformationPopover::__set_artist_artwork()
-        for i in [1, 2, 3]:
-            filepath = "%s/%s_%s.jpg" % (InformationStore._CACHE_PATH,
-                                         escape(artist),
-                                         ArtSize.ARTIST_SMALL * scale * i)
-            f = Gio.File.new_for_path(filepath)
+        name = escape(artist)
+        InformationStore._load_index()
+        with InformationStore._lock:
+            filenames = [filename for filename in InformationStore._thumbnails
+                         if filename.rsplit("_", 1)[0] == name]
+            for filename in filenames:
+                InformationStore._thumbnails.discard(filename)
+                InformationStore._pending.discard(filename)
+        for filename in filenames:
+            f = Gio.File.new_for_path("%s/%s" % (InformationStore._CACHE_PATH,
+                                                 filename))
             try:
-                if f.query_exists():
-                    f.delete(None)
+                f.delete(None)
             except Exception as e:
                 Logger.error("InformationStore::uncache_artwork(): %s" % e)
 
-    def migrate_store(artist, filepath):
+    def _load_index():
         """
+            Load artworks and thumbnails index, only once
             Migrate from old lollypop store
-            @param artist as str
-            @param filepath as str
+            @thread safe
         """
-        # Migration code from lollypop <= 0.9.403
-        f = Gio.File.new_for_path(filepath)
-        if not f.query_exists():
-            for suffix in ["lastfm", "spotify", "deezer", "wikipedia"]:
-                suffix_filepath = "%s/%s_%s.jpg" % (
-                    InformationStore._INFO_PATH,
-                    escape(artist),
-                    suffix)
-                suffix_f = Gio.File.new_for_path(suffix_filepath)
-                if suffix_f.query_exists():
-                    info = suffix_f.query_info(
-                        "standard::size",
-                        Gio.FileQueryInfoFlags.NONE)
-                    if info.get_size() == 0:
+        with InformationStore._lock:
+            if InformationStore._artworks is not None:
+                return
+            artworks = {}
+            thumbnails = set()
+            migrations = {}
+            try:
+                d = Gio.File.new_for_path(InformationStore._INFO_PATH)
+                infos = d.enumerate_children(
+                    "standard::name,standard::size",
+                    Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                    None)
+                for info in infos:
+                    filename = info.get_name()
+                    if not filename.endswith(".jpg"):
                         continue
-                    suffix_f.move(
-                        f,
-                        Gio.FileCopyFlags.OVERWRITE,
-                        None,
-                        None)
-                    break
+                    name = filename[:-4]
+                    split = name.rsplit("_", 1)
+                    # Migration code from lollypop <= 0.9.403
+                    if len(split) == 2 and split[1] in ["lastfm", "spotify",
+                                                        "deezer", "wikipedia"]:
+                        if info.get_size() > 0:
+                            migrations[split[0]] = infos.get_child(info)
+                        continue
+                    artworks[name] = info.get_size() > 0
+                for (name, f) in migrations.items():
+                    if name in artworks:
+                        continue
+                    f.move(d.get_child("%s.jpg" % name),
+                           Gio.FileCopyFlags.OVERWRITE,
+                           None,
+                           None)
+                    artworks[name] = True
+                d = Gio.File.new_for_path(InformationStore._CACHE_PATH)
+                infos = d.enumerate_children(
+                    "standard::name",
+                    Gio.FileQueryInfoFlags.NOFOLLOW_SYMLINKS,
+                    None)
+                for info in infos:
+                    thumbnails.add(info.get_name())
+            except Exception as e:
+                Logger.error("InformationStore::_load_index(): %s" % e)
+            InformationStore._artworks = artworks
+            InformationStore._thumbnails = thumbnails
+        helper = TaskHelper()
+        helper.run(InformationStore._make_missing_thumbnails,
+                   lane=TaskLane.LONG)
+
+    def _make_missing_thumbnails():
+        """
+            Make missing thumbnails for artists artworks, artworks saved
+            before thumbnails were made by store have none
+            @thread safe
+        """
+        try:
+            for (artist_id, artist, sortname) in App().artists.get([]):
+                name = escape(artist)
+                with InformationStore._lock:
+                    if not InformationStore._artworks.get(name, False):
+                        continue
+                    sizes = []
+                    for size in InformationStore._SIZES:
+                        filename = "%s_%s.jpg" % (name, size)
+                        if filename not in InformationStore._thumbnails and\
+                                filename not in InformationStore._pending:
+                            InformationStore._pending.add(filename)
+                            sizes.append(size)
+                if sizes:
+                    InformationStore._make_thumbnails(artist, sizes)
+        except Exception as e:
+            Logger.error("InformationStore::_make_missing_thumbnails(): %s" %
+                         e)
+
+    def _make_thumbnails(artist, sizes):
+        """
+            Save square thumbnails for artist, artwork is decoded once
+            @param artist as str
+            @param sizes as [int]
+            @thread safe
+        """
+        name = escape(artist)
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(
+                "%s/%s.jpg" % (InformationStore._INFO_PATH, name))
+            width = pixbuf.get_width()
+            height = pixbuf.get_height()
+            quality = str(App().settings.get_value(
+                "cover-quality").get_int32())
+            for size in sizes:
+                filename = "%s_%s.jpg" % (name, size)
+                # Scale smallest side to size, then crop center
+                ratio = size / min(width, height)
+                scaled = pixbuf.scale_simple(
+                    max(size, round(width * ratio)),
+                    max(size, round(height * ratio)),
+                    GdkPixbuf.InterpType.BILINEAR)
+                thumbnail = scaled.new_subpixbuf(
+                    (scaled.get_width() - size) // 2,
+                    (scaled.get_height() - size) // 2,
+                    size,
+                    size)
+                thumbnail.savev("%s/%s" % (InformationStore._CACHE_PATH,
+                                           filename),
+                                "jpeg", ["quality"], [quality])
+                with InformationStore._lock:
+                    InformationStore._thumbnails.add(filename)
+                    InformationStore._pending.discard(filename)
+            GLib.idle_add(App().art.emit, "artist-artwork-changed", artist)
+        except Exception as e:
+            Logger.error("InformationStore::_make_thumbnails(): %s" % e)
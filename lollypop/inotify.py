@@ -10,35 +10,106 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
+from time import time
+from threading import Thread
+
 from gi.repository import Gio, GLib
 
 from lollypop.define import App
-from lollypop.utils import is_audio
+from lollypop.utils import is_audio, get_mtime
 from lollypop.logger import Logger
 
 
 class Inotify:
     """
         Inotify support
+        Changed uris are collected and scanned by batches
+        Directories are watched up to a budget of inotify watches,
+        others are polled
     """
-    # 10 second before updating database
-    __TIMEOUT = 10000
+    # 2 seconds without changes before updating database
+    __TIMEOUT = 2000
+    # But do not delay an update more than 10 seconds
+    __MAX_DELAY = 10
+    # Polled directories are checked every 5 minutes
+    __POLL_INTERVAL = 300
+    # Leave watches to other applications
+    __WATCHES_RATIO = 0.5
+    # Used if limit can't be read from /proc
+    __DEFAULT_WATCHES = 8192
+    # Monitors created by main loop iteration
+    __MONITORS_BY_IDLE = 100
+    __EVENTS = [Gio.FileMonitorEvent.CREATED,
+                Gio.FileMonitorEvent.DELETED,
+                Gio.FileMonitorEvent.CHANGES_DONE_HINT,
+                Gio.FileMonitorEvent.MOVED_IN,
+                Gio.FileMonitorEvent.MOVED_OUT,
+                Gio.FileMonitorEvent.RENAMED]
 
     def __init__(self):
         """
             Init inode notification
         """
         self.__monitors = {}
+        self.__pending_monitors = []
+        self.__monitors_id = None
+        self.__polled = {}
+        self.__poll_id = None
+        self.__poll_thread = None
         self.__timeout = None
+        self.__uris = set()
+        self.__first_change = 0
+        self.__limit = self.__get_limit()
+        self.__budget = int(self.__limit * self.__WATCHES_RATIO)
+
+    def set_directories(self, directories):
+        """
+            Watch directories, most recently modified first,
+            poll directories over budget
+            @param directories as {uri as str: mtime as int}
+        """
+        roots = App().settings.get_music_uris()
+        uris = sorted(directories.keys(),
+                      key=lambda uri: (uri not in roots, -directories[uri]))
+        watched = set(uris[:self.__budget])
+        for uri in list(self.__monitors.keys()):
+            if uri not in watched:
+                self.__monitors.pop(uri).cancel()
+        self.__pending_monitors = [uri for uri in uris[:self.__budget]
+                                   if uri not in self.__monitors.keys()]
+        self.__polled = {uri: directories[uri]
+                         for uri in uris[self.__budget:]}
+        self.__start()
+        Logger.info("Inotify::set_directories(): %s" % self.get_stats())
+
+    def add_directories(self, directories):
+        """
+            Watch or poll new directories
+            @param directories as {uri as str: mtime as int}
+        """
+        for (uri, mtime) in directories.items():
+            if uri in self.__monitors.keys() or\
+                    uri in self.__pending_monitors:
+                continue
+            elif uri in self.__polled.keys():
+                self.__polled[uri] = mtime
+            elif self.__get_watched() < self.__budget:
+                self.__pending_monitors.append(uri)
+            else:
+                self.__polled[uri] = mtime
+        self.__start()
 
     def add_monitor(self, uri):
         """
-            Add a monitor for uri
+            Add a monitor for uri if budget allows it
             @param uri as string
         """
         # Check if there is already a monitor for this uri
         if uri in self.__monitors.keys():
             return
+        # Will be polled after next scan
+        if self.__get_watched() >= self.__budget:
+            return
         try:
             f = Gio.File.new_for_uri(uri)
             monitor = f.monitor_directory(Gio.FileMonitorFlags.NONE,
@@ -49,53 +120,192 @@ class Inotify:
         except Exception as e:
             Logger.error("Inotify::add_monitor(): %s" % e)
 
+    def get_stats(self):
+        """
+            Get watched and polled directories count
+            @return {str: int}
+        """
+        return {"watched": len(self.__monitors),
+                "pending": len(self.__pending_monitors),
+                "polled": len(self.__polled),
+                "budget": self.__budget,
+                "limit": self.__limit}
+
 #######################
 # PRIVATE             #
 #######################
+    def __get_limit(self):
+        """
+            Get inotify watches limit for user
+            @return int
+        """
+        try:
+            with open("/proc/sys/fs/inotify/max_user_watches", "r") as f:
+                return int(f.read())
+        except Exception as e:
+            Logger.warning("Inotify::__get_limit(): %s" % e)
+        return self.__DEFAULT_WATCHES
+
+    def __get_watched(self):
+        """
+            Get watched directories count, pending ones included
+            @return int
+        """
+        return len(self.__monitors) + len(self.__pending_monitors)
+
+    def __start(self):
+        """
+            Create pending monitors and poll directories if needed
+        """
+        if self.__pending_monitors and self.__monitors_id is None:
+            self.__monitors_id = GLib.idle_add(self.__create_monitors,
+                                               priority=GLib.PRIORITY_LOW)
+        if self.__polled and self.__poll_id is None:
+            self.__poll_id = GLib.timeout_add_seconds(self.__POLL_INTERVAL,
+                                                      self.__poll)
+
+    def __create_monitors(self):
+        """
+            Create some pending monitors, do not block main loop
+        """
+        uris = self.__pending_monitors[:self.__MONITORS_BY_IDLE]
+        del self.__pending_monitors[:self.__MONITORS_BY_IDLE]
+        for uri in uris:
+            self.add_monitor(uri)
+        if self.__pending_monitors:
+            return True
+        self.__monitors_id = None
+
+    def __poll(self):
+        """
+            Check polled directories in a thread
+        """
+        if not self.__polled:
+            self.__poll_id = None
+            return False
+        running = self.__poll_thread is not None and\
+            self.__poll_thread.is_alive()
+        if not running and not App().scanner.is_locked():
+            self.__poll_thread = Thread(target=self.__poll_directories,
+                                        args=(dict(self.__polled),))
+            self.__poll_thread.daemon = True
+            self.__poll_thread.start()
+        return True
+
+    def __poll_directories(self, directories):
+        """
+            Look for directories modified since last scan
+            @param directories as {uri as str: mtime as int}
+            @thread safe
+        """
+        changed = {}
+        for (uri, mtime) in directories.items():
+            try:
+                f = Gio.File.new_for_uri(uri)
+                info = f.query_info("time::modified,time::modified-usec",
+                                    Gio.FileQueryInfoFlags.NONE,
+                                    None)
+                new_mtime = get_mtime(info)
+                if new_mtime != mtime:
+                    changed[uri] = new_mtime
+            except GLib.Error as e:
+                if e.matches(Gio.io_error_quark(),
+                             Gio.IOErrorEnum.NOT_FOUND):
+                    changed[uri] = None
+                else:
+                    Logger.error("Inotify::__poll_directories(): %s" % e)
+        if changed:
+            GLib.idle_add(self.__on_polled, changed)
+
+    def __schedule(self):
+        """
+            Delay update until changes settle
+        """
+        if self.__timeout is None:
+            self.__first_change = time()
+        # Wait for changes to settle, up to __MAX_DELAY
+        elif time() - self.__first_change < self.__MAX_DELAY:
+            GLib.source_remove(self.__timeout)
+        else:
+            return
+        self.__timeout = GLib.timeout_add(self.__TIMEOUT,
+                                          self.__run_collection_update)
+
+    def __add_uri(self, f):
+        """
+            Add file to pending uris if it may contain tracks
+            @param f as Gio.File
+        """
+        uri = f.get_uri()
+        if f.query_exists():
+            # If a directory, monitor it
+            if f.query_file_type(Gio.FileQueryInfoFlags.NONE,
+                                 None) == Gio.FileType.DIRECTORY:
+                self.add_monitor(uri)
+            # If not an audio file, exit
+            elif not is_audio(f):
+                return
+        elif uri in self.__monitors.keys():
+            self.__monitors.pop(uri).cancel()
+        elif uri in self.__polled.keys():
+            del self.__polled[uri]
+        self.__uris.add(uri)
+
+    def __get_uris(self):
+        """
+            Get pending uris, drop uris below another pending directory
+            @return [str]
+        """
+        uris = []
+        for uri in self.__uris:
+            parent = uri.rsplit("/", 1)[0]
+            while parent.count("/") > 2:
+                if parent in self.__uris:
+                    break
+                parent = parent.rsplit("/", 1)[0]
+            else:
+                uris.append(uri)
+        self.__uris = set()
+        return uris
+
+    def __on_polled(self, changed):
+        """
+            Update changed polled directories
+            @param changed as {uri as str: mtime as int/None}
+        """
+        for (uri, mtime) in changed.items():
+            if mtime is None:
+                self.__polled.pop(uri, None)
+            elif uri in self.__polled.keys():
+                self.__polled[uri] = mtime
+            self.__uris.add(uri)
+        self.__schedule()
+
     def __on_dir_changed(self, monitor, changed_file, other_file, event):
         """
-            Stop collection scanner if running
-            Delayed update by default
+            Remember changed file and delay update
             @param monitor as Gio.FileMonitor
             @param changed_file as Gio.File/None
             @param other_file as Gio.File/None
             @param event as Gio.FileMonitorEvent
         """
-        update = False
-        # Stop collection scanner and wait
-        if App().scanner.is_locked():
-            App().scanner.stop()
-            GLib.timeout_add(self.__TIMEOUT,
-                             self.__on_dir_changed,
-                             monitor,
-                             changed_file,
-                             other_file,
-                             event)
-        # Run update delayed
-        else:
-            uri = changed_file.get_uri()
-            d = Gio.File.new_for_uri(uri)
-            if d.query_exists():
-                # If a directory, monitor it
-                if changed_file.query_file_type(
-                        Gio.FileQueryInfoFlags.NONE,
-                        None) == Gio.FileType.DIRECTORY:
-                    self.add_monitor(uri)
-                # If not an audio file, exit
-                elif is_audio(changed_file):
-                    update = True
-            else:
-                update = True
-            if update:
-                if self.__timeout is not None:
-                    GLib.source_remove(self.__timeout)
-                    self.__timeout = None
-                self.__timeout = GLib.timeout_add(self.__TIMEOUT,
-                                                  self.__run_collection_update)
+        if event not in self.__EVENTS:
+            return
+        for f in [changed_file, other_file]:
+            if f is not None:
+                self.__add_uri(f)
+        if self.__uris:
+            self.__schedule()
 
     def __run_collection_update(self):
         """
-            Run a collection update
+            Run a collection update for pending uris
         """
+        # Let running scan finish, retry later
+        if App().scanner.is_locked():
+            return True
         self.__timeout = None
-        App().scanner.update()
+        uris = self.__get_uris()
+        Logger.debug("Inotify::__run_collection_update(): %s" % uris)
+        if uris:
+            App().scanner.update(uris)
@@ -30,8 +30,9 @@ from locale import getdefaultlocale
 import re
 
 from lollypop.helper_task import TaskHelper
-from lollypop.define import App, Type
+from lollypop.define import App, Type, TaskLane, ScrobbleResult
 from lollypop.objects import Track
+from lollypop.tracks_matcher import TracksMatcher
 from lollypop.logger import Logger
 from lollypop.goa import GoaSyncedAccount
 
@@ -47,6 +48,12 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
        want, and if your app isn"t written in a compiled language, you don"t
        really have much option :).
     """
+    # Max tracks by track.scrobble request
+    __BATCH_SIZE = 50
+    # Service errors not caused by listens: server, rate limit and auth
+    __TRANSIENT_ERRORS = ["4", "8", "9", "10", "11", "13", "16", "26", "29"]
+    # Authentication failed, invalid session key
+    __AUTH_ERRORS = ["4", "9"]
 
     def __init__(self, name):
         """
@@ -58,7 +65,6 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         self.session_key = ""
         self.__password = None
         self.__goa = None
-        self.__queue = []
         if name == "librefm":
             LibreFMNetwork.__init__(self)
         else:
@@ -76,6 +82,8 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
                                    api_key=self.__API_KEY,
                                    api_secret=self.__API_SECRET)
         self.connect()
+        Gio.NetworkMonitor.get_default().connect("network-changed",
+                                                 self.__on_network_changed)
 
     def connect(self, full_sync=False, callback=None, *args):
         """
@@ -85,8 +93,8 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         """
         if self.is_goa:
             helper = TaskHelper()
-            helper.run(self.__connect, full_sync)
-        elif Gio.NetworkMonitor.get_default().get_network_available():
+            helper.run(self.__connect, full_sync, lane=TaskLane.NETWORK)
+        else:
             from lollypop.helper_passwords import PasswordsHelper
             helper = PasswordsHelper()
             helper.get(self.__name,
@@ -102,7 +110,7 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
             @return uri as str/None
         """
         if not Gio.NetworkMonitor.get_default().get_network_available():
-            return (None, None, None)
+            return None
         last_artist = self.get_artist(artist)
         uri = last_artist.get_cover_image(3)
         return uri
@@ -121,27 +129,37 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
                 language=getdefaultlocale()[0][0:2])
         except:
             content = last_artist.get_bio_content()
+        if content is None:
+            return None
         content = re.sub(r"<.*Last.fm.*>.", "", content)
         return content.encode(encoding="UTF-8")
 
     def listen(self, track, timestamp):
         """
             Submit a listen for a track (scrobble)
+            Listen is journaled first, then journal is submitted
             @param track as Track
             @param timestamp as int
         """
-        if Gio.NetworkMonitor.get_default().get_network_available() and\
-                self.available:
-            self.__clean_queue()
-            helper = TaskHelper()
-            helper.run(self.__scrobble,
-                       ", ".join(track.artists),
-                       track.album_name,
-                       track.title,
-                       timestamp,
-                       track.mb_track_id)
-        else:
-            self.__queue.append((track, timestamp))
+        if not self.available and not self.__login and not self.is_goa:
+            return
+        App().scrobbles.add(self.__name, track, timestamp)
+        self.submit()
+
+    def submit(self):
+        """
+            Submit journaled listens
+        """
+        if not Gio.NetworkMonitor.get_default().get_network_available():
+            return
+        if self.available:
+            App().scrobbles.submit(self.__name,
+                                   self.__scrobble_many,
+                                   self.__BATCH_SIZE,
+                                   self.submit)
+        # Submitted once connected
+        elif self.__login or self.is_goa:
+            self.connect()
 
     def playing_now(self, track):
         """
@@ -156,7 +174,8 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
                        track.album_name,
                        track.title,
                        int(track.duration),
-                       track.mb_track_id)
+                       track.mb_track_id,
+                       lane=TaskLane.NETWORK)
 
     def love(self, artist, title):
         """
@@ -258,21 +277,6 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
 #######################
 # PRIVATE             #
 #######################
-    def __clean_queue(self):
-        """
-            Send tracks in queue
-        """
-        if self.__queue:
-            (track, timestamp) = self.__queue.pop(0)
-            helper = TaskHelper()
-            helper.run(self.__scrobble,
-                       ", ".join(track.artists),
-                       track.album_name,
-                       track.title,
-                       timestamp,
-                       track.mb_track_id)
-            GLib.timeout_add(1000, self.__clean_queue)
-
     def __connect(self, full_sync=False):
         """
             Connect service
@@ -293,44 +297,43 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
                     password_hash=md5(self.__password))
             if full_sync:
                 helper = TaskHelper()
-                helper.run(self.__populate_loved_tracks)
+                helper.run(self.__populate_loved_tracks, lane=TaskLane.NETWORK)
+            if self.available:
+                GLib.idle_add(self.submit)
         except Exception as e:
             Logger.debug("LastFM::__connect(): %s" % e)
 
-    def __scrobble(self, artist, album, title, timestamp, mb_track_id,
-                   first=True):
+    def __scrobble_many(self, listens):
         """
-            Scrobble track
-            @param artist as str
-            @param title as str
-            @param album_title as str
-            @param timestamp as int
-            @param duration as int
-            @param mb_track_id as str
-            @param first is internal
+            Scrobble listens
+            @param listens as [{}]
+            @return ScrobbleResult
             @thread safe
         """
-        Logger.debug("LastFM::__scrobble(): %s, %s, %s, %s, %s" % (
-                                                            artist,
-                                                            album,
-                                                            title,
-                                                            timestamp,
-                                                            mb_track_id))
+        Logger.debug("LastFM::__scrobble_many(): %s listens" % len(listens))
+        tracks = []
+        for listen in listens:
+            tracks.append({"artist": listen["artist"],
+                           "album": listen["album"],
+                           "title": listen["title"],
+                           "timestamp": listen["timestamp"],
+                           "duration": listen["duration"],
+                           "track_number": listen["tracknumber"],
+                           "mbid": listen["mb_track_id"]})
         try:
-            self.scrobble(artist=artist,
-                          album=album,
-                          title=title,
-                          timestamp=timestamp,
-                          mbid=mb_track_id)
-        except WSError:
-            pass
+            self.scrobble_many(tracks)
+            return ScrobbleResult.ACCEPTED
+        except WSError as e:
+            Logger.error("LastFM::__scrobble_many(): %s" % e)
+            # Get a new session, journal is submitted once connected
+            if e.get_id() in self.__AUTH_ERRORS:
+                self.session_key = ""
+                GLib.idle_add(self.connect)
+            elif e.get_id() not in self.__TRANSIENT_ERRORS:
+                return ScrobbleResult.REJECTED
         except Exception as e:
-            Logger.error("LastFM::__scrobble(): %s" % e)
-            # Scrobble sometimes fails
-            if first:
-                self.__connect()
-                self.__scrobble(artist, album, title, timestamp,
-                                mb_track_id, False)
+            Logger.error("LastFM::__scrobble_many(): %s" % e)
+        return ScrobbleResult.FAILED
 
     def __now_playing(self, artist, album, title, duration, mb_track_id,
                       first=True):
@@ -368,14 +371,13 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         if not self.available:
             return
         try:
-            tracks = []
             user = self.get_user(self.__login)
-            for loved in user.get_loved_tracks():
-                track_id = App().tracks.search_track(
-                    str(loved.track.artist),
-                    str(loved.track.title))
-                if track_id is not None:
-                    tracks.append(Track(track_id))
+            items = [(str(loved.track.artist), str(loved.track.title))
+                     for loved in user.get_loved_tracks(limit=None)]
+            track_ids = TracksMatcher().match_all(items)
+            Logger.debug("LastFM::__populate_loved_tracks(): %s/%s" %
+                         (len(track_ids), len(items)))
+            tracks = [Track(track_id) for track_id in track_ids]
             App().playlists.add_tracks(Type.LOVED, tracks)
         except Exception as e:
             Logger.error("LastFM::__populate_loved_tracks: %s" % e)
@@ -396,4 +398,14 @@ class LastFM(LastFMNetwork, LibreFMNetwork):
         self.__password = password
         if Gio.NetworkMonitor.get_default().get_network_available():
             helper = TaskHelper()
-            helper.run(self.__connect, full_sync, callback=(callback, *args))
+            helper.run(self.__connect, full_sync, callback=(callback, *args),
+                       lane=TaskLane.NETWORK)
+
+    def __on_network_changed(self, monitor, available):
+        """
+            Submit journal when network is back
+            @param monitor as Gio.NetworkMonitor
+            @param available as bool
+        """
+        if available and App().scrobbles.get_count(self.__name):
+            self.submit()
@@ -11,12 +11,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Soup, GObject, Gio, GLib
+from gi.repository import Soup, GObject, Gio
 
 import json
 import time
 
 from lollypop.helper_task import TaskHelper
+from lollypop.define import App, TaskLane, ScrobbleResult
 from lollypop.logger import Logger
 
 HOST_NAME = "api.listenbrainz.org"
@@ -31,24 +32,41 @@ class ListenBrainz(GObject.GObject):
     """
 
     user_token = GObject.Property(type=str, default=None)
+    # Max listens by import request
+    __BATCH_SIZE = 50
 
     def __init__(self):
         """
             Init ListenBrainz object
         """
         GObject.GObject.__init__(self)
-        self.__queue = []
         self.__next_request_time = 0
+        self.connect("notify::user-token", self.__on_user_token_changed)
+        Gio.NetworkMonitor.get_default().connect("network-changed",
+                                                 self.__on_network_changed)
 
     def listen(self, track, time):
         """
             Submit a listen for a track
+            Listen is journaled first, then journal is submitted
             @param track as Track
             @param time as int
         """
-        payload = self.__get_payload(track)
-        payload[0]["listened_at"] = time
-        self.__submit("single", payload)
+        if not self.available:
+            return
+        App().scrobbles.add("listenbrainz", track, time)
+        self.submit()
+
+    def submit(self):
+        """
+            Submit journaled listens
+        """
+        if Gio.NetworkMonitor.get_default().get_network_available() and\
+                self.available:
+            App().scrobbles.submit("listenbrainz",
+                                   self.__import,
+                                   self.__BATCH_SIZE,
+                                   self.submit)
 
     def playing_now(self, track):
         """
@@ -77,16 +95,6 @@ class ListenBrainz(GObject.GObject):
 #######################
 # PRIVATE             #
 #######################
-    def __clean_queue(self):
-        """
-            Send tracks in queue
-        """
-        if self.__queue:
-            (listen_type, payload) = self.__queue.pop(0)
-            helper = TaskHelper()
-            helper.run(self.__request, listen_type, payload)
-            GLib.timeout_add(1000, self.__clean_queue)
-
     def __submit(self, listen_type, payload):
         """
             Submit payload to service in a thread
@@ -95,10 +103,35 @@ class ListenBrainz(GObject.GObject):
         """
         if Gio.NetworkMonitor.get_default().get_network_available():
             helper = TaskHelper()
-            self.__clean_queue()
-            helper.run(self.__request, listen_type, payload)
-        else:
-            self.__queue.append((listen_type, payload))
+            helper.run(self.__request, listen_type, payload,
+                       lane=TaskLane.NETWORK)
+
+    def __import(self, listens):
+        """
+            Submit journaled listens
+            @param listens as [{}]
+            @return ScrobbleResult
+            @thread safe
+        """
+        payload = []
+        for listen in listens:
+            additional_info = {"tracknumber": listen["tracknumber"]}
+            if listen["mb_album_id"]:
+                additional_info["release_mbid"] = listen["mb_album_id"]
+            if listen["mb_track_id"]:
+                additional_info["recording_mbid"] = listen["mb_track_id"]
+            payload.append({
+                "listened_at": listen["timestamp"],
+                "track_metadata": {
+                    "artist_name": listen["artist"],
+                    "track_name": listen["title"],
+                    "release_name": listen["album"],
+                    "additional_info": additional_info
+                }
+            })
+        # Service only accepts many listens as an import
+        listen_type = "single" if len(payload) == 1 else "import"
+        return self.__request(listen_type, payload)
 
     def __request(self, listen_type, payload, retry=0):
         """
@@ -106,6 +139,7 @@ class ListenBrainz(GObject.GObject):
             @param listen_type as str
             @param payload as []
             @param retry as int (internal)
+            @return ScrobbleResult
         """
         self.__wait_for_ratelimit()
         Logger.debug("ListenBrainz %s: %r" % (listen_type, payload))
@@ -114,7 +148,7 @@ class ListenBrainz(GObject.GObject):
             "payload": payload
         }
         body = json.dumps(data).encode("utf-8")
-        session = Soup.Session.new()
+        session = App().download_helper.session
         uri = "https://%s%s" % (HOST_NAME, PATH_SUBMIT)
         msg = Soup.Message.new("POST", uri)
         msg.set_request("application/json",
@@ -128,9 +162,16 @@ class ListenBrainz(GObject.GObject):
             self.__handle_ratelimit(response_headers)
             # Too Many Requests
             if status == 429 and retry < 5:
-                self.__request(listen_type, payload, retry + 1)
+                return self.__request(listen_type, payload, retry + 1)
+            if status == 200:
+                return ScrobbleResult.ACCEPTED
+            Logger.error("ListenBrainz::__request(): status %s" % status)
+            # Other client errors are caused by payload, except a bad token
+            if status >= 400 and status < 500 and status not in [401, 429]:
+                return ScrobbleResult.REJECTED
         except Exception as e:
-            print("ListenBrainz::__submit():", e)
+            Logger.error("ListenBrainz::__request(): %s" % e)
+        return ScrobbleResult.FAILED
 
     def __wait_for_ratelimit(self):
         """
@@ -156,6 +197,21 @@ class ListenBrainz(GObject.GObject):
         if (int(remaining) == 0):
             self.__next_request_time = time.time() + int(reset_in)
 
+    def __on_user_token_changed(self, *ignore):
+        """
+            Submit journal with new token
+        """
+        self.submit()
+
+    def __on_network_changed(self, monitor, available):
+        """
+            Submit journal when network is back
+            @param monitor as Gio.NetworkMonitor
+            @param available as bool
+        """
+        if available and App().scrobbles.get_count("listenbrainz"):
+            self.submit()
+
     def __get_payload(self, track):
         """
             Build payload from track
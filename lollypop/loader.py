@@ -12,20 +12,20 @@
 
 from gi.repository import GLib
 
-from threading import Thread, Lock
+from threading import Lock
 
+from lollypop.define import App, TaskLane
 
-class Loader(Thread):
+
+class Loader:
     """
-        Helper to load data on a separate thread and
+        Helper to load data in UI task lane and
         dispatch it to the UI thread
     """
     active = {}
     active_lock = Lock()
 
     def __init__(self, target, view=None, on_finished=None):
-        Thread.__init__(self)
-        self.daemon = True
         self._target = target
         self._view = view
         self._on_finished = on_finished
@@ -40,12 +40,18 @@ class Loader(Thread):
         with self._invalidated_lock:
             self._invalidated = True
 
-    def run(self):
+    def start(self):
+        # Previous loader for view is skipped if not already running
         with Loader.active_lock:
             active = Loader.active.get(self._view, None)
             if active:
                 active.invalidate()
             Loader.active[self._view] = self
+        App().task_pool.run(TaskLane.UI, self.run)
+
+    def run(self):
+        if self.is_invalidated():
+            return
         result = self._target()
         if not self.is_invalidated():
             if self._on_finished:
@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from locale import getlocale, strcoll
+from locale import getlocale, strcoll, strxfrm
 from importlib import import_module
 
 # Ugly magic to dynamically adapt to the current locale...
@@ -34,6 +34,15 @@ except:
             return ""
 
 
+def sort_key(string):
+    """
+        Get a key sorting strings like LocalizedCollation
+        @param string as str
+        @return (str, str)
+    """
+    return (strxfrm(index_of(string).upper()), strxfrm(string))
+
+
 class LocalizedCollation(object):
     """
         COLLATE LOCALIZED missing from default sqlite installation
@@ -16,7 +16,7 @@ from gi.repository import GLib
 from lollypop.helper_task import TaskHelper
 from lollypop.radios import Radios
 from lollypop.logger import Logger
-from lollypop.define import App, Type
+from lollypop.define import App, Type, TaskLane
 
 
 class Base:
@@ -48,7 +48,14 @@ class Base:
             attr_name = "_" + attr
             attr_value = getattr(self, attr_name)
             if attr_value is None:
-                attr_value = getattr(self.db, "get_" + attr)(self.id)
+                # Whole row is loaded once and shared between objects
+                row = self.db.cache.get(self.id)
+                if row is not None and attr in row.keys():
+                    attr_value = row[attr]
+                    if isinstance(attr_value, list):
+                        attr_value = list(attr_value)
+                else:
+                    attr_value = getattr(self.db, "get_" + attr)(self.id)
                 setattr(self, attr_name, attr_value)
             # Return default value if None
             if attr_value is None:
@@ -187,19 +194,18 @@ class Disc:
             @return [Track]
         """
         if not self.__tracks and self.album.id is not None:
+            track_ids = self.db.get_disc_track_ids(self.album.id,
+                                                   self.album.genre_ids,
+                                                   self.album.artist_ids,
+                                                   self.number)
+            if not track_ids:
+                track_ids = self.db.get_disc_track_ids(self.album.id,
+                                                       self.album.genre_ids,
+                                                       [],
+                                                       self.number)
+            App().tracks.cache.prefetch(track_ids)
             self.__tracks = [Track(track_id, self.album)
-                             for track_id in self.db.get_disc_track_ids(
-                self.album.id,
-                self.album.genre_ids,
-                self.album.artist_ids,
-                self.number)]
-            if not self.__tracks:
-                self.__tracks = [Track(track_id, self.album)
-                                 for track_id in self.db.get_disc_track_ids(
-                    self.album.id,
-                    self.album.genre_ids,
-                    [],
-                    self.number)]
+                             for track_id in track_ids]
         return self.__tracks
 
 
@@ -229,6 +235,8 @@ class Album(Base):
         self.genre_ids = genre_ids
         self._tracks = []
         self._discs = []
+        # Track id to position, checked on use as tracks list may change
+        self.__positions = {}
         # Use artist ids from db else
         if artist_ids:
             self.artist_ids = artist_ids
@@ -282,6 +290,22 @@ class Album(Base):
         """
         self._tracks = []
 
+    def get_track_position(self, track_id):
+        """
+            Get track position in album
+            @param track_id as int
+            @return int, tracks count if track not in album
+        """
+        tracks = self.tracks
+        position = self.__positions.get(track_id, None)
+        if position is None or position >= len(tracks) or\
+                tracks[position].id != track_id:
+            self.__positions = {}
+            for (position, track) in enumerate(tracks):
+                self.__positions.setdefault(track.id, position)
+            position = self.__positions.get(track_id, len(tracks))
+        return position
+
     def disc_names(self, disc):
         """
             Disc names
@@ -448,7 +472,8 @@ class Track(Base):
         for scrobbler in App().scrobblers:
             if scrobbler.can_love:
                 helper = TaskHelper()
-                helper.run(scrobbler.set_loved, self, scrobbler_love)
+                helper.run(scrobbler.set_loved, self, scrobbler_love,
+                           lane=TaskLane.NETWORK)
 
     @property
     def loved(self):
@@ -473,12 +498,7 @@ class Track(Base):
             Get track position for album
             @return int
         """
-        i = 0
-        for track_id in self.__album.track_ids:
-            if track_id == self.id:
-                break
-            i += 1
-        return i
+        return self.__album.get_track_position(self.id)
 
     @property
     def first(self):
@@ -513,7 +533,11 @@ class Track(Base):
             @return str
         """
         if self._uri is None:
-            self._uri = App().tracks.get_uri(self.id)
+            row = App().tracks.cache.get(self.id)
+            if row is not None:
+                self._uri = row["uri"]
+            else:
+                self._uri = App().tracks.get_uri(self.id)
         return self._uri
 
     @property
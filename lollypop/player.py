@@ -12,7 +12,6 @@
 
 from gi.repository import Gst
 
-from pickle import load
 from random import choice
 
 from lollypop.player_bin import BinPlayer
@@ -23,8 +22,9 @@ from lollypop.player_radio import RadioPlayer
 from lollypop.player_playlist import PlaylistPlayer
 from lollypop.radios import Radios
 from lollypop.logger import Logger
-from lollypop.objects import Track, Album
-from lollypop.define import App, Type, NextContext, LOLLYPOP_DATA_PATH, Shuffle
+from lollypop.player_albums import PlayerAlbums
+from lollypop.objects import Track
+from lollypop.define import App, Type, NextContext, Shuffle
 
 
 class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
@@ -154,7 +154,8 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         else:
             track = album.tracks[0]
         self.load(track)
-        self._albums = [album]
+        self._albums = PlayerAlbums()
+        self._albums.append(album)
 
     def play_albums(self, track, genre_ids, artist_ids):
         """
@@ -163,7 +164,6 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param genre_ids as [int]
             @param artist_ids as [int]
         """
-        self._albums = []
         album_ids = []
         self.reset_history()
 
@@ -211,14 +211,14 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
                             "show-compilations-in-album-view"):
                     album_ids += App().albums.get_compilation_ids(genre_ids)
                 album_ids += App().albums.get_ids(artist_ids, genre_ids)
-        # Create album objects
-        for album_id in album_ids:
-            album = Album(album_id, genre_ids, artist_ids)
-            self._albums.append(album)
-            # Get track from album
-            # to make Player.current_track present in Player.albums
-            if album.id == track.album.id:
-                index = album.track_ids.index(track.id)
+        # Album objects are only created when needed
+        self._albums = PlayerAlbums(album_ids, genre_ids, artist_ids)
+        # Get track from album
+        # to make Player.current_track present in Player.albums
+        album = self._albums.get_album(track.album.id)
+        if album is not None:
+            index = album.get_track_position(track.id)
+            if index < len(album.tracks):
                 track = album.tracks[index]
         self.load(track)
 
@@ -226,7 +226,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
             Clear all albums
         """
-        self._albums = []
+        self._albums = PlayerAlbums()
 
     def get_current_artists(self):
         """
@@ -246,14 +246,11 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
         try:
             if App().settings.get_value("save-state"):
-                track_id = load(open(LOLLYPOP_DATA_PATH +
-                                     "/track_id.bin", "rb"))
-                self.set_queue(load(open(LOLLYPOP_DATA_PATH +
-                                         "/queue.bin", "rb")))
-                playlist_ids = load(open(LOLLYPOP_DATA_PATH +
-                                         "/playlist_ids.bin", "rb"))
-                (is_playing, was_party) = load(open(LOLLYPOP_DATA_PATH +
-                                                    "/player.bin", "rb"))
+                state = App().state
+                track_id = state.get("track_id")
+                self.set_queue(list(state.get("queue")))
+                playlist_ids = list(state.get("playlist_ids"))
+                is_playing = state.get("is_playing")
                 if playlist_ids and playlist_ids[0] == Type.RADIOS:
                     radios = Radios()
                     track = Track()
@@ -261,39 +258,20 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
                     url = radios.get_url(name)
                     track.set_radio(name, url)
                     self.load(track, is_playing)
-                elif App().tracks.get_uri(track_id) != "":
+                elif track_id >= 0 and App().tracks.get_uri(track_id) != "":
                     track = Track(track_id)
                     self._load_track(track)
                     # We set this initial state
                     # because seek while failed otherwise
                     self.pause()
                     if playlist_ids:
-                        track_ids = []
-                        for playlist_id in playlist_ids:
-                            if playlist_id == Type.POPULARS:
-                                track_ids = App().tracks.get_populars()
-                            elif playlist_id == Type.RECENTS:
-                                track_ids = App().tracks.\
-                                    get_recently_listened_to()
-                            elif playlist_id == Type.NEVER:
-                                track_ids = App().tracks.\
-                                    get_never_listened_to()
-                            elif playlist_id == Type.RANDOMS:
-                                track_ids = App().tracks.get_randoms()
-                            else:
-                                track_ids = App().playlists.get_track_ids(
-                                    playlist_id)
-                            self.populate_playlist_by_track_ids(
-                                list(set(track_ids)),
-                                playlist_ids)
-                    else:
-                        if was_party:
-                            self.emit("party-changed", True)
-                        else:
-                            self._albums = load(open(
-                                                LOLLYPOP_DATA_PATH +
-                                                "/Albums.bin",
-                                                "rb"))
+                        self.populate_playlist_by_track_ids(
+                            state.get("playlist_track_ids"),
+                            playlist_ids)
+                    elif state.get("is_party"):
+                        self.emit("party-changed", True)
+                    elif state.get("albums") is not None:
+                        self.__restore_albums(track, state.get("albums"))
                     self.set_next()
                     self.set_prev()
                     if is_playing:
@@ -406,11 +384,9 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param track as Track
             @return bool
         """
-        for album in self._albums:
-            if album.id == track.album.id:
-                for track_id in album.track_ids:
-                    if track.id == track_id:
-                        return True
+        for index in self._albums.get_indexes(track.album.id):
+            if track.id in self._albums.get_track_ids(index):
+                return True
         return False
 
     def object_by_name(self, track_name, album_name):
@@ -420,7 +396,8 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
             @param album_name as str
             @return Album is track_name is None, else Track or None
         """
-        for album in self._albums:
+        # Objects names are only known for created albums
+        for album in self._albums.get_loaded():
             if str(album) == album_name:
                 if track_name is None:
                     return album
@@ -447,7 +424,7 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
     def albums(self):
         """
             Return albums
-            @return albums as [Album]
+            @return albums as PlayerAlbums
         """
         return self._albums
 
@@ -481,3 +458,16 @@ class Player(BinPlayer, QueuePlayer, PlaylistPlayer, RadioPlayer,
         """
         self.set_next()
         self.set_prev()
+
+    def __restore_albums(self, track, albums_state):
+        """
+            Restore albums saved by Application::__save_state()
+            @param track as Track
+            @param albums_state as {}
+        """
+        self._albums = PlayerAlbums()
+        self._albums.set_state(albums_state)
+        # Make Player.current_track present in Player.albums
+        album = self._albums.get_album(track.album.id)
+        if album is not None and track.id in album.track_ids:
+            track.set_album(album)
@@ -0,0 +1,306 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+
+from lollypop.define import App
+from lollypop.objects import Album, Track
+
+
+class PlayerAlbums:
+    """
+        Albums in current playback, behaves like a list of Album
+        Only album ids are stored for a whole genre/artist context:
+        Album objects are created on first access and then kept, so
+        changes made to them (removed tracks, ...) are not lost
+        Saved state is album ids, filters and track ids of albums
+        created by an access
+    """
+
+    def __init__(self, album_ids=[], genre_ids=[], artist_ids=[]):
+        """
+            Init albums
+            @param album_ids as [int]
+            @param genre_ids as [int]
+            @param artist_ids as [int]
+        """
+        self.__ids = array("q", album_ids)
+        # Distinct (genre ids, artist ids) used by albums
+        self.__filters = [(list(genre_ids), list(artist_ids))]
+        self.__filter_ids = array("I", [0]) * len(self.__ids)
+        # Album objects, track ids when restored, None if not created
+        self.__albums = [None] * len(self.__ids)
+        # Indexes of created albums and of album ids, built on first
+        # lookup, updated when appending/popping last album, reset else
+        self.__object_indexes = None
+        self.__id_indexes = None
+        # Changed each time albums are added, removed or restored
+        self.__version = 0
+
+    def append(self, album):
+        """
+            Append album
+            @param album as Album
+        """
+        self.insert(len(self.__ids), album)
+
+    def insert(self, index, album):
+        """
+            Insert album at index
+            @param index as int
+            @param album as Album
+        """
+        index = max(0, min(self.__get_index(index), len(self.__ids)))
+        artist_ids = album.__dict__.get("artist_ids", [])
+        self.__ids.insert(index, album.id)
+        self.__filter_ids.insert(index,
+                                 self.__get_filter_id(album.genre_ids,
+                                                      artist_ids))
+        self.__albums.insert(index, album)
+        self.__version += 1
+        if index == len(self.__ids) - 1:
+            if self.__object_indexes is not None:
+                self.__object_indexes[id(album)] = index
+            if self.__id_indexes is not None:
+                self.__id_indexes.setdefault(album.id, []).append(index)
+        else:
+            self.__reset_indexes()
+
+    def pop(self, index=-1):
+        """
+            Remove album at index
+            @param index as int
+            @return Album
+        """
+        album = self[index]
+        index = self.__get_index(index)
+        del self.__ids[index]
+        del self.__filter_ids[index]
+        del self.__albums[index]
+        self.__version += 1
+        if index == len(self.__ids):
+            if self.__object_indexes is not None:
+                del self.__object_indexes[id(album)]
+            if self.__id_indexes is not None:
+                indexes = self.__id_indexes[album.id]
+                indexes.pop()
+                if not indexes:
+                    del self.__id_indexes[album.id]
+        else:
+            self.__reset_indexes()
+        return album
+
+    def remove(self, album):
+        """
+            Remove album
+            @param album as Album
+            @raise ValueError if not found
+        """
+        self.pop(self.index(album))
+
+    def index(self, album):
+        """
+            Get album index
+            @param album as Album
+            @return int
+            @raise ValueError if not found
+        """
+        index = self.__get_object_indexes().get(id(album), None)
+        if index is None or self.__albums[index] is not album:
+            raise ValueError("Album not in playback")
+        return index
+
+    def get_album(self, album_id):
+        """
+            Get first album for id
+            @param album_id as int
+            @return Album/None
+        """
+        indexes = self.__get_id_indexes().get(album_id, None)
+        if indexes is None:
+            return None
+        return self[indexes[0]]
+
+    def get_indexes(self, album_id):
+        """
+            Get indexes of albums for id
+            @param album_id as int
+            @return [int]
+        """
+        return list(self.__get_id_indexes().get(album_id, []))
+
+    def get_track_ids(self, index):
+        """
+            Get track ids for album at index, album is not created
+            @param index as int
+            @return [int]
+        """
+        album = self.__albums[index]
+        if isinstance(album, Album):
+            return album.track_ids
+        elif album is not None:
+            return list(album)
+        (genre_ids, artist_ids) = self.__filters[self.__filter_ids[index]]
+        return App().albums.get_track_ids(self.__ids[index],
+                                          genre_ids, artist_ids)
+
+    def get_loaded(self):
+        """
+            Get albums already created
+            @return [Album]
+        """
+        return [album for album in self.__albums if isinstance(album, Album)]
+
+    @property
+    def version(self):
+        """
+            Get version, changed when albums are added or removed
+            @return int
+        """
+        return self.__version
+
+    @property
+    def ids(self):
+        """
+            Get album ids
+            @return [int]
+        """
+        return list(self.__ids)
+
+    def __len__(self):
+        return len(self.__ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        index = self.__get_index(index)
+        if index < 0 or index >= len(self.__ids):
+            raise IndexError("Album index out of range")
+        album = self.__albums[index]
+        if not isinstance(album, Album):
+            (genre_ids, artist_ids) = \
+                self.__filters[self.__filter_ids[index]]
+            track_ids = album
+            album = Album(self.__ids[index], genre_ids, artist_ids)
+            if track_ids is not None:
+                album.set_tracks([Track(track_id, album)
+                                  for track_id in track_ids])
+            self.__albums[index] = album
+            if self.__object_indexes is not None:
+                self.__object_indexes[id(album)] = index
+        return album
+
+    def __iter__(self):
+        index = 0
+        while index < len(self.__ids):
+            yield self[index]
+            index += 1
+
+    def __contains__(self, album):
+        try:
+            self.index(album)
+            return True
+        except ValueError:
+            return False
+
+    def get_state(self):
+        """
+            Get state as builtin types, valid between versions
+            Track ids are only saved for created albums
+            @return {}
+        """
+        tracks = {}
+        for (index, album) in enumerate(self.__albums):
+            if isinstance(album, Album):
+                tracks[index] = array("q", album.track_ids).tobytes()
+            elif album is not None:
+                tracks[index] = album.tobytes()
+        return {"ids": self.__ids.tobytes(),
+                "filters": self.__filters,
+                "filter_ids": self.__filter_ids.tobytes(),
+                "tracks": tracks}
+
+    def set_state(self, state):
+        """
+            Set state from get_state()
+            @param state as {}
+        """
+        self.__ids = array("q")
+        self.__ids.frombytes(state["ids"])
+        self.__filters = [(list(genre_ids), list(artist_ids))
+                          for (genre_ids, artist_ids) in state["filters"]]
+        self.__filter_ids = array("I")
+        self.__filter_ids.frombytes(state["filter_ids"])
+        if len(self.__filter_ids) != len(self.__ids):
+            raise ValueError("Invalid albums state")
+        self.__albums = [None] * len(self.__ids)
+        for (index, track_ids) in state["tracks"].items():
+            self.__albums[index] = array("q")
+            self.__albums[index].frombytes(track_ids)
+        self.__reset_indexes()
+        self.__version += 1
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_index(self, index):
+        """
+            Get positive index
+            @param index as int
+            @return int
+        """
+        if index < 0:
+            index += len(self.__ids)
+        return index
+
+    def __get_filter_id(self, genre_ids, artist_ids):
+        """
+            Get index of filter, add it if needed
+            @param genre_ids as [int]
+            @param artist_ids as [int]
+            @return int
+        """
+        item = (list(genre_ids), list(artist_ids))
+        if item in self.__filters:
+            return self.__filters.index(item)
+        self.__filters.append(item)
+        return len(self.__filters) - 1
+
+    def __get_object_indexes(self):
+        """
+            Get indexes of created albums
+            @return {int: int}
+        """
+        if self.__object_indexes is None:
+            self.__object_indexes = {}
+            for (index, album) in enumerate(self.__albums):
+                if isinstance(album, Album):
+                    self.__object_indexes[id(album)] = index
+        return self.__object_indexes
+
+    def __get_id_indexes(self):
+        """
+            Get indexes of album ids
+            @return {int: [int]}
+        """
+        if self.__id_indexes is None:
+            self.__id_indexes = {}
+            for (index, album_id) in enumerate(self.__ids):
+                self.__id_indexes.setdefault(album_id, []).append(index)
+        return self.__id_indexes
+
+    def __reset_indexes(self):
+        """
+            Reset indexes, they will be built again on next lookup
+        """
+        self.__object_indexes = None
+        self.__id_indexes = None
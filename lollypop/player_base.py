@@ -14,6 +14,7 @@ from gi.repository import GObject
 
 from lollypop.define import App, NextContext
 from lollypop.objects import Track
+from lollypop.player_albums import PlayerAlbums
 
 
 class BasePlayer(GObject.GObject):
@@ -63,7 +64,7 @@ class BasePlayer(GObject.GObject):
             self._next_track = Track()
             self._prev_track = Track()
             # Albums in current playlist
-            self._albums = []
+            self._albums = PlayerAlbums()
             # Current shuffle mode
             self._shuffle = App().settings.get_enum("shuffle")
             # For tracks from the cmd line
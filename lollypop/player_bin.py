@@ -10,14 +10,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gst, GstAudio, GstPbutils, GLib
+from gi.repository import Gst, GstAudio, GstPbutils, GLib, Gio
 
 from time import time
 
 from lollypop.player_base import BasePlayer
 from lollypop.tagreader import TagReader
 from lollypop.player_plugins import PluginsPlayer
-from lollypop.define import GstPlayFlags, NextContext, App
+from lollypop.helper_task import TaskHelper
+from lollypop.define import GstPlayFlags, NextContext, App, TaskLane
 from lollypop.codecs import Codecs
 from lollypop.define import Type
 from lollypop.logger import Logger
@@ -27,7 +28,15 @@ from lollypop.objects import Track
 class BinPlayer(BasePlayer):
     """
         Gstreamer bin player
+        Next track is prefetched a few seconds before current track end:
+        lazy attributes are resolved, file is read so it is in cache when
+        playbin opens it and, with crossfading, idle playbin is prerolled
     """
+    # Prefetch next track this count of seconds before end
+    __PREFETCH_DELAY = 10
+    # Read at most this count of bytes when prefetching
+    __PREFETCH_SIZE = 64 << 20
+    __PREFETCH_CHUNK = 1 << 20
 
     def __init__(self):
         """
@@ -56,9 +65,19 @@ class BinPlayer(BasePlayer):
             bus.connect("message::error", self._on_bus_error)
             bus.connect("message::eos", self._on_bus_eos)
             bus.connect("message::element", self._on_bus_element)
-            bus.connect("message::stream-start", self._on_stream_start)
+            bus.connect("message::stream-start",
+                        self.__on_bus_stream_start)
             bus.connect("message::tag", self._on_bus_message_tag)
         self._start_time = 0
+        self.__prefetch_timeout_id = None
+        self.__prefetch_cancellable = Gio.Cancellable()
+        self.__prefetched_id = None
+        # (playbin, track id) prerolled in idle playbin
+        self.__preroll = None
+        # Stream start message received while prerolling
+        self.__preroll_message = None
+        # (time, prefetched, prerolled) for last loaded track
+        self.__switch = None
 
     @property
     def preview(self):
@@ -139,6 +158,7 @@ class BinPlayer(BasePlayer):
         """
         self._playbin.set_state(Gst.State.NULL)
         self._current_track = Track()
+        self.__cancel_prefetch()
         self.emit("status-changed")
         self.emit("current-changed")
 
@@ -274,9 +294,9 @@ class BinPlayer(BasePlayer):
         # We can listen if the track has been played
         # for at least half its duration, or for 4 minutes
         if played >= finished.duration / 2 or played >= 240:
+            # Scrobblers journal listens even if not connected
             for scrobbler in App().scrobblers:
-                if scrobbler.available:
-                    scrobbler.listen(finished, int(finished_start_time))
+                scrobbler.listen(finished, int(finished_start_time))
 
     def _on_stream_start(self, bus, message):
         """
@@ -288,6 +308,18 @@ class BinPlayer(BasePlayer):
         self._start_time = time()
         Logger.debug("Player::_on_stream_start(): %s" %
                      self._current_track.uri)
+        if self.__switch is not None:
+            (switch_time, prefetched, prerolled) = self.__switch
+            self.__switch = None
+            Logger.debug("BinPlayer::_on_stream_start(): switch latency "
+                         "%.1f ms, prefetched: %s, prerolled: %s" %
+                         ((time() - switch_time) * 1000,
+                          prefetched, prerolled))
+        self.__cancel_prefetch()
+        if self._current_track.id is not None and\
+                self._current_track.id >= 0:
+            self.__prefetch_timeout_id = GLib.timeout_add_seconds(
+                1, self.__on_prefetch_timeout, self._current_track)
         self.emit("current-changed")
         for scrobbler in App().scrobblers:
             if scrobbler.available:
@@ -346,6 +378,12 @@ class BinPlayer(BasePlayer):
             @param message as Gst.Message
         """
         Logger.info("Player::_on_bus_error(): %s" % message.parse_error()[1])
+        # Error in idle playbin while prerolling, just forget preroll
+        if self.__preroll is not None and\
+                self.__preroll[0] != self._playbin and\
+                self.__preroll[0].get_bus() == bus:
+            self.__drop_preroll()
+            return
         App().window.container.pulse(False)
         if self.__codecs.is_missing_codec(message):
             self.__codecs.install()
@@ -378,10 +416,20 @@ class BinPlayer(BasePlayer):
             return
         if self._current_track.id == Type.RADIOS:
             return
-        self._scrobble(self._current_track, self._start_time)
+        finished = self._current_track
+        finished_start_time = self._start_time
+        # Set next uri first, we are blocking playbin
+        if self._next_track.id is not None:
+            started = time()
+            prefetched = self._next_track.id == self.__prefetched_id
+            self._load_track(self._next_track)
+            Logger.debug("BinPlayer::_on_stream_about_to_finish(): "
+                         "next uri set in %.1f ms, prefetched: %s" %
+                         ((time() - started) * 1000, prefetched))
+        self._scrobble(finished, finished_start_time)
         # Increment popularity
-        if not App().scanner.is_locked() and self._current_track.id >= 0:
-            App().tracks.set_more_popular(self._current_track.id)
+        if not App().scanner.is_locked() and finished.id >= 0:
+            App().tracks.set_more_popular(finished.id)
             # In party mode, linear popularity
             if self.is_party:
                 pop_to_add = 1
@@ -390,16 +438,12 @@ class BinPlayer(BasePlayer):
                 # Some users report an issue where get_tracks_count() return 0
                 # See issue #886
                 # Don"t understand how this can happen!
-                count = App().albums.get_tracks_count(
-                    self._current_track.album_id)
+                count = App().albums.get_tracks_count(finished.album_id)
                 if count:
                     pop_to_add = int(App().albums.max_count / count)
                 else:
                     pop_to_add = 1
-            App().albums.set_more_popular(self._current_track.album_id,
-                                          pop_to_add)
-        if self._next_track.id is not None:
-            self._load_track(self._next_track)
+            App().albums.set_more_popular(finished.album_id, pop_to_add)
 
 #######################
 # PRIVATE             #
@@ -412,6 +456,29 @@ class BinPlayer(BasePlayer):
             @param init volume as bool
         """
         was_playing = self.is_playing
+        prerolled = self.__preroll == (self._playbin, track.id)
+        self.__switch = (time(), track.id == self.__prefetched_id,
+                         prerolled)
+        message = self.__preroll_message
+        # Preroll of this playbin is used now or lost on reset
+        if self.__preroll is not None and self.__preroll[0] == self._playbin:
+            self.__preroll = None
+            self.__preroll_message = None
+        if prerolled:
+            # Playbin is paused on track, just start it
+            if self.__need_to_stop():
+                return
+            if init_volume:
+                self._plugins.volume.props.volume = 1.0
+            self._current_track = track
+            if was_playing:
+                self._playbin.set_state(Gst.State.PLAYING)
+            else:
+                self.play()
+            # Stream started while prerolling
+            if message is not None:
+                self._on_stream_start(self._playbin.get_bus(), message)
+            return
         self._playbin.set_state(Gst.State.NULL)
         if self._load_track(track, init_volume):
             if was_playing:
@@ -540,6 +607,137 @@ class BinPlayer(BasePlayer):
                 stop = True
         return stop and self.is_playing
 
+    def __prefetch(self, track):
+        """
+            Prefetch track: load its rows and read its file in background
+            @param track as Track
+        """
+        self.__prefetched_id = track.id
+        # Resolve lazy attributes now, not while switching
+        App().tracks.cache.prefetch([track.id])
+        App().albums.cache.prefetch([track.album_id])
+        uri = track.uri
+        helper = TaskHelper()
+        helper.run(self.__read_uri, uri, self.__prefetch_cancellable,
+                   callback=(self.__on_prefetched, track, time()),
+                   cancellable=self.__prefetch_cancellable,
+                   lane=TaskLane.BACKGROUND)
+
+    def __read_uri(self, uri, cancellable):
+        """
+            Read uri, so that it is in page cache (or gvfs cache for
+            remote mounts) when playbin opens it
+            @param uri as str
+            @param cancellable as Gio.Cancellable
+            @return read bytes as int
+            @thread safe
+        """
+        size = 0
+        try:
+            stream = Gio.File.new_for_uri(uri).read(cancellable)
+            try:
+                while size < self.__PREFETCH_SIZE:
+                    data = stream.read_bytes(self.__PREFETCH_CHUNK,
+                                             cancellable)
+                    if data.get_size() == 0:
+                        break
+                    size += data.get_size()
+            finally:
+                stream.close(None)
+        except Exception as e:
+            if not cancellable.is_cancelled():
+                Logger.error("BinPlayer::__read_uri(): %s" % e)
+        return size
+
+    def __preroll_track(self, track):
+        """
+            Pause idle playbin on track, crossfading will just start it
+            @param track as Track
+        """
+        if self._playbin == self.__playbin1:
+            (playbin, plugins) = (self.__playbin2, self._plugins2)
+        else:
+            (playbin, plugins) = (self.__playbin1, self._plugins1)
+        # Idle playbin is still fading out
+        ok, state, pending = playbin.get_state(0)
+        if state == Gst.State.PLAYING or pending == Gst.State.PLAYING:
+            return
+        playbin.set_state(Gst.State.NULL)
+        self.__preroll = (playbin, track.id)
+        self.__preroll_message = None
+        plugins.volume.props.volume = 0
+        playbin.set_property("uri", track.uri)
+        playbin.set_state(Gst.State.PAUSED)
+
+    def __drop_preroll(self):
+        """
+            Reset idle playbin if prerolled
+        """
+        if self.__preroll is not None:
+            if self.__preroll[0] != self._playbin:
+                self.__preroll[0].set_state(Gst.State.NULL)
+            self.__preroll = None
+            self.__preroll_message = None
+
+    def __cancel_prefetch(self):
+        """
+            Stop prefetching
+        """
+        if self.__prefetch_timeout_id is not None:
+            GLib.source_remove(self.__prefetch_timeout_id)
+            self.__prefetch_timeout_id = None
+        self.__prefetch_cancellable.cancel()
+        self.__prefetch_cancellable = Gio.Cancellable()
+        self.__prefetched_id = None
+        self.__drop_preroll()
+
+    def __on_prefetch_timeout(self, track):
+        """
+            Prefetch next track if current track ends soon
+            @param track as Track
+            @return bool
+        """
+        if track is not self._current_track:
+            self.__prefetch_timeout_id = None
+            return False
+        next_track = self._next_track
+        if not self.is_playing or next_track.id is None or\
+                next_track.id < 0 or next_track.id == self.__prefetched_id:
+            return True
+        position = self._playbin.query_position(Gst.Format.TIME)[1]
+        delay = self.__PREFETCH_DELAY
+        if self._crossfading:
+            delay += App().settings.get_value(
+                "transition-duration").get_int32()
+        if track.duration - position / Gst.SECOND <= delay:
+            self.__prefetch(next_track)
+        return True
+
+    def __on_prefetched(self, size, track, started):
+        """
+            Preroll track if crossfading
+            @param size as int
+            @param track as Track
+            @param started as float
+        """
+        Logger.debug("BinPlayer::__on_prefetched(): %s bytes in %.1f ms" %
+                     (size, (time() - started) * 1000))
+        if self._crossfading and track is self._next_track:
+            self.__preroll_track(track)
+
+    def __on_bus_stream_start(self, bus, message):
+        """
+            Ignore stream start from idle playbin while prerolling
+            @param bus as Gst.Bus
+            @param message as Gst.Message
+        """
+        if self.__preroll is not None and\
+                self.__preroll[0] != self._playbin and\
+                self.__preroll[0].get_bus() == bus:
+            self.__preroll_message = message
+        else:
+            self._on_stream_start(bus, message)
+
     def __on_volume_changed(self, playbin, sink):
         """
             Update volume
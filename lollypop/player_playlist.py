@@ -14,6 +14,7 @@
 from lollypop.define import NextContext
 from lollypop.player_base import BasePlayer
 from lollypop.objects import Track
+from lollypop.player_albums import PlayerAlbums
 
 
 class PlaylistPlayer(BasePlayer):
@@ -42,7 +43,7 @@ class PlaylistPlayer(BasePlayer):
         """
         if self.is_party:
             self.set_party(False)
-        self._albums = []
+        self._albums = PlayerAlbums()
         self._playlist_tracks = tracks
         self._playlist_ids = playlist_ids
 
@@ -15,8 +15,10 @@ import random
 from lollypop.helper_task import TaskHelper
 from lollypop.define import Shuffle, NextContext, App, Type
 from lollypop.player_base import BasePlayer
-from lollypop.objects import Track, Album
+from lollypop.objects import Track
+from lollypop.player_albums import PlayerAlbums
 from lollypop.list import LinkedList
+from lollypop.shuffler import Shuffler
 
 
 class ShufflePlayer(BasePlayer):
@@ -32,6 +34,13 @@ class ShufflePlayer(BasePlayer):
         BasePlayer.__init__(self)
         # Party mode
         self.__is_party = False
+        self.__random = random.Random()
+        self.__tracks_shuffler = Shuffler(lambda album: album.track_ids,
+                                          self.__random)
+        self.__albums_shuffler = Shuffler(lambda album: [album.id],
+                                          self.__random)
+        self.__playlist_shuffler = Shuffler(lambda track: [track.id],
+                                            self.__random)
         self.reset_history()
         App().settings.connect("changed::shuffle", self.__set_shuffle)
 
@@ -41,10 +50,13 @@ class ShufflePlayer(BasePlayer):
         """
         # Tracks already played
         self.__history = []
-        # Albums already played
-        self.__already_played_albums = []
-        # Tracks already played for albums
-        self.__already_played_tracks = {}
+        # Album ids already played
+        self.__already_played_albums = set()
+        # Track ids already played
+        self.__already_played_tracks = set()
+        # Track ids never played in party mode
+        self.__party_blacklist = set()
+        self.__reset_shufflers()
         # If we have tracks/albums to ignore in party mode, add them
         helper = TaskHelper()
         helper.run(self.__init_party_blacklist)
@@ -131,6 +143,14 @@ class ShufflePlayer(BasePlayer):
             self.set_prev()
         self.emit("party-changed", party)
 
+    def seed_shuffle(self, seed):
+        """
+            Make random tracks reproducible
+            @param seed as int
+        """
+        self.__random.seed(seed)
+        self.__reset_shufflers()
+
     def set_party_ids(self):
         """
             Set party mode ids
@@ -140,7 +160,7 @@ class ShufflePlayer(BasePlayer):
             album_ids = App().albums.get_party_ids(party_ids)
         else:
             album_ids = App().albums.get_ids()
-        self._albums = [Album(album_id) for album_id in album_ids]
+        self._albums = PlayerAlbums(album_ids)
 
     @property
     def is_party(self):
@@ -222,12 +242,20 @@ class ShufflePlayer(BasePlayer):
         if self._current_track.id is not None:
             self.set_next()
 
+    def __reset_shufflers(self):
+        """
+            Allow all tracks/albums to be picked again
+        """
+        self.__tracks_shuffler.reset()
+        self.__albums_shuffler.reset()
+        self.__playlist_shuffler.reset()
+
     def __get_next(self):
         """
             Next track in shuffle mode
             @return track as Track
         """
-        try:
+        for attempt in [0, 1]:
             if self._shuffle == Shuffle.TRACKS or self.__is_party:
                 if self._albums:
                     track = self.__get_tracks_random()
@@ -235,15 +263,14 @@ class ShufflePlayer(BasePlayer):
                     track = self.__get_playlists_random()
             else:
                 track = self.__get_albums_random()
+            if track.id is not None:
+                break
             # Try to get another one track after reseting history
-            if track.id is None:
-                self.__already_played_albums = []
-                self.__already_played_tracks = {}
-                self.__history = []
-                return self.__get_next()
-            return track
-        except:  # Recursion error
-            return Track()
+            self.__already_played_albums = set()
+            self.__already_played_tracks = set(self.__party_blacklist)
+            self.__history = []
+            self.__reset_shufflers()
+        return track
 
     def __get_albums_random(self):
         """
@@ -255,15 +282,15 @@ class ShufflePlayer(BasePlayer):
         new_track_position = self._current_track.position + 1
         # next album
         if new_track_position >= len(album.track_ids):
-            self.__already_played_albums.append(album)
-            for album in sorted(
-                    self._albums, key=lambda *args: random.random()):
-                # Ignore current album, not an issue if playing one album
-                # in shuffle because LinearPlayer will handle next()
-                if album not in self.__already_played_albums and\
-                        album != App().player.current_track.album:
-                    track = album.tracks[0]
-                    break
+            self.__already_played_albums.add(album.id)
+            # Ignore current album, not an issue if playing one album
+            # in shuffle because LinearPlayer will handle next()
+            self.__albums_shuffler.set_groups(self._albums,
+                                              self._albums.version)
+            (album, album_id) = self.__albums_shuffler.next(
+                self.__already_played_albums,
+                App().player.current_track.album.id)
+            track = Track() if album is None else album.tracks[0]
         # next track
         else:
             track = album.tracks[new_track_position]
@@ -274,52 +301,46 @@ class ShufflePlayer(BasePlayer):
             Return a track from current playlist
             @return Track
         """
-        for track in sorted(
-                self._playlist_tracks, key=lambda *args: random.random()):
-            # Ignore current track, not an issue if playing one track
-            # in shuffle because LinearPlayer will handle next()
-            if track != App().player.current_track and (
-                   track.album not in self.__already_played_tracks.keys() or
-                   track not in self.__already_played_tracks[track.album]):
-                return track
-        self._next_context = NextContext.STOP
-        return Track()
+        self.__playlist_shuffler.set_groups(self._playlist_tracks)
+        # Ignore current track, not an issue if playing one track
+        # in shuffle because LinearPlayer will handle next()
+        (track, track_id) = self.__playlist_shuffler.next(
+            self.__already_played_tracks,
+            App().player.current_track.id)
+        if track is None:
+            self._next_context = NextContext.STOP
+            return Track()
+        return track
 
     def __get_tracks_random(self):
         """
             Return a random track and make sure it has never been played
             @return Track
         """
-        for album in sorted(self._albums, key=lambda *args: random.random()):
-            for track in sorted(album.tracks,
-                                key=lambda *args: random.random()):
-                # Ignore current track, not an issue if playing one track
-                # in shuffle because LinearPlayer will handle next()
-                if track != App().player.current_track and (
-                        album not in self.__already_played_tracks.keys() or
-                        track not in self.__already_played_tracks[album]):
-                    return track
-            if album in self.__already_played_tracks.keys():
-                self.__already_played_tracks.pop(album)
-                self.__already_played_albums.append(album)
-        self._next_context = NextContext.STOP
-        return Track()
+        self.__tracks_shuffler.set_groups(self._albums,
+                                          self._albums.version)
+        # Ignore current track, not an issue if playing one track
+        # in shuffle because LinearPlayer will handle next()
+        (album, track_id) = self.__tracks_shuffler.next(
+            self.__already_played_tracks,
+            App().player.current_track.id)
+        if album is None:
+            self._next_context = NextContext.STOP
+            return Track()
+        return Track(track_id, album)
 
     def __add_to_shuffle_history(self, track):
         """
             Add a track to shuffle history
             @param track as Track
         """
-        if track.album not in self.__already_played_tracks.keys():
-            self.__already_played_tracks[track.album] = []
-        if track not in self.__already_played_tracks[track.album]:
-            self.__already_played_tracks[track.album].append(track)
+        self.__already_played_tracks.add(track.id)
 
     def __init_party_blacklist(self):
         """
             Add party mode blacklist to already played tracks
         """
         if self.__is_party:
-            for track_id in App().playlists.get_track_ids(Type.NOPARTY):
-                track = Track(track_id)
-                self.__add_to_shuffle_history(track)
+            track_ids = App().playlists.get_track_ids(Type.NOPARTY)
+            self.__party_blacklist = set(track_ids)
+            self.__already_played_tracks |= self.__party_blacklist
@@ -25,6 +25,8 @@ from lollypop.localized import LocalizedCollation
 from lollypop.logger import Logger
 from lollypop.objects import Track
 from lollypop.sqlcursor import SqlCursor
+from lollypop.helper_task import TaskHelper
+from lollypop.tracks_matcher import TracksMatcher
 
 
 class Playlists(GObject.GObject):
@@ -134,6 +136,16 @@ class Playlists(GObject.GObject):
                         WHERE uri=?",
                         (uri,))
 
+    def remove_uris(self, uris):
+        """
+            Remove tracks from playlists
+            @param uris as [str]
+        """
+        with SqlCursor(self) as sql:
+            sql.executemany("DELETE FROM tracks\
+                            WHERE uri=?",
+                            [(uri,) for uri in uris])
+
     def get(self):
         """
             Return availables playlists
@@ -475,12 +487,12 @@ class Playlists(GObject.GObject):
         # FIXME Why Type.NONE? Need to check old code
         if playlist_id == Type.NONE:
             playlist_id = self.add(basename)
-            tracks = []
+            entries = []
             parser.connect("entry-parsed", self.__on_entry_parsed,
-                           playlist_id, tracks)
+                           playlist_id, entries)
             parser.parse_async(f.get_uri(), True,
                                None, self.__on_parse_finished,
-                               playlist_id, tracks)
+                               playlist_id, entries)
 
     def get_cursor(self):
         """
@@ -497,23 +509,45 @@ class Playlists(GObject.GObject):
 #######################
 # PRIVATE             #
 #######################
-    def __on_parse_finished(self, parser, result, playlist_id, uris):
+    def __on_parse_finished(self, parser, result, playlist_id, entries):
         """
             Add tracks to playlists
             @param parser as TotemPlParser.Parser
             @param result as Gio.AsyncResult
             @param playlist_id as int
-            @param uris as [str]
+            @param entries as [(str, str, str)]
         """
+        helper = TaskHelper()
+        helper.run(self.__add_entries, playlist_id, entries)
+
+    def __add_entries(self, playlist_id, entries):
+        """
+            Add entries to playlist, entries not in collection are
+            searched by artist and title
+            @param playlist_id as int
+            @param entries as [(str, str, str)]
+            @thread safe
+        """
+        matcher = TracksMatcher()
+        uris = []
+        for (uri, artist, title) in entries:
+            if artist and title and\
+                    App().tracks.get_id_by_uri(uri) is None:
+                track_id = matcher.match(artist, title)
+                if track_id is not None:
+                    uri = App().tracks.get_uri(track_id)
+            uris.append(uri)
         self.add_uris(playlist_id, uris)
 
-    def __on_entry_parsed(self, parser, uri, metadata, playlist_id, uris):
+    def __on_entry_parsed(self, parser, uri, metadata, playlist_id, entries):
         """
             Play stream
             @param parser as TotemPlParser.Parser
             @param track uri as str
             @param metadata as GLib.HastTable
             @param playlist_id as int
-            @param uris as [str]
+            @param entries as [(str, str, str)]
         """
-        uris.append(uri)
+        artist = metadata.get(TotemPlParser.PARSER_FIELD_AUTHOR, None)
+        title = metadata.get(TotemPlParser.PARSER_FIELD_TITLE, None)
+        entries.append((uri, artist, title))
@@ -15,10 +15,12 @@ from gi.repository import Gtk, GLib, Gio, GdkPixbuf, Gdk
 from gettext import gettext as _
 
 from lollypop.helper_task import TaskHelper
-from lollypop.define import App, ArtSize, ResponsiveType
+from lollypop.define import App, ArtSize, ResponsiveType, LookupResult
+from lollypop.define import TaskLane
 from lollypop.objects import Album
 from lollypop.logger import Logger
 from lollypop.utils import draw_rounded_image, escape
+from lollypop.utils import get_network_available
 from lollypop.information_store import InformationStore
 from lollypop.view_albums_list import AlbumsListView
 
@@ -36,8 +38,10 @@ class InformationPopover(Gtk.Popover):
         Gtk.Popover.__init__(self)
         self.__scale_factor = 0
         self.__minimal = minimal
+        self.__art_signal_id = None
         self.set_position(Gtk.PositionType.BOTTOM)
         self.connect("map", self.__on_map)
+        self.connect("destroy", self.__on_destroy)
 
     def populate(self, artist_id=None):
         """
@@ -77,6 +81,12 @@ class InformationPopover(Gtk.Popover):
                 self.__on_artwork_draw,
                 artist_name)
             self.__set_artist_artwork(artist_artwork, artist_name)
+            # Thumbnail may be made in background
+            self.__art_signal_id = App().art.connect(
+                "artist-artwork-changed",
+                self.__on_artist_artwork_changed,
+                artist_artwork,
+                artist_name)
             albums_view = AlbumsListView(ResponsiveType.LIST)
             albums_view.set_size_request(300, -1)
             albums_view.show()
@@ -95,7 +105,8 @@ class InformationPopover(Gtk.Popover):
             bio_label.set_text(_("Loading information"))
             helper.run(
                 self.__get_bio_content, artist_name,
-                callback=(self.__set_bio_content, bio_label, artist_name))
+                callback=(self.__set_bio_content, bio_label, artist_name),
+                lane=TaskLane.NETWORK)
 
 #######################
 # PROTECTED           #
@@ -116,30 +127,56 @@ class InformationPopover(Gtk.Popover):
             @param content as str
         """
         content = None
-        try:
-            if App().lastfm is not None:
+        # Do not remember lookups done while offline
+        if not get_network_available():
+            return None
+        if App().lastfm is not None and\
+                not App().lookups.is_cached("lastfm", "bio", artist_name):
+            from pylast import WSError
+            result = LookupResult.NOT_FOUND
+            try:
                 content = App().lastfm.get_artist_bio(artist_name)
-        except Exception as e:
-            Logger.info("InformationPopover::__get_bio_content(): %s" % e)
-        if content is None:
+            except WSError as e:
+                Logger.info("InformationPopover::__get_bio_content(): %s" % e)
+                # Only "invalid parameters" means artist is unknown
+                if e.get_id() != "6":
+                    result = LookupResult.ERROR
+            except Exception as e:
+                Logger.info("InformationPopover::__get_bio_content(): %s" % e)
+                result = LookupResult.ERROR
+            if content is None:
+                App().lookups.set_result("lastfm", "bio", artist_name, result)
+        if content is None and\
+                not App().lookups.is_cached("wikipedia", "bio", artist_name):
             try:
-                from locale import getdefaultlocale
                 import wikipedia
+            except ImportError as e:
+                # Do not remember missing wikipedia module
+                Logger.info("InformationPopover::__get_bio_content(): %s" % e)
+                return None
+            try:
+                from locale import getdefaultlocale
                 language = getdefaultlocale()[0][0:2]
                 wikipedia.set_lang(language)
+                search = "%s %s" % (artist_name, "music")
                 try:
-                    page = wikipedia.page("%s %s" % (artist_name, "music"))
+                    page = wikipedia.page(search)
                     if artist_name.lower() not in page.title.lower():
-                        raise
-                except:
-                    try:
-                        wikipedia.set_lang("en")
-                        page = wikipedia.page("%s %s" % (artist_name, "music"))
-                    except:
-                        pass
+                        page = None
+                except (wikipedia.PageError, wikipedia.DisambiguationError):
+                    page = None
+                if page is None:
+                    wikipedia.set_lang("en")
+                    page = wikipedia.page(search)
                 content = page.content.encode(encoding="UTF-8")
+            except (wikipedia.PageError, wikipedia.DisambiguationError) as e:
+                Logger.info("InformationPopover::__get_bio_content(): %s" % e)
+                App().lookups.set_result("wikipedia", "bio", artist_name,
+                                         LookupResult.NOT_FOUND)
             except Exception as e:
                 Logger.info("InformationPopover::__get_bio_content(): %s" % e)
+                App().lookups.set_result("wikipedia", "bio", artist_name,
+                                         LookupResult.ERROR)
         return content
 
     def __set_bio_content(self, content, label, artist_name):
@@ -236,6 +273,26 @@ class InformationPopover(Gtk.Popover):
         draw_rounded_image(image, ctx)
         return True
 
+    def __on_artist_artwork_changed(self, art, artist, image, artist_name):
+        """
+            Update artwork if needed
+            @param art as Art
+            @param artist as str
+            @param image as Gtk.Image
+            @param artist_name as str
+        """
+        if artist == artist_name:
+            self.__set_artist_artwork(image, artist_name)
+
+    def __on_destroy(self, widget):
+        """
+            Disconnect signal
+            @param widget as Gtk.Widget
+        """
+        if self.__art_signal_id is not None:
+            App().art.disconnect(self.__art_signal_id)
+            self.__art_signal_id = None
+
     def __on_map(self, widget):
         """
             Connect signal and resize
@@ -12,7 +12,7 @@
 
 from gi.repository import Gtk, GLib, Pango
 
-from lollypop.define import App
+from lollypop.define import App, TaskLane
 from lollypop.helper_task import TaskHelper
 from lollypop.utils import get_network_available
 
@@ -54,7 +54,8 @@ class LastfmPopover(Gtk.Popover):
                 artists.append(App().artists.get_name(artist_id))
             task_helper = TaskHelper()
             task_helper.run(self.__get_similars, artists,
-                            callback=(self.__populate,))
+                            callback=(self.__populate,),
+                            lane=TaskLane.NETWORK)
 
 #######################
 # PRIVATE             #
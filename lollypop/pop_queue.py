@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, Gdk, Pango, GObject
+from gi.repository import Gtk, GLib, Gdk, Gio, Pango, GObject
 
 from lollypop.define import App, ArtSize, Type
 from lollypop.objects import Track, Album
@@ -32,6 +32,8 @@ class QueueRow(Gtk.ListBoxRow):
         Gtk.ListBoxRow.__init__(self)
         self.__id = track_id
         self.__number = 0
+        self.__album_id = None
+        self.__cancellable = Gio.Cancellable()
         self.set_margin_start(5)
         self.set_margin_end(5)
         self.set_margin_top(2)
@@ -95,6 +97,7 @@ class QueueRow(Gtk.ListBoxRow):
         self.connect("drag-data-received", self.__on_drag_data_received)
         self.connect("drag-motion", self.__on_drag_motion)
         self.connect("drag-leave", self.__on_drag_leave)
+        self.connect("destroy", self.__on_destroy)
         self.get_style_context().add_class("trackrow")
 
     def show_header(self, show):
@@ -140,15 +143,50 @@ class QueueRow(Gtk.ListBoxRow):
             @param surface as cairo.Surface
         """
         if surface is None:
+            self.__cancellable.cancel()
+            self.__album_id = None
             self.__cover.clear()
             self.__cover.hide()
         else:
             self.__cover.set_from_surface(surface)
             self.__cover.show()
 
+    def set_album_artwork(self, album):
+        """
+            Load album artwork, show a placeholder until loaded
+            @param album as Album
+        """
+        if album.id == self.__album_id:
+            return
+        self.__cancellable.cancel()
+        self.__cancellable = Gio.Cancellable()
+        self.__album_id = album.id
+        scale = self.get_scale_factor()
+        surface = App().art.get_album_artwork_cached(album,
+                                                     ArtSize.MEDIUM,
+                                                     scale)
+        if surface is not None:
+            self.set_cover(surface)
+            return
+        self.set_cover(App().art.get_default_icon("folder-music-symbolic",
+                                                  ArtSize.MEDIUM * scale,
+                                                  scale))
+        App().art.get_album_artwork_async(album,
+                                          ArtSize.MEDIUM,
+                                          scale,
+                                          self.set_cover,
+                                          self.__cancellable)
+
 #######################
 # PRIVATE             #
 #######################
+    def __on_destroy(self, widget):
+        """
+            Cancel artwork loading
+            @param widget as Gtk.Widget
+        """
+        self.__cancellable.cancel()
+
     def __on_drag_begin(self, widget, context):
         """
             Set icon
@@ -313,11 +351,7 @@ class QueuePopover(Gtk.Popover):
             album_id = App().tracks.get_album_id(track_id)
             row = self.__row_for_track_id(track_id)
             if album_id != prev_album_id:
-                surface = App().art.get_album_artwork(
-                    Album(album_id),
-                    ArtSize.MEDIUM,
-                    self.get_scale_factor())
-                row.set_cover(surface)
+                row.set_album_artwork(Album(album_id))
                 row.show_header(True)
             self.__view.add(row)
             GLib.idle_add(self.__add_items, items, album_id)
@@ -379,11 +413,7 @@ class QueuePopover(Gtk.Popover):
                 child.set_cover(None)
                 child.show_header(False)
             else:
-                surface = App().art.get_album_artwork(
-                    Album(track.album.id),
-                    ArtSize.MEDIUM,
-                    self.get_scale_factor())
-                child.set_cover(surface)
+                child.set_album_artwork(Album(track.album.id))
                 child.show_header(True)
             prev_album_id = track.album.id
 
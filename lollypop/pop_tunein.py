@@ -16,7 +16,7 @@ from gettext import gettext as _
 
 from lollypop.radios import Radios
 from lollypop.logger import Logger
-from lollypop.define import App, ArtSize, WindowSize
+from lollypop.define import App, ArtSize, WindowSize, TaskLane
 from lollypop.art import Art
 from lollypop.utils import get_network_available
 from lollypop.list import LinkedList
@@ -348,13 +348,16 @@ class TuneinPopover(Gtk.Popover):
                 # Cache for toolbar
                 helper.run(App().art.copy_uri_to_cache,
                            item.LOGO, item.TEXT,
-                           App().window.toolbar.info.artsize)
+                           App().window.toolbar.info.artsize,
+                           lane=TaskLane.NETWORK)
                 # Cache for MPRIS
                 helper.run(App().art.copy_uri_to_cache,
-                           item.LOGO, item.TEXT, ArtSize.BIG)
+                           item.LOGO, item.TEXT, ArtSize.BIG,
+                           lane=TaskLane.NETWORK)
                 # Cache for miniplayer
                 helper.run(App().art.copy_uri_to_cache,
-                           item.LOGO, item.TEXT, WindowSize.SMALL)
+                           item.LOGO, item.TEXT, WindowSize.SMALL,
+                           lane=TaskLane.NETWORK)
             App().player.load_external(item.URL, item.TEXT)
             App().player.play_this_external(item.URL)
         return True
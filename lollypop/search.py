@@ -10,9 +10,11 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from lollypop.define import App
+from lollypop.define import App, TaskLane
 from lollypop.helper_task import TaskHelper
+from lollypop.logger import Logger
 from lollypop.objects import Album, Track
+from lollypop.utils import noaccents
 
 
 class Search:
@@ -39,147 +41,81 @@ class Search:
                 search_items.append(item)
         helper = TaskHelper()
         helper.run(self.__get, search_items,
-                   cancellable, callback=callback)
+                   cancellable, callback=callback, lane=TaskLane.UI)
 
 #######################
 # PRIVATE             #
 #######################
-    def __calculate_score(self, string, search_items):
+    def __get_query(self, search_items):
         """
-            Calculate string score for search items
-            @param string as str
-            @param search_item as [str]
-        """
-        split_string = string.lower().split()
-        explode_split = self.__explode_search_items(split_string)
-        explode_search = self.__explode_search_items(search_items)
-        join = list(set(explode_split) & set(explode_search))
-        return len(join)
-
-    def __explode_search_items(self, search_items):
-        """
-            Explose search items for all search possiblities
+            Get full text query for search items
+            Matching more items gives a better rank
             @param search_items as [str]
-            @return [str]
+            @return str
         """
-        possibilities = []
-        index = len(search_items)
-        while index > 1:
-            item = " ".join(search_items[:index])
-            if item:
-                possibilities.append(item)
-            index -= 1
-        index = len(search_items)
-        while index >= 1:
-            item = " ".join(search_items[index:])
-            if item:
-                possibilities.append(item)
-            index -= 1
-        return possibilities + search_items
+        tokens = []
+        for item in search_items:
+            item = noaccents(item).replace('"', '""')
+            tokens.append('"%s"*' % item)
+        return " OR ".join(tokens)
 
-    def __search_artists(self, search_items, cancellable):
+    def __search(self, db, query, search_items):
         """
-            Get artist albums for search items
+            Search db with full text query
+            Fallback to a LIKE search if full text search is not available
+            @param db as TracksDatabase/AlbumsDatabase/ArtistsDatabase
+            @param query as str
             @param search_items as [str]
-            @param cancellable as Gio.Cancellable
-            @return albums_ids as [int]
-        """
-        artist_ids = []
-        for search_str in self.__explode_search_items(search_items):
-            artist_ids += App().artists.search(search_str)
-            if cancellable.is_cancelled():
-                break
-        album_ids = []
-        for artist_id in artist_ids:
-            if cancellable.is_cancelled():
-                return []
-            for album_id in App().albums.get_ids([artist_id], []):
-                if (album_id, artist_id) not in album_ids:
-                    album_ids.append(album_id)
-        return album_ids
+            @return [(id as int, score as float)]
+        """
+        try:
+            return db.search_fts(query)
+        except Exception as e:
+            Logger.error("Search::__search(): %s" % e)
+            return [(object_id, 0) for object_id in
+                    db.search(" ".join(search_items))]
 
-    def __search_tracks(self, search_items, cancellable):
-        """
-            Get tracks for search items
-            @param search_items as [str]
-            @param cancellable as Gio.Cancellable
-            @return track_ids as [int]
-        """
-        track_ids = []
-        for search_str in self.__explode_search_items(search_items):
-            track_ids += App().tracks.search(search_str)
-            if cancellable.is_cancelled():
-                break
-        return track_ids
-
-    def __search_albums(self, search_items, cancellable):
+    def __get(self, search_items, cancellable):
         """
-            Get albums for search items
+            Get track for name
             @param search_items as [str]
             @param cancellable as Gio.Cancellable
-            @return track_ids as [int]
+            @return items as [SearchItem]
         """
-        album_ids = []
-        for search_str in self.__explode_search_items(search_items):
-            album_ids = App().albums.search(search_str)
-            if cancellable.is_cancelled():
-                break
+        query = self.__get_query(search_items)
+        scores = {}
+        album_tracks = {}
+        for (album_id, score) in self.__search(App().albums,
+                                               query, search_items):
+            scores[album_id] = scores.get(album_id, 0) + score
         # Same for year #TODO make this ok for all date + for tracks
-        if not album_ids and not cancellable.is_cancelled():
-            for search_str in self.__explode_search_items(search_items):
+        if not scores:
+            for item in search_items:
                 try:
-                    album_ids = App().albums.get_by_year(int(search_str))
+                    for album_id in App().albums.get_by_year(int(item)):
+                        scores[album_id] = 0
                 except:
                     pass
-                if album_ids:
-                    break
-        return album_ids
-
-    def __get(self, search_items, cancellable):
-        """
-            Get track for name
-            @param search_items as [str]
-            @param cancellable as Gio.Cancellable
-            @return items as [SearchItem]
-        """
-        album_ids = self.__search_albums(search_items, cancellable)
-        track_ids = self.__search_tracks(search_items, cancellable)
-        album_artist_ids = self.__search_artists(search_items, cancellable)
+        if cancellable.is_cancelled():
+            return []
+        for (artist_id, score) in self.__search(App().artists,
+                                                query, search_items):
+            for album_id in App().albums.get_ids([artist_id], []):
+                scores[album_id] = scores.get(album_id, 0) + score
+            if cancellable.is_cancelled():
+                return []
+        for (track_id, score) in self.__search(App().tracks,
+                                               query, search_items):
+            album_id = App().tracks.get_album_id(track_id)
+            scores[album_id] = scores.get(album_id, 0) + score
+            album_tracks.setdefault(album_id, []).append(Track(track_id))
         albums = []
-
-        # Create albums for tracks
-        album_tracks = {}
-        for track_id in list(set(track_ids)):
-            track = Track(track_id)
-            score = self.__calculate_score(track.name, search_items)
-            for artist in track.artists:
-                score += self.__calculate_score(artist, search_items)
-            # Score existing album
-            if track.album.id in album_ids:
-                # Remove all album.id occurences
-                album_ids = list(filter((track.album.id).__ne__, album_ids))
-            elif track.album.id in album_artist_ids:
-                album_artist_ids = list(filter((track.album.id).__ne__,
-                                               album_artist_ids))
-            # Get a new album
-            album = track.album
-            if album.id in album_tracks.keys():
-                (album, tracks, score) = album_tracks[album.id]
-                tracks.append(track)
-                album_tracks[track.album.id] = (album, tracks, score)
-            else:
-                album_tracks[track.album.id] = (album, [track], score)
-        # Create albums for album results
-        for album_id in list(set(album_ids + album_artist_ids)):
+        for album_id in sorted(scores.keys(),
+                               key=lambda album_id: scores[album_id],
+                               reverse=True):
             album = Album(album_id)
-            score = self.__calculate_score(album.name, search_items)
-            for artist in album.artists:
-                score += self.__calculate_score(artist, search_items)
-            albums.append((score, album))
-        # Merge albums from track results
-        for key in album_tracks.keys():
-            (album, tracks, score) = album_tracks[key]
-            album.set_tracks(tracks)
-            albums.append((score, album))
-        albums.sort(key=lambda tup: tup[0], reverse=True)
-        return [album for (score, album) in albums]
+            # Only show matching tracks
+            if album_id in album_tracks.keys():
+                album.set_tracks(album_tracks[album_id])
+            albums.append(album)
+        return albums
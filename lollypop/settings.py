@@ -802,6 +802,8 @@ class SettingsDialog:
             App().player.stop()
             App().db.drop_db()
             App().db = Database()
+            App().albums.cache.clear()
+            App().tracks.cache.clear()
             App().window.container.show_genres(
                 App().settings.get_value("show-genres"))
             App().scanner.update()
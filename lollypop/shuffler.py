@@ -0,0 +1,145 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from array import array
+
+
+class Permutation:
+    """
+        Random permutation of ints, generated one value at a time
+        (lazy Fisher-Yates shuffle)
+    """
+
+    def __init__(self, values, random):
+        """
+            Init permutation
+            @param values as [int]
+            @param random as random.Random
+        """
+        self.__values = array("q", values)
+        self.__position = 0
+        self.__random = random
+
+    def next(self):
+        """
+            Get next value
+            @return int/None if exhausted
+        """
+        position = self.__position
+        count = len(self.__values)
+        if position >= count:
+            return None
+        swap = self.__random.randrange(position, count)
+        values = self.__values
+        (values[position], values[swap]) = (values[swap], values[position])
+        self.__position += 1
+        return values[position]
+
+    def reset(self):
+        """
+            Start a new permutation
+        """
+        self.__position = 0
+
+    @property
+    def remaining(self):
+        """
+            Values not returned yet
+            @return int
+        """
+        return len(self.__values) - self.__position
+
+
+class Shuffler:
+    """
+        Pick random values from groups (tracks from albums...)
+        A group is picked at random among groups with values left, then
+        a value from group permutation: each value is returned once
+        until reset()
+        Permutations are made for picked groups only
+        Last value is returned again until ignored: asking for next value
+        many times does not consume values
+    """
+
+    def __init__(self, get_values, random):
+        """
+            Init shuffler
+            @param get_values as function: group -> [int]
+            @param random as random.Random
+        """
+        self.__get_values = get_values
+        self.__random = random
+        self.__groups = None
+        self.__count = 0
+        self.__version = 0
+        self.__active = array("q")
+        self.__permutations = {}
+        self.__last = None
+
+    def set_groups(self, groups, version=0):
+        """
+            Set groups, nothing is done if groups did not change
+            Permutations are stored by group index: version must change
+            when groups are reordered in place
+            @param groups as []
+            @param version as int
+        """
+        if groups is self.__groups and len(groups) == self.__count and\
+                version == self.__version:
+            return
+        self.__groups = groups
+        self.__count = len(groups)
+        self.__version = version
+        self.__active = array("q", range(self.__count))
+        self.__permutations = {}
+        self.__last = None
+
+    def next(self, ignored, skipped=None):
+        """
+            Get a random value not in ignored and not skipped
+            @param ignored as set
+            @param skipped as int
+            @return (group as object, value as int)/(None, None)
+        """
+        if self.__last is not None:
+            value = self.__last[1]
+            if value not in ignored and value != skipped:
+                return self.__last
+        active = self.__active
+        while active:
+            index = self.__random.randrange(len(active))
+            permutation = self.__permutations.get(active[index], None)
+            if permutation is None:
+                group = self.__groups[active[index]]
+                permutation = Permutation(self.__get_values(group),
+                                          self.__random)
+                self.__permutations[active[index]] = permutation
+            value = permutation.next()
+            while value is not None and\
+                    (value in ignored or value == skipped):
+                value = permutation.next()
+            if value is not None:
+                self.__last = (self.__groups[active[index]], value)
+                return self.__last
+            # Group exhausted, swap remove it
+            active[index] = active[-1]
+            active.pop()
+        return (None, None)
+
+    def reset(self):
+        """
+            Allow values to be returned again
+        """
+        self.__active = array("q", range(self.__count))
+        self.__last = None
+        for permutation in self.__permutations.values():
+            permutation.reset()
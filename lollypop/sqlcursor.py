@@ -37,10 +37,19 @@ class SqlCursor:
         """
         name = current_thread().getName() + obj.__class__.__name__
         App().cursors[name].commit()
-        App().cursors[name].close()
+        SqlCursor.release(obj, App().cursors[name])
         del App().cursors[name]
         obj.thread_lock.release()
 
+    def release(obj, cursor):
+        """
+            Give cursor back to obj if it keeps connections, else close it
+        """
+        if hasattr(obj, "release_cursor"):
+            obj.release_cursor(cursor)
+        else:
+            cursor.close()
+
     def commit(obj):
         """
             Commit current obj
@@ -64,6 +73,7 @@ class SqlCursor:
         """
         self.__obj = obj
         self.__creator = False
+        self.__locked = False
 
     def __enter__(self):
         """
@@ -73,7 +83,10 @@ class SqlCursor:
         if name not in App().cursors:
             self.__creator = True
             App().cursors[name] = self.__obj.get_cursor()
-            self.__obj.thread_lock.acquire()
+            # With WAL, only long running writers need the lock
+            if not getattr(self.__obj, "wal", False):
+                self.__locked = True
+                self.__obj.thread_lock.acquire()
         return App().cursors[name]
 
     def __exit__(self, type, value, traceback):
@@ -83,6 +96,7 @@ class SqlCursor:
         if self.__creator:
             name = current_thread().getName() + self.__obj.__class__.__name__
             App().cursors[name].commit()
-            App().cursors[name].close()
+            SqlCursor.release(self.__obj, App().cursors[name])
             del App().cursors[name]
-            self.__obj.thread_lock.release()
+            if self.__locked:
+                self.__obj.thread_lock.release()
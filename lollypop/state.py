@@ -0,0 +1,98 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from pickle import dump, load, HIGHEST_PROTOCOL
+import os
+
+from lollypop.define import LOLLYPOP_DATA_PATH
+from lollypop.logger import Logger
+
+
+class State:
+    """
+        Playback state saved on quit
+        One versioned file holding builtin types only (ints, bytes, lists,
+        dicts): no object is pickled, so a snapshot stays valid when
+        classes change. Written in a temporary file then renamed, a
+        snapshot is never half written
+    """
+    __PATH = LOLLYPOP_DATA_PATH + "/state.bin"
+    __VERSION = 1
+    # Files used before snapshots
+    __OLD_FILES = ["Albums.bin", "track_id.bin", "player.bin",
+                   "queue.bin", "playlist_ids.bin", "position.bin"]
+    __DEFAULTS = {"track_id": -1,
+                  "position": 0,
+                  "is_playing": False,
+                  "is_party": False,
+                  "queue": [],
+                  "playlist_ids": [],
+                  "playlist_track_ids": [],
+                  "albums": None}
+
+    def __init__(self):
+        """
+            Init state
+        """
+        self.__values = None
+
+    def get(self, key):
+        """
+            Get value for key, snapshot is read on first call
+            @param key as str
+            @return value or default if missing
+        """
+        if self.__values is None:
+            self.__values = self.__load()
+        return self.__values.get(key, self.__DEFAULTS[key])
+
+    def save(self, values):
+        """
+            Save values as snapshot
+            @param values as {str: builtin type}
+        """
+        try:
+            snapshot = dict(values)
+            snapshot["version"] = self.__VERSION
+            tmp_path = self.__PATH + ".tmp"
+            with open(tmp_path, "wb") as f:
+                dump(snapshot, f, HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.__PATH)
+            self.__values = snapshot
+            for filename in self.__OLD_FILES:
+                path = "%s/%s" % (LOLLYPOP_DATA_PATH, filename)
+                if os.path.exists(path):
+                    os.remove(path)
+        except Exception as e:
+            Logger.error("State::save(): %s" % e)
+
+#######################
+# PRIVATE             #
+#######################
+    def __load(self):
+        """
+            Load snapshot
+            @return {}
+        """
+        try:
+            if os.path.exists(self.__PATH):
+                with open(self.__PATH, "rb") as f:
+                    snapshot = load(f)
+                if snapshot.get("version", None) == self.__VERSION:
+                    return snapshot
+                Logger.info("State::__load(): unknown version %s" %
+                            snapshot.get("version", None))
+        except Exception as e:
+            Logger.error("State::__load(): %s" % e)
+        return {}
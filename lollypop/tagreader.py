@@ -16,7 +16,7 @@ from gettext import gettext as _
 from re import match
 
 from gi.repository import Gio, GLib, Gst, GstPbutils
-from lollypop.define import ENCODING, App
+from lollypop.define import ENCODING
 from lollypop.logger import Logger
 from lollypop.utils import format_artist_name
 
@@ -108,6 +108,20 @@ class TagReader(Discoverer):
                 composers.append(read)
         return "; ".join(composers)
 
+    def get_artwork_sample(self, tags):
+        """
+            Return embedded artwork
+            @param tags as Gst.TagList
+            @return Gst.Sample/None
+        """
+        if tags is None:
+            return None
+        (exists, sample) = tags.get_sample_index("image", 0)
+        # Some file store it in a preview-image tag
+        if not exists:
+            (exists, sample) = tags.get_sample_index("preview-image", 0)
+        return sample if exists else None
+
     def get_mb_album_id(self, tags):
         """
             Get album id (musicbrainz)
@@ -440,11 +454,12 @@ class TagReader(Discoverer):
             lyrics = get_ogg()
         return lyrics
 
-    def add_artists(self, artists, sortnames):
+    def add_artists(self, artists, sortnames, ingest):
         """
             Add artists to db
             @param artists as [string]
             @param sortnames as [string]
+            @param ingest as DatabaseIngest
             @return [int]
             @commit needed
         """
@@ -456,7 +471,7 @@ class TagReader(Discoverer):
             artist = artist.strip()
             if artist != "":
                 # Get artist id, add it if missing
-                artist_id = App().artists.get_id(artist)
+                artist_id = ingest.get_artist_id(artist)
                 if i >= sortlen or sortsplit[i] == "":
                     sortname = None
                 else:
@@ -464,19 +479,19 @@ class TagReader(Discoverer):
                 if artist_id is None:
                     if sortname is None:
                         sortname = format_artist_name(artist)
-                    artist_id = App().artists.add(artist, sortname)
+                    artist_id = ingest.add_artist(artist, sortname)
                 elif sortname is not None:
-                    App().artists.set_sortname(artist_id, sortname)
+                    ingest.set_artist_sortname(artist_id, sortname)
                 i += 1
                 artist_ids.append(artist_id)
         return artist_ids
 
-    def add_album_artists(self, artists, sortnames):
+    def add_album_artists(self, artists, sortnames, ingest):
         """
             Add album artist to db
             @param artists as [string]
             @param sortnames as [string]
-            @param artist ids as int
+            @param ingest as DatabaseIngest
             @return ([int], [int])
             @commit needed
         """
@@ -489,7 +504,7 @@ class TagReader(Discoverer):
             artist = artist.strip()
             if artist != "":
                 # Get album artist id, add it if missing
-                artist_id = App().artists.get_id(artist)
+                artist_id = ingest.get_artist_id(artist)
                 if i >= sortlen or sortsplit[i] == "":
                     sortname = None
                 else:
@@ -497,18 +512,19 @@ class TagReader(Discoverer):
                 if artist_id is None:
                     if sortname is None:
                         sortname = format_artist_name(artist)
-                    artist_id = App().artists.add(artist, sortname)
+                    artist_id = ingest.add_artist(artist, sortname)
                     new_artist_ids.append(artist_id)
                 elif sortname is not None:
-                    App().artists.set_sortname(artist_id, sortname)
+                    ingest.set_artist_sortname(artist_id, sortname)
                 i += 1
                 artist_ids.append(artist_id)
         return (artist_ids, new_artist_ids)
 
-    def add_genres(self, genres):
+    def add_genres(self, genres, ingest):
         """
             Add genres to db
             @param genres as string
+            @param ingest as DatabaseIngest
             @return genre ids as [int]
             @commit needed
         """
@@ -519,15 +535,15 @@ class TagReader(Discoverer):
             genre = genre.strip()
             if genre != "":
                 # Get genre id, add genre if missing
-                genre_id = App().genres.get_id(genre)
+                genre_id = ingest.get_genre_id(genre)
                 if genre_id is None:
-                    genre_id = App().genres.add(genre)
+                    genre_id = ingest.add_genre(genre)
                     new_genre_ids.append(genre_id)
                 genre_ids.append(genre_id)
         return (genre_ids, new_genre_ids)
 
     def add_album(self, album_name, mb_album_id, artist_ids,
-                  uri, loved, popularity, rate, mtime):
+                  uri, loved, popularity, rate, mtime, ingest):
         """
             Add album to db
             @param album name as string
@@ -538,6 +554,7 @@ class TagReader(Discoverer):
             @param popularity as int
             @param rate as int
             @param mtime as int
+            @param ingest as DatabaseIngest
             @return (album id as int, new as bool)
             @commit needed
         """
@@ -548,13 +565,12 @@ class TagReader(Discoverer):
         else:
             parent_uri = ""
         new = False
-        album_id = App().albums.get_id(album_name, mb_album_id, artist_ids)
+        album_id = ingest.get_album_id(album_name, mb_album_id, artist_ids)
         if album_id is None:
             new = True
-            album_id = App().albums.add(album_name, mb_album_id, artist_ids,
+            album_id = ingest.add_album(album_name, mb_album_id, artist_ids,
                                         parent_uri, loved, popularity,
                                         rate, mtime)
         # Now we have our album id, check if path doesn"t change
-        if App().albums.get_uri(album_id) != parent_uri:
-            App().albums.set_uri(album_id, parent_uri)
+        ingest.set_album_uri(album_id, parent_uri)
         return (album_id, new)
@@ -0,0 +1,156 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Thread, Lock, Condition
+from collections import deque
+from bisect import bisect_left
+from time import time
+
+from lollypop.define import TaskLane
+from lollypop.logger import Logger
+
+
+class TaskPool:
+    """
+        Run tasks with a few shared threads
+        Each lane has its own queue and workers, so slow network tasks
+        never delay loads for visible widgets and long jobs never delay
+        short background tasks
+    """
+    __WORKERS = {TaskLane.UI: 2,
+                 TaskLane.BACKGROUND: 3,
+                 TaskLane.NETWORK: 4,
+                 TaskLane.LONG: 2}
+    __NAMES = {TaskLane.UI: "ui",
+               TaskLane.BACKGROUND: "background",
+               TaskLane.NETWORK: "network",
+               TaskLane.LONG: "long"}
+    # Latency histograms buckets upper bounds, in seconds
+    __BUCKETS = [0.001, 0.01, 0.1, 1, 10]
+    # Log statistics every 500 tasks
+    __LOG_INTERVAL = 500
+
+    def __init__(self):
+        """
+            Init pool
+        """
+        self.__lock = Lock()
+        self.__count = 0
+        self.__lanes = {}
+        for lane in self.__WORKERS.keys():
+            self.__lanes[lane] = {
+                "condition": Condition(self.__lock),
+                "queue": deque(),
+                "threads": 0,
+                "idle": 0,
+                "max_queued": 0,
+                "done": 0,
+                "cancelled": 0,
+                "wait": [0] * (len(self.__BUCKETS) + 1),
+                "run": [0] * (len(self.__BUCKETS) + 1)}
+
+    def run(self, lane, command, *args, cancellable=None):
+        """
+            Queue command(*args) in lane
+            @param lane as TaskLane
+            @param command as function
+            @param cancellable as Gio.Cancellable: skip task if cancelled
+        """
+        with self.__lock:
+            lane_data = self.__lanes[lane]
+            lane_data["queue"].append((time(), command, args, cancellable))
+            lane_data["max_queued"] = max(lane_data["max_queued"],
+                                          len(lane_data["queue"]))
+            if len(lane_data["queue"]) > lane_data["idle"] and\
+                    lane_data["threads"] < self.__WORKERS[lane]:
+                lane_data["threads"] += 1
+                thread = Thread(target=self.__run, args=(lane,))
+                thread.daemon = True
+                thread.start()
+            else:
+                lane_data["condition"].notify()
+
+    def get_stats(self):
+        """
+            Get lanes statistics, histograms are task counts by
+            latency bucket upper bound
+            @return {str: {}}
+        """
+        stats = {}
+        labels = ["%ss" % bucket for bucket in self.__BUCKETS] + ["inf"]
+        with self.__lock:
+            for (lane, lane_data) in self.__lanes.items():
+                stats[self.__NAMES[lane]] = {
+                    "queued": len(lane_data["queue"]),
+                    "max_queued": lane_data["max_queued"],
+                    "workers": lane_data["threads"],
+                    "done": lane_data["done"],
+                    "cancelled": lane_data["cancelled"],
+                    "wait": dict(zip(labels, lane_data["wait"])),
+                    "run": dict(zip(labels, lane_data["run"]))}
+        return stats
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_next(self, lane):
+        """
+            Wait for next task in lane
+            @param lane as TaskLane
+            @return (queued as float, command as function,
+                     args as (), cancellable as Gio.Cancellable)
+        """
+        with self.__lock:
+            lane_data = self.__lanes[lane]
+            while True:
+                lane_data["idle"] += 1
+                while not lane_data["queue"]:
+                    lane_data["condition"].wait()
+                lane_data["idle"] -= 1
+                task = lane_data["queue"].popleft()
+                cancellable = task[3]
+                if cancellable is not None and cancellable.is_cancelled():
+                    lane_data["cancelled"] += 1
+                    continue
+                return task
+
+    def __add_stats(self, lane, wait, run):
+        """
+            Record task latencies
+            @param lane as TaskLane
+            @param wait as float
+            @param run as float
+        """
+        with self.__lock:
+            lane_data = self.__lanes[lane]
+            lane_data["wait"][bisect_left(self.__BUCKETS, wait)] += 1
+            lane_data["run"][bisect_left(self.__BUCKETS, run)] += 1
+            lane_data["done"] += 1
+            self.__count += 1
+            if self.__count % self.__LOG_INTERVAL != 0:
+                return
+        Logger.debug("TaskPool::__add_stats(): %s" % self.get_stats())
+
+    def __run(self, lane):
+        """
+            Run tasks in lane
+            @param lane as TaskLane
+            @thread safe
+        """
+        while True:
+            (queued, command, args, cancellable) = self.__get_next(lane)
+            started = time()
+            try:
+                command(*args)
+            except Exception as e:
+                Logger.error("TaskPool::__run(): %s" % e)
+            self.__add_stats(lane, started - queued, time() - started)
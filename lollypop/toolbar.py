@@ -12,7 +12,7 @@
 
 from gi.repository import Gtk, Gst
 
-from lollypop.define import App, WindowSize, LOLLYPOP_DATA_PATH
+from lollypop.define import App, WindowSize
 from lollypop.toolbar_playback import ToolbarPlayback
 from lollypop.toolbar_info import ToolbarInfo
 from lollypop.toolbar_title import ToolbarTitle
@@ -105,9 +105,7 @@ class Toolbar(Gtk.HeaderBar):
         """
         try:
             if App().settings.get_value("save-state"):
-                from pickle import load
-                position = load(open(LOLLYPOP_DATA_PATH + "/position.bin",
-                                     "rb"))
+                position = App().state.get("position")
                 self.__toolbar_title.add_mark(position / Gst.SECOND)
         except Exception as e:
             Logger.error("Toolbar::restore_state(): %s" % e)
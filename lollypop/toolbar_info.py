@@ -112,10 +112,21 @@ class ToolbarInfo(Gtk.Bin, InfoController):
             @param album id as int
         """
         if App().player.current_track.album.id == album_id:
-            surface = App().art.get_album_artwork(
+            App().art.get_album_artwork_async(
                 App().player.current_track.album,
                 self.artsize,
-                self._cover.get_scale_factor())
+                self._cover.get_scale_factor(),
+                self.__on_album_artwork,
+                None,
+                album_id)
+
+    def __on_album_artwork(self, surface, album_id):
+        """
+            Set cover if album still playing
+            @param surface as cairo.Surface
+            @param album id as int
+        """
+        if App().player.current_track.album.id == album_id:
             self._cover.set_from_surface(surface)
 
     def __update_logo(self, art, name):
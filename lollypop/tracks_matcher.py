@@ -0,0 +1,90 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from itertools import groupby
+from operator import itemgetter
+
+from lollypop.define import App
+from lollypop.utils import noaccents
+
+
+class TracksMatcher:
+    """
+        Match (artist, title) pairs from external sources with collection
+        Index is built with one query on first match, use one matcher for
+        a whole list and drop it after
+        A track matches an artist if artist is one of its album artists
+        or if artist is all its artists joined with ", "
+    """
+
+    def __init__(self):
+        """
+            Init matcher
+        """
+        self.__index = None
+
+    def match(self, artist, title):
+        """
+            Get track id for artist and title
+            @param artist as str
+            @param title as str
+            @return track id as int/None
+            @thread safe
+        """
+        if self.__index is None:
+            self.__index = self.__get_index()
+        return self.__index.get(self.__get_key(artist, title), None)
+
+    def match_all(self, items):
+        """
+            Get track ids for (artist, title) pairs
+            @param items as [(str, str)]
+            @return track ids as [int], unmatched items are ignored
+            @thread safe
+        """
+        track_ids = []
+        for (artist, title) in items:
+            track_id = self.match(artist, title)
+            if track_id is not None:
+                track_ids.append(track_id)
+        return track_ids
+
+#######################
+# PRIVATE             #
+#######################
+    def __get_key(self, artist, title):
+        """
+            Get normalized key
+            @param artist as str
+            @param title as str
+            @return (str, str)
+        """
+        return (noaccents(artist).casefold().strip(),
+                noaccents(title).casefold().strip())
+
+    def __get_index(self):
+        """
+            Build (artist, title) index, lowest track id wins
+            @return {(str, str): int}
+        """
+        index = {}
+        rows = App().tracks.get_artists_titles()
+        for (track_id, track_rows) in groupby(rows, key=itemgetter(0)):
+            track_rows = list(track_rows)
+            title = track_rows[0][1]
+            for (ignore, ignore, artist, album_artist) in track_rows:
+                if album_artist:
+                    index.setdefault(self.__get_key(artist, title), track_id)
+            # All artists joined, as in tags
+            artists = ", ".join([row[2] for row in track_rows])
+            index.setdefault(self.__get_key(artists, title), track_id)
+        return index
@@ -19,7 +19,7 @@ from gettext import gettext as _
 import unicodedata
 
 from lollypop.helper_task import TaskHelper
-from lollypop.define import App
+from lollypop.define import App, TaskLane
 
 
 def blur(surface, image, w, h):
@@ -66,7 +66,8 @@ def blur(surface, image, w, h):
             return None
         return surface
     TaskHelper().run(do_blur, surface, w, h,
-                     callback=(image.set_from_surface,))
+                     callback=(image.set_from_surface,),
+                     lane=TaskLane.UI)
 
 
 def draw_rounded_image(image, ctx):
@@ -192,10 +193,11 @@ def is_gnome():
     return GLib.getenv("XDG_CURRENT_DESKTOP") in ["ubuntu:GNOME", "GNOME"]
 
 
-def is_audio(f):
+def is_audio(f, info=None):
     """
         Return True if files is audio
         @param f as Gio.File
+        @param info as Gio.FileInfo with standard::content-type or None
     """
     audio = ["application/ogg", "application/x-ogg", "application/x-ogm-audio",
              "audio/aac", "audio/mp4", "audio/mpeg", "audio/mpegurl",
@@ -211,8 +213,9 @@ def is_audio(f):
              "audio/x-pn-windows-acm", "application/x-matroska",
              "audio/x-matroska", "audio/x-wavpack", "video/mp4"]
     try:
-        info = f.query_info("standard::content-type",
-                            Gio.FileQueryInfoFlags.NONE)
+        if info is None:
+            info = f.query_info("standard::content-type",
+                                Gio.FileQueryInfoFlags.NONE)
         if info is not None:
             content_type = info.get_content_type()
             if content_type in audio:
@@ -222,14 +225,26 @@ def is_audio(f):
     return False
 
 
-def is_pls(f):
+def get_mtime(info):
+    """
+        Return modification time in microseconds
+        @param info as Gio.FileInfo with time::modified/time::modified-usec
+        @return int
+    """
+    return info.get_attribute_uint64("time::modified") * 1000000 +\
+        info.get_attribute_uint32("time::modified-usec")
+
+
+def is_pls(f, info=None):
     """
         Return True if files is a playlist
         @param f as Gio.File
+        @param info as Gio.FileInfo with standard::content-type or None
     """
     try:
-        info = f.query_info("standard::content-type",
-                            Gio.FileQueryInfoFlags.NONE)
+        if info is None:
+            info = f.query_info("standard::content-type",
+                                Gio.FileQueryInfoFlags.NONE)
         if info is not None:
             if info.get_content_type() in ["audio/x-mpegurl",
                                            "application/xspf+xml"]:
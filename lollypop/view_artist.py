@@ -197,7 +197,7 @@ class ArtistView(ArtistAlbumsView):
         """
         try:
             album_ids = App().albums.get_ids(self._artist_ids, self._genre_ids)
-            player_ids = [album.id for album in App().player.albums]
+            player_ids = App().player.albums.ids
             icon_name = self.__add_button.get_image().get_icon_name()[0]
             add = icon_name == "list-add-symbolic"
             for album_id in album_ids:
@@ -401,7 +401,7 @@ class ArtistView(ArtistAlbumsView):
             @param album_id as int
         """
         albums = App().albums.get_ids(self._artist_ids, self._genre_ids)
-        album_ids = [album.id for album in App().player.albums]
+        album_ids = App().player.albums.ids
         self.__update_icon(len(set(albums) & set(album_ids)) != len(albums))
 
     def __on_lock_changed(self, player):
@@ -98,6 +98,7 @@ class PlaylistsView(View):
         heights = {}
         total = 0
         idx = 0
+        App().tracks.cache.prefetch(track_ids)
         for track_id in track_ids:
             track = Track(track_id)
             if track.album_id != prev_album_id:
@@ -18,7 +18,7 @@ from lollypop.widgets_radio import RadioWidget
 from lollypop.radios import Radios
 from lollypop.pop_radio import RadioPopover
 from lollypop.pop_tunein import TuneinPopover
-from lollypop.define import App
+from lollypop.define import App, TaskLane
 
 
 class RadiosView(LazyLoadingView):
@@ -73,7 +73,8 @@ class RadiosView(LazyLoadingView):
             Populate view with tracks from playlist
         """
         helper = TaskHelper()
-        helper.run(self.__get_radios, callback=(self.__on_get_radios,))
+        helper.run(self.__get_radios, callback=(self.__on_get_radios,),
+                   lane=TaskLane.UI)
 
     @property
     def children(self):
@@ -10,7 +10,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program. If not, see <http://www.gnu.org/licenses/>.
 
-from gi.repository import Gtk, GLib, Gdk
+from gi.repository import Gtk, GLib, Gdk, Gio
 
 from gettext import gettext as _
 
@@ -319,6 +319,7 @@ class AlbumWidget(BaseWidget):
         BaseWidget.__init__(self)
         self._album = album
         self._art_size = art_size
+        self._cancellable = Gio.Cancellable()
         self.connect("destroy", self.__on_destroy)
         self._scan_signal = App().scanner.connect("album-updated",
                                                   self._on_album_updated)
@@ -350,15 +351,18 @@ class AlbumWidget(BaseWidget):
         """
         if self._cover is None:
             return
-        surface = App().art.get_album_artwork(
-            self._album,
-            self._art_size,
-            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
+        scale = self._cover.get_scale_factor()
+        App().art.get_album_artwork_async(self._album,
+                                          self._art_size,
+                                          scale,
+                                          self.__on_album_artwork,
+                                          self._cancellable)
+        # Placeholder until artwork is loaded
+        if self._cover.get_storage_type() == Gtk.ImageType.EMPTY:
+            self._cover.set_from_surface(
+                App().art.get_default_icon("folder-music-symbolic",
+                                           self._art_size * scale,
+                                           scale))
 
     def update_cover(self):
         """
@@ -366,15 +370,11 @@ class AlbumWidget(BaseWidget):
         """
         if self._cover is None:
             return
-        surface = App().art.get_album_artwork(
-            self._album,
-            self._art_size,
-            self._cover.get_scale_factor())
-        self._cover.set_from_surface(surface)
-        if surface.get_height() > surface.get_width():
-            self._overlay_orientation = Gtk.Orientation.VERTICAL
-        else:
-            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
+        App().art.get_album_artwork_async(self._album,
+                                          self._art_size,
+                                          self._cover.get_scale_factor(),
+                                          self.__on_album_artwork,
+                                          self._cancellable)
 
     def update_state(self):
         """
@@ -398,10 +398,22 @@ class AlbumWidget(BaseWidget):
 #######################
 # PRIVATE             #
 #######################
+    def __on_album_artwork(self, surface):
+        """
+            Set album artwork
+            @param surface as cairo.Surface
+        """
+        self._cover.set_from_surface(surface)
+        if surface.get_height() > surface.get_width():
+            self._overlay_orientation = Gtk.Orientation.VERTICAL
+        else:
+            self._overlay_orientation = Gtk.Orientation.HORIZONTAL
+
     def __on_destroy(self, widget):
         """
             Disconnect signal
             @param widget as Gtk.Widget
         """
+        self._cancellable.cancel()
         if self._scan_signal is not None:
             App().scanner.disconnect(self._scan_signal)
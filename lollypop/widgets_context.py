@@ -104,11 +104,7 @@ class ContextWidget(Gtk.EventBox):
                 album = objeto.album
             else:
                 album = objeto
-            player_album = None
-            for _album in App().player.albums:
-                if album.id == _album.id:
-                    player_album = _album
-                    break
+            player_album = App().player.albums.get_album(album.id)
             if player_album is not None:
                 if player_album.track_ids.sort() == objeto.track_ids.sort():
                     add_to_playback = False
@@ -17,7 +17,7 @@ from gettext import gettext as _
 from lollypop.sync_mtp import MtpSync
 from lollypop.cellrenderer import CellRendererAlbum
 from lollypop.selectionlist import SelectionList
-from lollypop.define import App, Type
+from lollypop.define import App, Type, TaskLane
 from lollypop.objects import Album
 from lollypop.loader import Loader
 from lollypop.logger import Logger
@@ -169,7 +169,7 @@ class DeviceManagerWidget(Gtk.Bin, MtpSync):
             playlists.append(Type.NONE)
 
         helper = TaskHelper()
-        helper.run(self._sync, playlists)
+        helper.run(self._sync, playlists, lane=TaskLane.LONG)
 
     def cancel_sync(self):
         """
@@ -118,11 +118,7 @@ class IndicatorWidget(Gtk.EventBox):
             Check if track_id in Player current playlist
             @return bool
         """
-        for album in App().player.albums:
-            if self.__track.album.id == album.id:
-                if self.__track.id in album.track_ids:
-                    return True
-        return False
+        return App().player.track_in_playback(self.__track)
 
     def __clear_spinner(self):
         """
@@ -189,20 +185,17 @@ class IndicatorWidget(Gtk.EventBox):
         """
         if self.__is_in_current_playlist():
             # We want track from player, not from current widget
-            albums = App().player.albums
-            for album in albums:
-                if album.id == self.__track.album.id:
-                    for track in album.tracks:
-                        if track.id == self.__track.id:
-                            count = len(album.tracks)
-                            album.remove_track(track)
-                            # Album is now empty
-                            if count == 1:
-                                App().player.remove_album(album)
-                                App().player.stop()
-                            elif App().player.next_track.id == track.id:
-                                App().player.set_next()
-                            break
+            album = App().player.albums.get_album(self.__track.album.id)
+            for track in album.tracks:
+                if track.id == self.__track.id:
+                    count = len(album.tracks)
+                    album.remove_track(track)
+                    # Album is now empty
+                    if count == 1:
+                        App().player.remove_album(album)
+                        App().player.stop()
+                    elif App().player.next_track.id == track.id:
+                        App().player.set_next()
                     break
             # if track album in Player albums, destroy parent
             if self.__parent is not None:
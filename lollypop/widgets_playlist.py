@@ -17,6 +17,7 @@ from gi.repository import Gtk, GLib, Gdk, Pango, GObject
 from gettext import gettext as _
 
 from lollypop.define import App, Type, WindowSize, Loading, ResponsiveType
+from lollypop.define import TaskLane
 from lollypop.cellrenderer import CellRendererAlbum
 from lollypop.widgets_track import TracksWidget, PlaylistRow
 from lollypop.objects import Track, Album, Disc
@@ -891,7 +892,8 @@ class PlaylistEditWidget(Gtk.Bin):
         """
         if len(self.__model) == 0:
             helper = TaskHelper()
-            helper.run(self.__append_tracks, callback=(self.__append_track,))
+            helper.run(self.__append_tracks, callback=(self.__append_track,),
+                       lane=TaskLane.UI)
 
 #######################
 # PROTECTED           #
@@ -958,7 +960,8 @@ class PlaylistEditWidget(Gtk.Bin):
                 else:
                     artist_name = ", ".join(track.album.artists)
                 helper = TaskHelper()
-                helper.run(App().lastfm.unlove, artist_name, track.name)
+                helper.run(App().lastfm.unlove, artist_name, track.name,
+                           lane=TaskLane.NETWORK)
             self.__model.remove(iterator)
         App().playlists.remove_tracks(self.__playlist_id, tracks)
         self.__infobar.hide()
@@ -13,7 +13,7 @@
 from gi.repository import Gtk, Gio, Gdk, GLib, Gst
 
 from lollypop.container import Container
-from lollypop.define import App, WindowSize
+from lollypop.define import App, WindowSize, TaskLane
 from lollypop.toolbar import Toolbar
 from lollypop.helper_task import TaskHelper
 from lollypop.logger import Logger
@@ -388,7 +388,8 @@ class Window(Gtk.ApplicationWindow):
             if uris:
                 task_helper = TaskHelper()
                 task_helper.run(importer.add, uris,
-                                callback=(App().scanner.update,))
+                                callback=(App().scanner.update,),
+                                lane=TaskLane.LONG)
         except:
             pass
 
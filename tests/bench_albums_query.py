@@ -0,0 +1,168 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Compare AlbumsDatabase.get_ids() queries before and after database
+# upgrade 31 on a synthetic collection, artist sort order
+# Usage: python3 tests/bench_albums_query.py [albums count]
+
+from time import perf_counter
+import os
+import random
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lollypop.localized import LocalizedCollation, sort_key  # noqa: E402
+
+ARTISTS_RATIO = 5
+GENRES = 50
+OLD_ORDER = " ORDER BY artists.sortname COLLATE NOCASE COLLATE LOCALIZED,\
+             albums.year,\
+             albums.name COLLATE NOCASE COLLATE LOCALIZED"
+NEW_ORDER = " ORDER BY artists.sortkey,\
+             albums.year,\
+             albums.sortkey"
+
+
+def create_db(albums, upgraded):
+    """
+        Create a synthetic collection in memory
+        @param albums as int
+        @param upgraded as bool: with upgrade 31 indexes and sort keys
+        @return sqlite3.Connection
+    """
+    rnd = random.Random(1)
+    artists = albums // ARTISTS_RATIO
+    sql = sqlite3.connect(":memory:")
+    sql.create_collation("LOCALIZED", LocalizedCollation())
+    sql.executescript("""
+        CREATE TABLE albums (id INTEGER PRIMARY KEY, name TEXT,
+                             year INT, popularity INT, sortkey INT);
+        CREATE TABLE artists (id INTEGER PRIMARY KEY, name TEXT,
+                              sortname TEXT, sortkey INT);
+        CREATE TABLE album_artists (album_id INT, artist_id INT);
+        CREATE TABLE album_genres (album_id INT, genre_id INT);
+        CREATE index idx_aa ON album_artists(album_id);
+        CREATE index idx_ag ON album_genres(album_id);""")
+    words = ["".join(rnd.choice("abcdefghijklmnopqrstuvwxyzéè ")
+                     for i in range(12)) for j in range(5000)]
+    sql.executemany("INSERT INTO artists VALUES (?, ?, ?, NULL)",
+                    [(i, words[i % 5000] + str(i), words[i % 5000] + str(i))
+                     for i in range(1, artists + 1)])
+    sql.executemany("INSERT INTO albums VALUES (?, ?, ?, ?, NULL)",
+                    [(i, rnd.choice(words).title(), rnd.randint(1950, 2018),
+                      rnd.randint(0, 100)) for i in range(1, albums + 1)])
+    sql.executemany("INSERT INTO album_artists VALUES (?, ?)",
+                    [(i, rnd.randint(1, artists))
+                     for i in range(1, albums + 1)])
+    sql.executemany("INSERT INTO album_genres VALUES (?, ?)",
+                    [(i, rnd.randint(1, GENRES))
+                     for i in range(1, albums + 1)])
+    if upgraded:
+        # Same as AlbumsDatabase/ArtistsDatabase.update_sortkeys()
+        for (table, column) in [("albums", "name"), ("artists", "sortname")]:
+            rows = sorted(sql.execute("SELECT rowid, %s FROM %s" %
+                                      (column, table)),
+                          key=lambda row: sort_key(row[1]))
+            sql.executemany("UPDATE %s SET sortkey=? WHERE rowid=?" % table,
+                            [(key, row[0]) for (key, row) in enumerate(rows)])
+        sql.executescript("""
+            CREATE index idx_ag_genre ON album_genres(genre_id, album_id);
+            CREATE index idx_aa_artist ON album_artists(artist_id, album_id);
+            CREATE index idx_albums_sort ON albums(sortkey);
+            CREATE index idx_albums_year ON albums(year, sortkey);
+            CREATE index idx_artists_sort ON artists(sortkey);""")
+    sql.execute("ANALYZE")
+    return sql
+
+
+def get_ids_old(sql, artist_ids, genre_ids):
+    """
+        get_ids() before upgrade 31
+        @param sql as sqlite3.Connection
+        @param artist_ids as [int]
+        @param genre_ids as [int]
+        @return [int]
+    """
+    request = "SELECT DISTINCT albums.rowid\
+               FROM albums, album_artists, artists"
+    if genre_ids:
+        request += ", album_genres"
+    request += " WHERE albums.rowid = album_artists.album_id AND\
+                artists.rowid = album_artists.artist_id"
+    if artist_ids:
+        request += " AND ("
+        request += "artists.rowid=? OR " * len(artist_ids)
+        request += "1=0)"
+    if genre_ids:
+        request += " AND album_genres.album_id=albums.rowid AND ("
+        request += "album_genres.genre_id=? OR " * len(genre_ids)
+        request += "1=0)"
+    request += OLD_ORDER
+    return [row[0] for row in sql.execute(request,
+                                          tuple(artist_ids + genre_ids))]
+
+
+def get_ids_new(sql, artist_ids, genre_ids):
+    """
+        get_ids() after upgrade 31
+        @param sql as sqlite3.Connection
+        @param artist_ids as [int]
+        @param genre_ids as [int]
+        @return [int]
+    """
+    request = "SELECT DISTINCT albums.rowid\
+               FROM albums, album_artists, artists\
+               WHERE albums.rowid = album_artists.album_id AND\
+               artists.rowid = album_artists.artist_id"
+    if artist_ids:
+        request += " AND album_artists.artist_id IN (%s)" %\
+            ",".join("?" * len(artist_ids))
+    if genre_ids:
+        request += " AND albums.rowid IN (\
+                        SELECT album_id FROM album_genres\
+                        WHERE genre_id IN (%s))" %\
+            ",".join("?" * len(genre_ids))
+    request += NEW_ORDER
+    return [row[0] for row in sql.execute(request,
+                                          tuple(artist_ids + genre_ids))]
+
+
+def bench(function, sql, artist_ids, genre_ids, count=5):
+    """
+        Run function count times
+        @return (milliseconds by run as float, result as [int])
+    """
+    start = perf_counter()
+    for i in range(count):
+        result = function(sql, artist_ids, genre_ids)
+    return ((perf_counter() - start) / count * 1000, result)
+
+
+if __name__ == "__main__":
+    albums = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print("%s albums, %s artists, %s genres" %
+          (albums, albums // ARTISTS_RATIO, GENRES))
+    old_db = create_db(albums, False)
+    new_db = create_db(albums, True)
+    for (label, artist_ids, genre_ids) in [
+            ("genre view (1 genre)", [], [7]),
+            ("genre view (3 genres)", [], [1, 2, 3]),
+            ("artist view (1 artist)", [42], []),
+            ("artist view (5 artists)", [1, 2, 3, 4, 5], [])]:
+        (old_time, old_ids) = bench(get_ids_old, old_db,
+                                    artist_ids, genre_ids)
+        (new_time, new_ids) = bench(get_ids_new, new_db,
+                                    artist_ids, genre_ids)
+        print("%-24s %8.2f ms -> %6.2f ms  %s albums%s" %
+              (label, old_time, new_time, len(new_ids),
+               "" if old_ids == new_ids else "  RESULTS DIFFER"))
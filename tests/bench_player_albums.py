@@ -0,0 +1,76 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+# Micro-benchmarks for playback albums lookups over a 50k albums context,
+# compared with the list scans they replace
+# Usage: python3 tests/bench_player_albums.py [albums count]
+
+from array import array
+from time import perf_counter
+from unittest import mock
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from lollypop.objects import Album, Track  # noqa: E402
+from lollypop.player_albums import PlayerAlbums  # noqa: E402
+from test_player_albums import get_app  # noqa: E402
+
+
+def bench(label, function, count=1000):
+    """
+        Print time by run of function
+        @param label as str
+        @param function as function
+        @param count as int
+    """
+    start = perf_counter()
+    for i in range(count):
+        function()
+    print("%-36s %10.2f us" %
+          (label, (perf_counter() - start) / count * 1000000))
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = get_app()
+    for name in ["lollypop.objects.App", "lollypop.player_albums.App"]:
+        mock.patch(name, lambda: app).start()
+    print("%s albums" % count)
+    albums = PlayerAlbums(range(1, count + 1), [5], [])
+    last = albums[count - 1]
+    albums.index(last)
+    bench("index(last album)", lambda: albums.index(last))
+    old_albums = [Album(album_id) for album_id in range(1, count + 1)]
+    old_last = old_albums[-1]
+    bench("  list.index(last album)",
+          lambda: old_albums.index(old_last), 100)
+    albums.get_album(count)
+    bench("get_album(last id)", lambda: albums.get_album(count))
+    old_ids = array("q", range(1, count + 1))
+    bench("  array.index(last id)", lambda: old_ids.index(count), 100)
+
+    def rebuild():
+        albums.pop(count // 2)
+        albums.insert(count // 2, Album(1))
+        albums.index(last)
+        albums.get_album(count)
+    bench("pop/insert in middle, then lookups", rebuild, 10)
+
+    album = Album(1)
+    album.set_tracks([Track(track_id, album)
+                      for track_id in range(2000)])
+    track = album.tracks[-1]
+    bench("Track.position (2000 tracks)", lambda: track.position)
+    bench("  track ids scan (2000 tracks)",
+          lambda: [t.id for t in album.tracks].index(track.id), 100)
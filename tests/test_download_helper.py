@@ -0,0 +1,130 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from threading import Event, Lock, Thread
+from time import sleep, time
+from unittest import mock
+import unittest
+
+try:
+    from lollypop.helper_download import DownloadHelper
+    from lollypop.define import DownloadPriority
+except ImportError:
+    DownloadHelper = None
+
+
+if DownloadHelper is not None:
+    class Helper(DownloadHelper):
+        """
+            Download helper with a fake server: statuses are served in
+            order for each uri, then 200
+        """
+
+        def __init__(self, statuses={}, delay=0):
+            DownloadHelper.__init__(self)
+            self.statuses = {uri: list(s) for (uri, s) in statuses.items()}
+            self.delay = delay
+            self.requests = []
+            self.running = {}
+            self.max_running = {}
+            self.lock = Lock()
+
+        def _load(self, uri, cancellable, headers):
+            host = uri.split("/")[2]
+            with self.lock:
+                self.requests.append(uri)
+                self.running[host] = self.running.get(host, 0) + 1
+                self.max_running[host] = max(self.max_running.get(host, 0),
+                                             self.running[host])
+                statuses = self.statuses.get(uri, [])
+                status = statuses.pop(0) if statuses else 200
+            sleep(self.delay)
+            with self.lock:
+                self.running[host] -= 1
+            if status == 429 or status >= 500:
+                return (status, b"", 0)
+            return (status, uri.encode("utf-8"), None)
+
+
+@unittest.skipIf(DownloadHelper is None, "PyGObject is not available")
+class TestDownloadHelper(unittest.TestCase):
+
+    def setUp(self):
+        # Backoff delays are recorded, not slept
+        self.delays = []
+        patcher = mock.patch("lollypop.helper_download.sleep",
+                             self.__sleep)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def __sleep(self, delay):
+        self.delays.append(delay)
+        sleep(min(delay, 0.05))
+
+    def __wait(self, condition):
+        timeout = time() + 5
+        while not condition() and time() < timeout:
+            sleep(0.01)
+        self.assertTrue(condition())
+
+    def test_connections_by_host(self):
+        helper = Helper(delay=0.1)
+        threads = []
+        for i in range(6):
+            for host in ["a.test", "b.test"]:
+                uri = "http://%s/%s" % (host, i)
+                thread = Thread(target=helper.load_uri_content_sync,
+                                args=(uri,))
+                thread.start()
+                threads.append(thread)
+        for thread in threads:
+            thread.join()
+        self.assertEqual(helper.max_running, {"a.test": 2, "b.test": 2})
+
+    def test_retry_on_server_errors(self):
+        uri = "http://a.test/retry"
+        helper = Helper({uri: [503, 429]})
+        self.assertEqual(helper.load_uri_content_sync(uri),
+                         (True, uri.encode("utf-8")))
+        self.assertEqual(helper.requests, [uri] * 3)
+        self.assertEqual(self.delays, [1.0, 2.0])
+        self.assertEqual(helper.get_stats()["retries"], 2)
+
+    def test_no_retry_on_client_errors(self):
+        uri = "http://a.test/missing"
+        helper = Helper({uri: [404]})
+        self.assertEqual(helper.load_uri_content_sync(uri), (False, b""))
+        self.assertEqual(helper.requests, [uri])
+        self.assertEqual(self.delays, [])
+
+    def test_priority_and_dedup(self):
+        helper = Helper()
+        done = []
+        # Keep all workers busy, then release only one of them
+        events = [Event() for i in range(4)]
+        started = []
+        for (i, event) in enumerate(events):
+            helper.run(DownloadPriority.HIGH, ("busy", i),
+                       lambda e: started.append(e) or e.wait(5), event)
+        self.__wait(lambda: len(started) == 4)
+        helper.run(DownloadPriority.LOW, "low", done.append, "low")
+        helper.run(DownloadPriority.NORMAL, "normal", done.append, "normal")
+        helper.run(DownloadPriority.LOW, "dup", done.append, "dup1")
+        helper.run(DownloadPriority.HIGH, "high", done.append, "high")
+        # Same key replaces queued job, last queued runs first
+        helper.run(DownloadPriority.LOW, "dup", done.append, "dup2")
+        self.assertEqual(helper.get_stats()["queued"], 4)
+        events[0].set()
+        self.__wait(lambda: len(done) == 4)
+        for event in events:
+            event.set()
+        self.assertEqual(done, ["high", "normal", "dup2", "low"])
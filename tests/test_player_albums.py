@@ -0,0 +1,128 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+from unittest import mock
+import random
+import unittest
+
+try:
+    from lollypop.objects import Album, Track
+    from lollypop.player_albums import PlayerAlbums
+except ImportError:
+    PlayerAlbums = None
+
+
+class AlbumsDatabase:
+    """
+        Two tracks by album, album id * 10 + 1 and + 2
+    """
+
+    def get_artist_ids(self, album_id):
+        return []
+
+    def get_track_ids(self, album_id, genre_ids, artist_ids):
+        return [album_id * 10 + 1, album_id * 10 + 2]
+
+
+def get_app():
+    """
+        Application with databases used by albums
+        @return SimpleNamespace
+    """
+    return SimpleNamespace(albums=AlbumsDatabase(), tracks=None)
+
+
+@unittest.skipIf(PlayerAlbums is None, "PyGObject is not available")
+class TestPlayerAlbums(unittest.TestCase):
+
+    def setUp(self):
+        app = get_app()
+        for name in ["lollypop.objects.App", "lollypop.player_albums.App"]:
+            patcher = mock.patch(name, lambda: app)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.albums = PlayerAlbums([1, 2, 3, 2, 5])
+        # Build lazy indexes
+        self.albums.index(self.albums[3])
+        self.albums.get_album(2)
+
+    def __check(self, album_ids):
+        self.assertEqual(self.albums.ids, album_ids)
+        for (index, album_id) in enumerate(album_ids):
+            album = self.albums[index]
+            self.assertEqual(self.albums.index(album), index)
+            self.assertEqual(self.albums.get_indexes(album_id),
+                             [i for (i, value) in enumerate(album_ids)
+                              if value == album_id])
+            self.assertIs(self.albums.get_album(album_id),
+                          self.albums[album_ids.index(album_id)])
+
+    def test_insert_in_middle(self):
+        moved = self.albums[3]
+        album = Album(2)
+        self.albums.insert(1, album)
+        self.assertEqual(self.albums.index(album), 1)
+        self.assertEqual(self.albums.index(moved), 4)
+        self.assertIs(self.albums.get_album(2), album)
+        self.__check([1, 2, 2, 3, 2, 5])
+
+    def test_pop_in_middle(self):
+        moved = self.albums[3]
+        popped = self.albums.pop(1)
+        self.assertEqual(popped.id, 2)
+        self.assertRaises(ValueError, self.albums.index, popped)
+        self.assertEqual(self.albums.index(moved), 2)
+        self.assertIs(self.albums.get_album(2), moved)
+        self.__check([1, 3, 2, 5])
+
+    def test_append_and_pop_last(self):
+        album = Album(7)
+        self.albums.append(album)
+        self.assertEqual(self.albums.index(album), 5)
+        self.assertEqual(self.albums.get_indexes(7), [5])
+        self.assertIs(self.albums.pop(), album)
+        self.assertIsNone(self.albums.get_album(7))
+        self.assertRaises(ValueError, self.albums.index, album)
+        self.__check([1, 2, 3, 2, 5])
+
+    def test_random_operations(self):
+        rnd = random.Random(3)
+        model = self.albums.ids
+        for i in range(500):
+            operation = rnd.random()
+            if operation < 0.3:
+                album = Album(rnd.randint(1, 10))
+                self.albums.append(album)
+                model.append(album.id)
+            elif operation < 0.5:
+                album = Album(rnd.randint(1, 10))
+                index = rnd.randint(0, len(model))
+                self.albums.insert(index, album)
+                model.insert(index, album.id)
+            elif operation < 0.7 and model:
+                index = rnd.randrange(len(model))
+                self.assertEqual(self.albums.pop(index).id, model.pop(index))
+            elif model:
+                album_id = rnd.choice(model)
+                self.assertEqual(self.albums.get_album(album_id).id,
+                                 album_id)
+        self.__check(model)
+
+    def test_track_position(self):
+        album = Album(4)
+        tracks = [Track(track_id, album) for track_id in [41, 42, 43]]
+        album.set_tracks(list(tracks))
+        self.assertEqual([track.position for track in tracks], [0, 1, 2])
+        album.remove_track(tracks[0])
+        self.assertEqual(tracks[2].position, 1)
+        self.assertEqual(Track(44, album).position, 2)
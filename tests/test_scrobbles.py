@@ -0,0 +1,109 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+from types import SimpleNamespace
+from unittest import mock
+import os
+import tempfile
+import unittest
+
+try:
+    from gi.repository import GLib
+    from lollypop.database_scrobbles import ScrobblesDatabase
+    from lollypop.define import ScrobbleResult
+except ImportError:
+    ScrobblesDatabase = None
+
+
+class Endpoint:
+    """
+        Fake scrobbling service
+    """
+
+    def __init__(self):
+        self.online = True
+        self.rejected = set()
+        self.received = []
+
+    def submit(self, listens):
+        if not self.online:
+            return ScrobbleResult.FAILED
+        for listen in listens:
+            if listen["title"] in self.rejected:
+                return ScrobbleResult.REJECTED
+        self.received += [listen["title"] for listen in listens]
+        return ScrobbleResult.ACCEPTED
+
+
+@unittest.skipIf(ScrobblesDatabase is None, "PyGObject is not available")
+class TestScrobbles(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        app = SimpleNamespace(cursors={})
+        for patcher in [
+                mock.patch("lollypop.sqlcursor.App", lambda: app),
+                mock.patch.object(ScrobblesDatabase,
+                                  "_ScrobblesDatabase__DB_PATH",
+                                  os.path.join(tmp.name, "scrobbles.db")),
+                mock.patch.object(GLib, "timeout_add_seconds")]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.endpoint = Endpoint()
+        self.scrobbles = ScrobblesDatabase()
+
+    def __add(self, count):
+        for i in range(count):
+            track = SimpleNamespace(artists=["artist"], album_name="album",
+                                    title="title%s" % i, duration=200,
+                                    number=i, mb_track_id="",
+                                    album=SimpleNamespace(mb_album_id=""))
+            self.scrobbles.add("test", track, 1000 + i)
+
+    def __submit(self):
+        self.scrobbles._ScrobblesDatabase__submit("test",
+                                                  self.endpoint.submit,
+                                                  4, None)
+
+    def test_rejected_listen_is_isolated(self):
+        self.__add(10)
+        self.endpoint.rejected.add("title5")
+        self.__submit()
+        self.assertEqual(len(self.endpoint.received), 9)
+        self.assertNotIn("title5", self.endpoint.received)
+        stats = self.scrobbles.get_stats("test")
+        self.assertEqual(stats["rejected"], 1)
+        self.assertEqual(stats["backlog"], 0)
+
+    def test_no_listen_lost_across_restarts(self):
+        self.__add(10)
+        self.endpoint.online = False
+        self.__submit()
+        self.assertEqual(self.endpoint.received, [])
+        # Restart with service back online
+        self.scrobbles = ScrobblesDatabase()
+        self.endpoint.online = True
+        self.__submit()
+        self.assertEqual(self.endpoint.received,
+                         ["title%s" % i for i in range(10)])
+        self.assertEqual(self.scrobbles.get_stats("test")["backlog"], 0)
+
+    def test_failed_listens_are_kept(self):
+        self.__add(10)
+        self.endpoint.online = False
+        for i in range(30):
+            self.__submit()
+        self.assertEqual(self.scrobbles.get_stats("test")["backlog"], 10)
+        self.endpoint.online = True
+        self.__submit()
+        self.assertEqual(len(self.endpoint.received), 10)
@@ -0,0 +1,62 @@
+# Copyright (c) 2014-2018 Cedric Bellegarde <cedric.bellegarde@adishatz.org>
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see <http://www.gnu.org/licenses/>.
+
+import random
+import unittest
+
+from lollypop.shuffler import Shuffler
+
+
+class Albums(list):
+    """
+        Albums reordered in place, as PlayerAlbums with Player.move_album()
+    """
+    version = 0
+
+    def move(self, index, position):
+        self.insert(position, self.pop(index))
+        self.version += 2
+
+
+class TestShuffler(unittest.TestCase):
+
+    def setUp(self):
+        self.albums = Albums([("a", [1, 2, 3]), ("b", [10, 20, 30])])
+        self.shuffler = Shuffler(lambda album: album[1], random.Random(7))
+
+    def __next(self, played):
+        self.shuffler.set_groups(self.albums, self.albums.version)
+        (album, track_id) = self.shuffler.next(played)
+        if album is not None:
+            played.add(track_id)
+        return (album, track_id)
+
+    def test_values_match_groups_after_move(self):
+        played = set()
+        self.__next(played)
+        self.albums.move(0, 1)
+        picks = [self.__next(played) for i in range(5)]
+        for (album, track_id) in picks:
+            self.assertIn(track_id, album[1])
+        self.assertEqual(played, {1, 2, 3, 10, 20, 30})
+        self.assertEqual(self.__next(played), (None, None))
+
+    def test_seeded_picks_are_reproducible(self):
+        played = set()
+        picks = [self.__next(played) for i in range(6)]
+        self.setUp()
+        played = set()
+        self.assertEqual(picks, [self.__next(played) for i in range(6)])
+
+
+if __name__ == "__main__":
+    unittest.main()